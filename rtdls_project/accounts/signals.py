@@ -3,7 +3,7 @@ from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 
-from audittrail.models import AuditLog
+from audittrail.models import AuditLog, log_action
 from audittrail.context import get_current_user
 
 User = get_user_model()
@@ -20,7 +20,7 @@ def _extract_ip(request):
 
 @receiver(user_logged_in)
 def log_user_login(sender, request, user, **kwargs):
-    AuditLog.objects.create(
+    log_action(
         user=user,
         action=AuditLog.Action.LOGIN,
         entity='User',
@@ -34,7 +34,7 @@ def log_user_login(sender, request, user, **kwargs):
 def log_user_logout(sender, request, user, **kwargs):
     if not user:
         return
-    AuditLog.objects.create(
+    log_action(
         user=user,
         action=AuditLog.Action.LOGOUT,
         entity='User',
@@ -55,7 +55,7 @@ def log_role_change(sender, instance, **kwargs):
         actor = get_current_user()
         if not actor or not getattr(actor, 'is_authenticated', False):
             actor = None
-        AuditLog.objects.create(
+        log_action(
             user=actor,
             action=AuditLog.Action.ROLE_CHANGE,
             entity='User',
@@ -103,6 +103,15 @@ class SettingsPageTests(TestCase):
         self.assertContains(response, 'User Management')
         self.assertContains(response, 'Aircraft Registry')
 
+    def test_settings_page_query_budget(self):
+        self.client.login(username='admin_user', password='StrongPass123!')
+        # One aggregate each for users, aircraft and flights instead of a COUNT per figure.
+        with self.assertNumQueries(14):
+            response = self.client.get('/accounts/profile/')
+        overview = response.context['overview']
+        self.assertEqual((overview['active_users'], overview['inactive_users']), (2, 0))
+        self.assertEqual(response.context['analytics']['total_flights'], 0)
+
     def test_settings_page_honors_section_query_param(self):
         self.client.login(username='admin_user', password='StrongPass123!')
         response = self.client.get('/accounts/profile/?section=system-logs')
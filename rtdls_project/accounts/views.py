@@ -4,16 +4,17 @@ from django.contrib.auth.views import LoginView
 from django.contrib import messages
 from django.conf import settings
 from django.core.paginator import Paginator
-from django.db.models import Avg, Count, Max, Sum
+from django.db.models import Avg, Count, Max, Q, Sum
 from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
 
-from audittrail.models import AuditLog
+from audittrail.models import AuditLog, log_action
 from maintenance.models import Alert, MaintenanceLog
 from operations.models import Aircraft, FlightLog
 from operations.forms import AircraftRegistryForm
+from rtdls.aggregates import aggregate_counters, count_if
 from .models import User
 from .forms import LoginForm, SettingsUserCreateForm, SettingsUserEditForm
 
@@ -93,7 +94,7 @@ def profile_view(request):
             aircraft_form = AircraftRegistryForm(request.POST, prefix='aircraft')
             if aircraft_form.is_valid():
                 aircraft = aircraft_form.save()
-                AuditLog.objects.create(
+                log_action(
                     user=request.user,
                     action=AuditLog.Action.CREATE,
                     entity='Aircraft',
@@ -120,7 +121,7 @@ def profile_view(request):
             aircraft_edit_form = AircraftRegistryForm(request.POST, instance=target_aircraft, prefix='editaircraft')
             if aircraft_edit_form.is_valid():
                 updated_aircraft = aircraft_edit_form.save()
-                AuditLog.objects.create(
+                log_action(
                     user=request.user,
                     action=AuditLog.Action.UPDATE,
                     entity='Aircraft',
@@ -129,7 +130,7 @@ def profile_view(request):
                     ip_address=request.META.get('REMOTE_ADDR'),
                 )
                 if previous_status != updated_aircraft.status:
-                    AuditLog.objects.create(
+                    log_action(
                         user=request.user,
                         action=AuditLog.Action.UPDATE,
                         entity='Aircraft',
@@ -149,7 +150,7 @@ def profile_view(request):
             user_form = SettingsUserCreateForm(request.POST, prefix='newuser')
             if user_form.is_valid():
                 created_user = user_form.save()
-                AuditLog.objects.create(
+                log_action(
                     user=request.user,
                     action=AuditLog.Action.CREATE,
                     entity='User',
@@ -176,7 +177,7 @@ def profile_view(request):
             user_edit_form = SettingsUserEditForm(request.POST, instance=target_user, prefix='edituser')
             if user_edit_form.is_valid():
                 updated_user = user_edit_form.save()
-                AuditLog.objects.create(
+                log_action(
                     user=request.user,
                     action=AuditLog.Action.UPDATE,
                     entity='User',
@@ -186,7 +187,7 @@ def profile_view(request):
                 )
                 if previous_active != updated_user.is_active:
                     state = 'active' if updated_user.is_active else 'inactive'
-                    AuditLog.objects.create(
+                    log_action(
                         user=request.user,
                         action=AuditLog.Action.UPDATE,
                         entity='User',
@@ -237,15 +238,20 @@ def profile_view(request):
             }
         )
 
-    active_users = users_qs.filter(is_active=True).count()
-    inactive_users = users_qs.filter(is_active=False).count()
     recent_window_start = now - timedelta(days=30)
     prior_window_start = now - timedelta(days=60)
-    recent_users = users_qs.filter(date_joined__gte=recent_window_start).count()
-    prior_users = users_qs.filter(
-        date_joined__gte=prior_window_start,
-        date_joined__lt=recent_window_start,
-    ).count()
+    user_stats = aggregate_counters(
+        users_qs,
+        total=count_if(),
+        active=count_if(is_active=True),
+        inactive=count_if(is_active=False),
+        recent=count_if(date_joined__gte=recent_window_start),
+        prior=count_if(date_joined__gte=prior_window_start, date_joined__lt=recent_window_start),
+    )
+    active_users = user_stats['active']
+    inactive_users = user_stats['inactive']
+    recent_users = user_stats['recent']
+    prior_users = user_stats['prior']
     if prior_users:
         user_growth = round(((recent_users - prior_users) / prior_users) * 100)
     else:
@@ -255,9 +261,16 @@ def profile_view(request):
         last_maintenance_date=Max('maintenance_logs__last_maintenance_date')
     ).order_by('tail_number')
     aircraft_rows = list(aircraft_qs[:12])
-    total_aircraft = aircraft_qs.count()
-    in_maintenance_count = aircraft_qs.filter(status=Aircraft.Status.IN_MAINTENANCE).count()
-    active_aircraft = aircraft_qs.exclude(status=Aircraft.Status.IN_MAINTENANCE).count()
+    # Count from the bare table: the maintenance-date annotation would add a GROUP BY per aircraft.
+    aircraft_stats = aggregate_counters(
+        Aircraft.objects.all(),
+        total=count_if(),
+        in_maintenance=count_if(status=Aircraft.Status.IN_MAINTENANCE),
+        active=count_if(~Q(status=Aircraft.Status.IN_MAINTENANCE)),
+    )
+    total_aircraft = aircraft_stats['total']
+    in_maintenance_count = aircraft_stats['in_maintenance']
+    active_aircraft = aircraft_stats['active']
 
     unresolved_alerts = Alert.objects.filter(is_resolved=False).count()
     if total_aircraft:
@@ -273,13 +286,13 @@ def profile_view(request):
     else:
         system_health_label = 'At Risk'
 
-    flights_qs = FlightLog.objects.select_related('aircraft', 'departure_base', 'arrival_base')
-    flight_stats = flights_qs.aggregate(
-        total_flights=Count('id'),
+    flight_stats = aggregate_counters(
+        FlightLog.objects.all(),
+        total_flights=count_if(),
+        active_missions=count_if(mission_status=FlightLog.MissionStatus.ACTIVE),
         avg_duration=Avg('flight_hours'),
         total_fuel=Sum('fuel_used'),
     )
-    mission_active = flights_qs.filter(mission_status=FlightLog.MissionStatus.ACTIVE).count()
     role_breakdown = users_qs.values('role').annotate(total=Count('id')).order_by('role')
     role_breakdown_rows = [
         {
@@ -310,7 +323,7 @@ def profile_view(request):
         'edit_target_aircraft_id': edit_target_aircraft_id,
         'system_logs': system_logs,
         'overview': {
-            'total_users': users_qs.count(),
+            'total_users': user_stats['total'],
             'active_users': active_users,
             'inactive_users': inactive_users,
             'user_growth': user_growth,
@@ -320,10 +333,10 @@ def profile_view(request):
             'system_health_label': system_health_label,
         },
         'analytics': {
-            'total_flights': int(flight_stats.get('total_flights') or 0),
-            'avg_duration': float(flight_stats.get('avg_duration') or 0),
-            'total_fuel': float(flight_stats.get('total_fuel') or 0),
-            'active_missions': mission_active,
+            'total_flights': flight_stats['total_flights'],
+            'avg_duration': float(flight_stats['avg_duration']),
+            'total_fuel': float(flight_stats['total_fuel']),
+            'active_missions': flight_stats['active_missions'],
             'maintenance_records': maintenance_count,
             'role_breakdown': role_breakdown_rows,
         },
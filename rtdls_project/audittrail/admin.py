@@ -1,11 +1,11 @@
 from django.contrib import admin
 
-from .models import AuditLog
+from .models import AuditArchiveSegment, AuditChainHead, AuditCheckpoint, AuditLog, AuditVerificationCheckpoint
 
 
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
-    list_display = ('created_at', 'user', 'action', 'entity', 'entity_id')
+    list_display = ('created_at', 'user', 'action', 'entity', 'entity_id', 'occurrences')
     search_fields = ('description', 'entity', 'user__username')
     list_filter = ('action', 'entity', 'created_at')
     readonly_fields = (
@@ -16,6 +16,9 @@ class AuditLogAdmin(admin.ModelAdmin):
         'description',
         'ip_address',
         'created_at',
+        'occurrences',
+        'first_occurred_at',
+        'shard',
         'previous_checksum',
         'checksum',
     )
@@ -28,3 +31,36 @@ class AuditLogAdmin(admin.ModelAdmin):
 
     def has_delete_permission(self, request, obj=None):
         return False
+
+
+class ReadOnlyChainAdmin(admin.ModelAdmin):
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AuditChainHead)
+class AuditChainHeadAdmin(ReadOnlyChainAdmin):
+    list_display = ('shard', 'entry_count', 'last_entry_id', 'updated_at')
+
+
+@admin.register(AuditCheckpoint)
+class AuditCheckpointAdmin(ReadOnlyChainAdmin):
+    list_display = ('id', 'created_at', 'merkle_root')
+
+
+@admin.register(AuditVerificationCheckpoint)
+class AuditVerificationCheckpointAdmin(ReadOnlyChainAdmin):
+    list_display = ('shard', 'entry_id', 'entry_count', 'created_at')
+    list_filter = ('shard',)
+
+
+@admin.register(AuditArchiveSegment)
+class AuditArchiveSegmentAdmin(ReadOnlyChainAdmin):
+    list_display = ('shard', 'first_id', 'last_id', 'row_count', 'min_created_at', 'max_created_at', 'path')
+    list_filter = ('shard',)
@@ -0,0 +1,186 @@
+from datetime import timezone as dt_timezone
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.dateparse import parse_datetime
+
+from .spool import claim_orphans, own_segment, read_segment, release_segment, unwritten_entries
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SUFFIX = '.agg'
+
+
+def parse_rules(rules):
+    # 'view' aggregates every VIEW; 'create:FlightData' only CREATEs on that entity.
+    parsed = set()
+    for rule in rules:
+        action, _sep, entity = rule.strip().partition(':')
+        if action.strip():
+            parsed.add((action.strip().lower(), entity.strip().lower() or None))
+    return frozenset(parsed)
+
+
+def is_aggregated(entry, rules=None):
+    rules = parse_rules(settings.AUDIT_AGGREGATE_ACTIONS) if rules is None else rules
+    action = entry['action'].lower()
+    return (action, None) in rules or (action, entry['entity'].lower()) in rules
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def add_to_buckets(buckets, entry):
+    key = (entry['user_id'], entry['action'], entry['entity'], entry['entity_id'])
+    bucket = buckets.get(key)
+    if bucket is None:
+        buckets[key] = {
+            'entry': entry,
+            'count': 1,
+            'first_at': parse_datetime(entry['created_at']),
+            'same_description': True,
+        }
+    else:
+        bucket['count'] += 1
+        bucket['same_description'] = bucket['same_description'] and (
+            bucket['entry']['description'] == entry['description']
+        )
+        bucket['entry'] = entry
+
+
+def summarize(bucket):
+    entry = dict(bucket['entry'])
+    count = bucket['count']
+    if count == 1:
+        return entry
+    span = f'{_utc(bucket["first_at"])} to {_utc(parse_datetime(entry["created_at"]))} UTC'
+    if bucket['same_description']:
+        entry['description'] = f'{entry["description"]} ({count} times, {span})'
+    else:
+        entry['description'] = f'{count} {entry["entity"]} {entry["action"]} events, {span}. Last: {entry["description"]}'
+    entry['occurrences'] = count
+    entry['first_occurred_at'] = bucket['first_at'].isoformat()
+    return entry
+
+
+def summaries(buckets):
+    # Oldest first, so summaries enter each shard chain in the order their groups started.
+    return [summarize(bucket) for bucket in sorted(buckets.values(), key=lambda bucket: bucket['first_at'])]
+
+
+def summarize_segment(path):
+    # Summaries are a pure function of the spooled entries, so a replay rebuilds rows identical to any that committed.
+    buckets = {}
+    for entry in read_segment(path):
+        add_to_buckets(buckets, entry)
+    return summaries(buckets)
+
+
+class AuditAggregator:
+    def __init__(self, emit, window_seconds=None, spool_dir=None, background=True):
+        self.emit = emit
+        self.window_seconds = settings.AUDIT_AGGREGATE_SECONDS if window_seconds is None else window_seconds
+        self.spool_dir = Path(spool_dir or settings.AUDIT_SPOOL_DIR)
+        self.background = background
+        # One window at a time collects entries; closed windows wait here until their summaries commit.
+        self.current = None
+        self.closed = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.start_lock = threading.Lock()
+        self.thread = None
+        self.recovered = False
+
+    def _open_window(self):
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        path = self.spool_dir / f'{os.getpid()}-{time.time_ns()}{SPOOL_SUFFIX}'
+        own_segment(path)
+        return {'path': path, 'handle': open(path, 'x', encoding='utf-8'), 'buckets': {}, 'opened': time.monotonic()}
+
+    def _close_window(self):
+        self.current['handle'].close()
+        self.closed.append(self.current)
+        self.current = None
+
+    def add(self, entry):
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self.lock:
+            if self.current is not None and time.monotonic() - self.current['opened'] >= self.window_seconds:
+                self._close_window()
+            if self.current is None:
+                self.current = self._open_window()
+            # Spooled before it is counted: a crash before the summary commits leaves the raw entries for replay.
+            self.current['handle'].write(line)
+            self.current['handle'].flush()
+            add_to_buckets(self.current['buckets'], entry)
+        if self.background:
+            self.start()
+
+    def recover(self):
+        orphaned = claim_orphans(self.spool_dir, SPOOL_SUFFIX)
+        with self.lock:
+            self.closed[:0] = [{'path': path, 'buckets': None} for path in orphaned]
+        self.recovered = True
+        return orphaned
+
+    def flush(self, force=False):
+        with self.flush_lock:
+            if not self.recovered:
+                self.recover()
+            with self.lock:
+                if self.current is not None and (
+                    force or time.monotonic() - self.current['opened'] >= self.window_seconds
+                ):
+                    self._close_window()
+                windows = list(self.closed)
+
+            # A failed emit leaves the window (and its file) queued, so the whole window is retried next time.
+            written = 0
+            for window in windows:
+                if window['buckets'] is None:
+                    entries = summarize_segment(window['path'])
+                else:
+                    entries = summaries(window['buckets'])
+                # The file outlives its commit if we died, or failed, before unlinking it; skip summaries already chained.
+                entries = unwritten_entries(entries)
+                if entries:
+                    self.emit(entries)
+                window['path'].unlink(missing_ok=True)
+                release_segment(window['path'])
+                with self.lock:
+                    self.closed.remove(window)
+                written += len(entries)
+            return written
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.start_lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='audit-aggregator', daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        # A window is summarized at most half a window after it closes.
+        tick = max(1.0, self.window_seconds / 2)
+        while True:
+            time.sleep(tick)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Audit aggregate flush failed; the window stays spooled for the next attempt.')
+            finally:
+                close_old_connections()
+
+    def close(self):
+        try:
+            self.flush(force=True)
+        except Exception:
+            logger.exception('Audit aggregate flush at shutdown failed; the spool is replayed on next start.')
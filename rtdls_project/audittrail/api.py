@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.permissions import IsCommanderAuditorOrAdmin
+from rtdls.dates import date_window
+
+from .archive import query_audit_logs
+from .verification import verify_audit_chain
+
+
+class AuditChainVerifyView(APIView):
+    permission_classes = [IsAuthenticated, IsCommanderAuditorOrAdmin]
+
+    def post(self, request):
+        shards = request.data.get('shards')
+        if isinstance(shards, str):
+            shards = [shards]
+        if str(request.data.get('full', '')).lower() in {'1', 'true', 'yes'}:
+            # A full run re-reads every row and archive file; that belongs in a shell, not a request worker.
+            return Response(
+                {'detail': 'Full verification is not available over the API; run manage.py verify_audit_chain --full.'},
+                status=400,
+            )
+        # Runs in-process from the newest resume point; parallel workers are left to the management command.
+        report = verify_audit_chain(shards=shards or None, resume=True)
+        return Response(report, status=200 if report['ok'] else 409)
+
+
+class AuditLogRangeView(APIView):
+    permission_classes = [IsAuthenticated, IsCommanderAuditorOrAdmin]
+
+    def get(self, request):
+        today = timezone.localdate()
+        try:
+            date_from = parse_date(request.query_params.get('date_from', '')) or today
+            date_to = parse_date(request.query_params.get('date_to', '')) or today
+        except ValueError:
+            return Response({'detail': 'Dates must be valid YYYY-MM-DD values.'}, status=400)
+        if date_from > date_to:
+            return Response({'detail': 'date_from must not be after date_to.'}, status=400)
+        try:
+            limit = int(request.query_params.get('limit', settings.AUDIT_QUERY_LIMIT))
+        except ValueError:
+            return Response({'detail': 'limit must be an integer.'}, status=400)
+        limit = max(1, min(limit, settings.AUDIT_QUERY_LIMIT))
+        entities = request.query_params.getlist('entity') or None
+
+        start, end = date_window(date_from, date_to)
+        rows = query_audit_logs(
+            start,
+            end,
+            entities=entities,
+            action=request.query_params.get('action') or None,
+            limit=limit,
+        )
+        return Response(
+            {
+                'date_from': date_from.isoformat(),
+                'date_to': date_to.isoformat(),
+                'count': len(rows),
+                'results': [
+                    {
+                        'id': row.id,
+                        'created_at': row.created_at.isoformat(),
+                        'user': row.user.username if row.user else None,
+                        'action': row.action,
+                        'entity': row.entity,
+                        'entity_id': row.entity_id,
+                        'description': row.description,
+                        'occurrences': row.occurrences,
+                        'shard': row.shard,
+                        'checksum': row.checksum,
+                        'archived': row.archived,
+                    }
+                    for row in rows
+                ],
+            }
+        )
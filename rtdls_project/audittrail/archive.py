@@ -0,0 +1,269 @@
+from datetime import timedelta
+import gzip
+import hashlib
+import heapq
+from itertools import islice
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from .chain import GENESIS, sign, signature_valid
+from .models import AuditArchiveSegment, AuditLog, compute_checksum
+
+ARCHIVE_FIELDS = (
+    'id',
+    'user_id',
+    'action',
+    'entity',
+    'entity_id',
+    'description',
+    'ip_address',
+    'created_at',
+    'occurrences',
+    'first_occurred_at',
+    'shard',
+    'previous_checksum',
+    'checksum',
+)
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def archive_root():
+    return Path(settings.AUDIT_ARCHIVE_DIR)
+
+
+def segment_message(segment):
+    return '|'.join(
+        str(value)
+        for value in (
+            segment.shard,
+            segment.first_id,
+            segment.last_id,
+            segment.row_count,
+            segment.entry_count,
+            segment.previous_checksum,
+            segment.checksum,
+            segment.sha256,
+        )
+    )
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _encode(row):
+    record = dict(zip(ARCHIVE_FIELDS, row))
+    for field in ('created_at', 'first_occurred_at'):
+        if record[field] is not None:
+            record[field] = record[field].isoformat()
+    return (json.dumps(record, separators=(',', ':'), sort_keys=True) + '\n').encode('utf-8')
+
+
+def read_records(segment):
+    with gzip.open(archive_root() / segment.path, 'rt', encoding='utf-8') as handle:
+        for line in handle:
+            yield json.loads(line)
+
+
+def _write_segment(shard, rows, previous):
+    directory = archive_root() / (slugify(shard) or 'legacy')
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp_path = directory / f'.{os.getpid()}.ndjson.gz.tmp'
+    segment = AuditArchiveSegment(
+        shard=shard,
+        row_count=0,
+        entry_count=previous.entry_count if previous else 0,
+        previous_checksum='',
+        checksum=previous.checksum if previous else GENESIS,
+    )
+    with open(tmp_path, 'wb') as raw:
+        # mtime=0 keeps the file byte-identical if a crashed run is repeated for the same rows.
+        with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as handle:
+            for row in rows:
+                record = dict(zip(ARCHIVE_FIELDS, row))
+                if not segment.row_count:
+                    segment.first_id = record['id']
+                    segment.previous_checksum = record['previous_checksum']
+                    segment.min_created_at = segment.max_created_at = record['created_at']
+                segment.last_id = record['id']
+                segment.checksum = record['checksum']
+                segment.min_created_at = min(segment.min_created_at, record['created_at'])
+                segment.max_created_at = max(segment.max_created_at, record['created_at'])
+                segment.row_count += 1
+                handle.write(_encode(row))
+        raw.flush()
+        os.fsync(raw.fileno())
+    if not segment.row_count:
+        tmp_path.unlink()
+        return None
+
+    final_path = directory / f'{segment.first_id:012d}-{segment.last_id:012d}.ndjson.gz'
+    os.replace(tmp_path, final_path)
+    segment.path = final_path.relative_to(archive_root()).as_posix()
+    segment.entry_count += segment.row_count
+    segment.sha256 = file_sha256(final_path)
+    segment.signature = sign(segment_message(segment))
+    return segment
+
+
+def archive_shard(shard, cutoff, segment_rows=None, chunk_size=None):
+    segment_rows = segment_rows or settings.AUDIT_ARCHIVE_SEGMENT_ROWS
+    shard_rows = AuditLog.objects.filter(shard=shard)
+    boundary = shard_rows.filter(created_at__gte=cutoff).order_by('id').values_list('id', flat=True).first()
+    # Only a chain prefix is archived, so the hot rows always continue from the last segment's checksum.
+    if boundary is None:
+        # Every row is expired; rows appended while this runs wait for the next run.
+        expired = shard_rows.filter(id__lte=shard_rows.order_by('-id').values_list('id', flat=True).first())
+    else:
+        expired = shard_rows.filter(id__lt=boundary)
+    previous = AuditArchiveSegment.objects.filter(shard=shard).order_by('-last_id').first()
+
+    segments = []
+    while True:
+        rows = (
+            expired.order_by('id')
+            .values_list(*ARCHIVE_FIELDS)[:segment_rows]
+            .iterator(chunk_size=chunk_size or settings.AUDIT_VERIFY_CHUNK_SIZE)
+        )
+        segment = _write_segment(shard, rows, previous)
+        if segment is None:
+            return segments
+        # The file is on disk before its rows leave the table; a crash in between only leaves a file to overwrite.
+        with transaction.atomic():
+            segment.save()
+            AuditLog.objects.filter(shard=shard, id__gte=segment.first_id, id__lte=segment.last_id).delete()
+        segments.append(segment)
+        previous = segment
+
+
+def archive_audit_logs(retention_days=None, now=None, segment_rows=None):
+    retention_days = settings.AUDIT_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = (now or timezone.now()) - timedelta(days=retention_days)
+    shards = AuditLog.objects.filter(created_at__lt=cutoff).order_by().values_list('shard', flat=True).distinct()
+    segments = []
+    for shard in sorted(shards):
+        segments.extend(archive_shard(shard, cutoff, segment_rows=segment_rows))
+    return segments
+
+
+def archived_start(shard):
+    segment = AuditArchiveSegment.objects.filter(shard=shard).order_by('-last_id').first()
+    if segment is None:
+        return {'after_id': None, 'previous': GENESIS, 'entry_count': 0}
+    return {'after_id': segment.last_id, 'previous': segment.checksum, 'entry_count': segment.entry_count}
+
+
+def verify_segments(shard, contents=False):
+    # The manifests always chain and carry valid signatures; with contents=True every file is re-hashed row by row.
+    result = {'segments': 0, 'rows': 0, 'breaks': []}
+    previous, entry_count = GENESIS, 0
+    for segment in AuditArchiveSegment.objects.filter(shard=shard).order_by('first_id').iterator():
+        result['segments'] += 1
+        if not signature_valid(segment_message(segment), segment.signature):
+            result['breaks'].append({'id': segment.first_id, 'reason': 'archive segment signature does not match'})
+        elif segment.previous_checksum != previous or segment.entry_count != entry_count + segment.row_count:
+            result['breaks'].append({'id': segment.first_id, 'reason': 'archive segment does not extend the one before it'})
+        elif contents:
+            result['breaks'].extend(_verify_segment_file(segment, result))
+        previous, entry_count = segment.checksum, segment.entry_count
+    return result
+
+
+def _verify_segment_file(segment, result):
+    path = archive_root() / segment.path
+    if not path.exists():
+        return [{'id': segment.first_id, 'reason': f'archive file {segment.path} is missing'}]
+    if file_sha256(path) != segment.sha256:
+        return [{'id': segment.first_id, 'reason': f'archive file {segment.path} was modified'}]
+    breaks = []
+    previous, count = segment.previous_checksum, 0
+    for record in read_records(segment):
+        count += 1
+        if record['previous_checksum'] != previous or record['checksum'] != compute_checksum(
+            action=record['action'],
+            entity=record['entity'],
+            entity_id=record['entity_id'],
+            user_id=record['user_id'],
+            description=record['description'],
+            previous_checksum=record['previous_checksum'],
+            occurrences=record['occurrences'],
+        ):
+            breaks.append({'id': record['id'], 'reason': 'archived row does not match its checksum'})
+        previous = record['checksum']
+    result['rows'] += count
+    if count != segment.row_count or previous != segment.checksum:
+        breaks.append({'id': segment.first_id, 'reason': f'archive file {segment.path} does not match its manifest'})
+    return breaks
+
+
+def _archived_log(record):
+    row = AuditLog(
+        id=record['id'],
+        user_id=record['user_id'],
+        action=record['action'],
+        entity=record['entity'],
+        entity_id=record['entity_id'],
+        description=record['description'],
+        ip_address=record['ip_address'],
+        created_at=parse_datetime(record['created_at']),
+        occurrences=record['occurrences'],
+        first_occurred_at=parse_datetime(record['first_occurred_at']) if record['first_occurred_at'] else None,
+        shard=record['shard'],
+        previous_checksum=record['previous_checksum'],
+        checksum=record['checksum'],
+    )
+    row.archived = True
+    return row
+
+
+def _cold_rows(start, end, entities=None, action=None, user_id=None):
+    segments = AuditArchiveSegment.objects.filter(min_created_at__lt=end, max_created_at__gte=start).order_by('first_id')
+    for segment in segments:
+        for record in read_records(segment):
+            if entities is not None and record['entity'] not in entities:
+                continue
+            if (action is not None and record['action'] != action) or (user_id is not None and record['user_id'] != user_id):
+                continue
+            row = _archived_log(record)
+            if start <= row.created_at < end:
+                yield row
+
+
+def _newest_first(row):
+    return row.created_at, row.id
+
+
+def query_audit_logs(start, end, entities=None, action=None, user_id=None, limit=None):
+    """AuditLog rows with start <= created_at < end, newest first, from the table and the archive segments."""
+    hot = AuditLog.objects.select_related('user').filter(created_at__gte=start, created_at__lt=end)
+    if entities is not None:
+        entities = set(entities)
+        hot = hot.filter(entity__in=entities)
+    if action is not None:
+        hot = hot.filter(action=action)
+    if user_id is not None:
+        hot = hot.filter(user_id=user_id)
+    hot = list(hot.order_by('-created_at', '-id')[:limit] if limit else hot.order_by('-created_at', '-id'))
+    for row in hot:
+        row.archived = False
+
+    cold = _cold_rows(start, end, entities, action, user_id)
+    cold = heapq.nlargest(limit, cold, key=_newest_first) if limit else sorted(cold, key=_newest_first, reverse=True)
+    users = get_user_model().objects.in_bulk({row.user_id for row in cold if row.user_id})
+    for row in cold:
+        row.user = users.get(row.user_id)
+
+    rows = heapq.merge(hot, cold, key=_newest_first, reverse=True)
+    return list(islice(rows, limit) if limit else rows)
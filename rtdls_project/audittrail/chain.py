@@ -0,0 +1,147 @@
+import hashlib
+import hmac
+import os
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import AuditChainHead, AuditCheckpoint, AuditLog, compute_checksum
+
+GENESIS = 'GENESIS'
+CHAIN_RETRIES = 5
+
+
+class ChainConflict(Exception):
+    pass
+
+
+def worker_shard():
+    # A fixed pool of slots keeps the head table (and every checkpoint) bounded across restarts and scale-outs.
+    # Processes that land on the same slot simply share a head; writers lock it, so the chain still never forks.
+    slot = settings.AUDIT_WORKER_SLOT
+    if slot is None:
+        slot = os.getpid() % settings.AUDIT_WORKER_SLOTS
+    return f'worker-{slot}'
+
+
+def shard_for(row):
+    if settings.AUDIT_CHAIN_SHARDING == 'worker':
+        return worker_shard()
+    return row.entity.lower()[:64]
+
+
+def _locked_heads(shards):
+    # Locked in shard order, so two writers touching the same shards cannot deadlock.
+    heads = {
+        head.shard: head
+        for head in AuditChainHead.objects.select_for_update().filter(shard__in=shards).order_by('shard')
+    }
+    missing = [shard for shard in shards if shard not in heads]
+    if missing:
+        AuditChainHead.objects.bulk_create([AuditChainHead(shard=shard) for shard in missing], ignore_conflicts=True)
+        heads = {
+            head.shard: head
+            for head in AuditChainHead.objects.select_for_update().filter(shard__in=shards).order_by('shard')
+        }
+    return heads
+
+
+def _append(rows):
+    by_shard = {}
+    for row in rows:
+        row.shard = row.shard or shard_for(row)
+        by_shard.setdefault(row.shard, []).append(row)
+
+    heads = _locked_heads(sorted(by_shard))
+    for shard, shard_rows in by_shard.items():
+        previous = heads[shard].checksum
+        for row in shard_rows:
+            row.previous_checksum = previous
+            row.checksum = compute_checksum(
+                action=row.action,
+                entity=row.entity,
+                entity_id=row.entity_id,
+                user_id=row.user_id,
+                description=row.description,
+                previous_checksum=previous,
+                occurrences=row.occurrences,
+            )
+            previous = row.checksum
+    AuditLog.objects.bulk_create(rows, batch_size=settings.AUDIT_BATCH_SIZE)
+
+    for shard, shard_rows in by_shard.items():
+        head = heads[shard]
+        # Compare-and-swap: row locks make this a formality on PostgreSQL, while on SQLite it catches a concurrent writer.
+        moved = AuditChainHead.objects.filter(pk=head.pk, checksum=head.checksum).update(
+            checksum=shard_rows[-1].checksum,
+            entry_count=head.entry_count + len(shard_rows),
+            last_entry_id=shard_rows[-1].pk,
+        )
+        if not moved:
+            raise ChainConflict(shard)
+    return rows
+
+
+def append_rows(rows):
+    if not rows:
+        return []
+    for attempt in range(CHAIN_RETRIES):
+        try:
+            with transaction.atomic():
+                return _append(rows)
+        except ChainConflict:
+            for row in rows:
+                row.pk = None
+                row._state.adding = True
+            if attempt == CHAIN_RETRIES - 1:
+                raise
+
+
+def merkle_root(leaves):
+    level = [bytes.fromhex(leaf) for leaf in leaves] or [hashlib.sha256(b'').digest()]
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [hashlib.sha256(level[idx] + level[idx + 1]).digest() for idx in range(0, len(level), 2)]
+    return level[0].hex()
+
+
+def head_leaf(shard, checksum, entry_count):
+    return hashlib.sha256(f'{shard}|{entry_count}|{checksum}'.encode('utf-8')).hexdigest()
+
+
+def checkpoint_checksum(previous_checksum, root):
+    return hashlib.sha256(f'{previous_checksum}|{root}'.encode('utf-8')).hexdigest()
+
+
+def sign(message):
+    return hmac.new(settings.AUDIT_SIGNING_KEY.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def signature_valid(message, signature):
+    return hmac.compare_digest(sign(message), signature or '')
+
+
+def create_checkpoint(force=False):
+    heads = [
+        [head.shard, head.checksum, head.entry_count, head.last_entry_id]
+        for head in AuditChainHead.objects.order_by('shard')
+    ]
+    root = merkle_root([head_leaf(shard, checksum, count) for shard, checksum, count, _last_id in heads])
+    latest = AuditCheckpoint.objects.order_by('-id').first()
+    if latest and latest.merkle_root == root and not force:
+        return None
+    previous = latest.checksum if latest else GENESIS
+    checksum = checkpoint_checksum(previous, root)
+    try:
+        with transaction.atomic():
+            return AuditCheckpoint.objects.create(
+                merkle_root=root,
+                heads=heads,
+                previous_checksum=previous,
+                checksum=checksum,
+                signature=sign(checksum),
+            )
+    except IntegrityError:
+        # Another worker checkpointed from the same predecessor first.
+        return None
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from audittrail.archive import archive_audit_logs
+
+
+class Command(BaseCommand):
+    help = 'Moves audit rows older than the retention window into compressed, append-only segment files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Retention window in days (defaults to AUDIT_RETENTION_DAYS).',
+        )
+        parser.add_argument('--segment-rows', type=int, default=None, help='Maximum rows per segment file.')
+
+    def handle(self, *args, **options):
+        segments = archive_audit_logs(retention_days=options['days'], segment_rows=options['segment_rows'])
+        for segment in segments:
+            self.stdout.write(f'{segment.path}: {segment.row_count} row(s), #{segment.first_id}-#{segment.last_id}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Archived {sum(segment.row_count for segment in segments)} audit row(s) '
+                f'into {len(segments)} segment(s).'
+            )
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from audittrail.chain import create_checkpoint
+
+
+class Command(BaseCommand):
+    help = 'Records a Merkle-root checkpoint over every audit shard head.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Write a checkpoint even if no shard head moved since the last one.',
+        )
+
+    def handle(self, *args, **options):
+        checkpoint = create_checkpoint(force=options['force'])
+        if checkpoint is None:
+            self.stdout.write('No shard head moved since the last checkpoint.')
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Checkpoint #{checkpoint.id}: root {checkpoint.merkle_root} over {len(checkpoint.heads)} shard(s).'
+            )
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from audittrail.aggregation import AuditAggregator
+from audittrail.writer import AuditWriter, write_entries
+
+
+class Command(BaseCommand):
+    help = 'Writes audit entries left in the spool directory by stopped processes into the hash chain.'
+
+    def handle(self, *args, **options):
+        writer = AuditWriter(background=False)
+        segments = writer.recover()
+        written = writer.flush()
+        aggregator = AuditAggregator(emit=write_entries, background=False)
+        windows = aggregator.recover()
+        summaries = aggregator.flush()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Replayed {len(segments)} spool segment(s) and wrote {written} audit entries. '
+                f'Replayed {len(windows)} aggregate window(s) and wrote {summaries} summary row(s).'
+            )
+        )
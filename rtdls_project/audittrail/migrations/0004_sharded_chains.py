@@ -0,0 +1,67 @@
+# Generated by Django 4.2.17 on 2026-10-17 16:13
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def seed_legacy_head(apps, schema_editor):
+    # Rows written before sharding form one global chain; its head becomes the '' shard.
+    AuditLog = apps.get_model('audittrail', 'AuditLog')
+    AuditChainHead = apps.get_model('audittrail', 'AuditChainHead')
+    latest = AuditLog.objects.order_by('-id').first()
+    if latest is None:
+        return
+    AuditChainHead.objects.create(
+        shard='',
+        checksum=latest.checksum,
+        entry_count=AuditLog.objects.count(),
+        last_entry_id=latest.id,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audittrail', '0003_auditlog_created_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditChainHead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.CharField(max_length=64, unique=True)),
+                ('checksum', models.CharField(default='GENESIS', max_length=64)),
+                ('entry_count', models.PositiveBigIntegerField(default=0)),
+                ('last_entry_id', models.BigIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['shard'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AuditCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('merkle_root', models.CharField(max_length=64)),
+                ('heads', models.JSONField(default=list)),
+                ('previous_checksum', models.CharField(max_length=64, unique=True)),
+                ('checksum', models.CharField(editable=False, max_length=64)),
+            ],
+            options={
+                'ordering': ['-id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='shard',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['shard', 'id'], name='auditlog_shard_id_idx'),
+        ),
+        migrations.RunPython(seed_legacy_head, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.17 on 2026-10-17 16:18
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def sign_existing_checkpoints(apps, schema_editor):
+    # Checkpoints written before signing existed are signed as found; their hash linkage is still verified.
+    from audittrail.chain import sign
+
+    AuditCheckpoint = apps.get_model('audittrail', 'AuditCheckpoint')
+    for checkpoint in AuditCheckpoint.objects.filter(signature='').only('id', 'checksum'):
+        AuditCheckpoint.objects.filter(pk=checkpoint.pk).update(signature=sign(checkpoint.checksum))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audittrail', '0004_sharded_chains'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditVerificationCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.CharField(max_length=64)),
+                ('entry_id', models.BigIntegerField()),
+                ('entry_count', models.PositiveBigIntegerField()),
+                ('checksum', models.CharField(max_length=64)),
+                ('signature', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+            ],
+            options={
+                'ordering': ['shard', '-entry_id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='auditcheckpoint',
+            name='signature',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='auditverificationcheckpoint',
+            constraint=models.UniqueConstraint(fields=('shard', 'entry_id'), name='auditverify_shard_entry_uniq'),
+        ),
+        migrations.RunPython(sign_existing_checkpoints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.17 on 2026-10-17 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audittrail', '0005_verification_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='occurrences',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='first_occurred_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.17 on 2026-10-17 17:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audittrail', '0006_auditlog_occurrences'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditArchiveSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.CharField(max_length=64)),
+                ('path', models.CharField(max_length=255)),
+                ('first_id', models.BigIntegerField()),
+                ('last_id', models.BigIntegerField()),
+                ('row_count', models.PositiveIntegerField()),
+                ('entry_count', models.PositiveBigIntegerField()),
+                ('min_created_at', models.DateTimeField()),
+                ('max_created_at', models.DateTimeField()),
+                ('previous_checksum', models.CharField(max_length=64)),
+                ('checksum', models.CharField(max_length=64)),
+                ('sha256', models.CharField(max_length=64)),
+                ('signature', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+            ],
+            options={
+                'ordering': ['shard', 'first_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='auditarchivesegment',
+            index=models.Index(fields=['min_created_at', 'max_created_at'], name='auditarchive_span_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='auditarchivesegment',
+            constraint=models.UniqueConstraint(fields=('shard', 'first_id'), name='auditarchive_shard_first_uniq'),
+        ),
+    ]
@@ -1,6 +1,23 @@
 import hashlib
 from django.conf import settings
-from django.db import models
+from django.db import DEFAULT_DB_ALIAS, models
+from django.utils import timezone
+
+
+def compute_checksum(*, action, entity, entity_id, user_id, description, previous_checksum, occurrences=1):
+    parts = [
+        action,
+        entity,
+        str(entity_id or ''),
+        str(user_id or ''),
+        description,
+        previous_checksum,
+    ]
+    # Only summary rows hash their count, so every single-event row keeps its original checksum.
+    if occurrences != 1:
+        parts.append(str(occurrences))
+    payload = '|'.join(parts)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
 
 class AuditLog(models.Model):
@@ -19,40 +36,133 @@ class AuditLog(models.Model):
     entity_id = models.PositiveIntegerField(null=True, blank=True)
     description = models.TextField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the action happens, not when a batched writer flushes the row.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Aggregated rows summarize `occurrences` events from first_occurred_at through created_at.
+    occurrences = models.PositiveIntegerField(default=1)
+    first_occurred_at = models.DateTimeField(null=True, blank=True)
+    # Rows chain only to earlier rows of the same shard; '' is the single chain that predates sharding.
+    shard = models.CharField(max_length=64, blank=True, default='')
     previous_checksum = models.CharField(max_length=64, blank=True)
     checksum = models.CharField(max_length=64, editable=False)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='auditlog_created_idx'),
+            models.Index(fields=['entity', '-created_at'], name='auditlog_entity_created_idx'),
+            models.Index(fields=['shard', 'id'], name='auditlog_shard_id_idx'),
+        ]
 
     def __str__(self):
         return f'{self.created_at} - {self.action} - {self.entity}'
 
-    def save(self, *args, **kwargs):
-        if not self.previous_checksum:
-            latest = AuditLog.objects.exclude(pk=self.pk).order_by('-id').first()
-            self.previous_checksum = latest.checksum if latest else 'GENESIS'
-        payload = '|'.join(
-            [
-                self.action,
-                self.entity,
-                str(self.entity_id or ''),
-                str(self.user_id or ''),
-                self.description,
-                self.previous_checksum,
-            ]
-        )
-        self.checksum = hashlib.sha256(payload.encode('utf-8')).hexdigest()
-        super().save(*args, **kwargs)
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        # New rows are chained by append_rows, which bulk-inserts them on the default database under the shard
+        # head lock. That path sends no pre_save/post_save signals, so it refuses options it would otherwise drop.
+        if self.pk is None:
+            if (using or DEFAULT_DB_ALIAS) != DEFAULT_DB_ALIAS or force_update or update_fields is not None:
+                raise ValueError(
+                    'New audit rows are chained on the default database; using, force_update and update_fields are not supported.'
+                )
+            from .chain import append_rows
+
+            append_rows([self])
+            return
+        super().save(force_insert=force_insert, force_update=force_update, using=using, update_fields=update_fields)
+
+
+class AuditChainHead(models.Model):
+    shard = models.CharField(max_length=64, unique=True)
+    checksum = models.CharField(max_length=64, default='GENESIS')
+    entry_count = models.PositiveBigIntegerField(default=0)
+    last_entry_id = models.BigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['shard']
+
+    def __str__(self):
+        return f'{self.shard or "legacy"} @ {self.entry_count}'
+
+
+class AuditCheckpoint(models.Model):
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    merkle_root = models.CharField(max_length=64)
+    # [[shard, head checksum, entry count, last entry id], ...] sorted by shard: the Merkle leaves.
+    heads = models.JSONField(default=list)
+    # Unique, so two workers checkpointing at once cannot fork the checkpoint chain.
+    previous_checksum = models.CharField(max_length=64, unique=True)
+    checksum = models.CharField(max_length=64, editable=False)
+    signature = models.CharField(max_length=64, blank=True, editable=False)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return f'{self.created_at} - {self.merkle_root[:12]}'
+
+
+class AuditVerificationCheckpoint(models.Model):
+    # A signed statement that a shard verified clean from GENESIS through entry_id; later runs resume from it.
+    shard = models.CharField(max_length=64)
+    entry_id = models.BigIntegerField()
+    entry_count = models.PositiveBigIntegerField()
+    checksum = models.CharField(max_length=64)
+    signature = models.CharField(max_length=64)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        ordering = ['shard', '-entry_id']
+        constraints = [
+            models.UniqueConstraint(fields=['shard', 'entry_id'], name='auditverify_shard_entry_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.shard or "legacy"} through #{self.entry_id}'
+
+
+class AuditArchiveSegment(models.Model):
+    # One gzip'd NDJSON file holding a contiguous prefix of a shard chain; the hot table continues from `checksum`.
+    shard = models.CharField(max_length=64)
+    path = models.CharField(max_length=255)
+    first_id = models.BigIntegerField()
+    last_id = models.BigIntegerField()
+    row_count = models.PositiveIntegerField()
+    # Position in the shard chain after last_id, so verification can start here instead of at GENESIS.
+    entry_count = models.PositiveBigIntegerField()
+    min_created_at = models.DateTimeField()
+    max_created_at = models.DateTimeField()
+    previous_checksum = models.CharField(max_length=64)
+    checksum = models.CharField(max_length=64)
+    sha256 = models.CharField(max_length=64)
+    signature = models.CharField(max_length=64)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        ordering = ['shard', 'first_id']
+        constraints = [
+            models.UniqueConstraint(fields=['shard', 'first_id'], name='auditarchive_shard_first_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['min_created_at', 'max_created_at'], name='auditarchive_span_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.shard or "legacy"} #{self.first_id}-#{self.last_id}'
 
 
 def log_action(*, user, action, entity, entity_id, description, ip_address=None):
-    AuditLog.objects.create(
-        user=user,
-        action=action,
-        entity=entity,
-        entity_id=entity_id,
-        description=description,
-        ip_address=ip_address,
+    from .writer import submit
+
+    submit(
+        {
+            'user_id': getattr(user, 'pk', None),
+            'action': str(action),
+            'entity': entity,
+            'entity_id': entity_id,
+            'description': description,
+            'ip_address': ip_address,
+            'created_at': timezone.now().isoformat(),
+        }
     )
@@ -0,0 +1,109 @@
+from collections import Counter
+import json
+import logging
+import os
+import threading
+
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Segments written or claimed by any writer in this process; other files carrying this pid belong to a dead process.
+_process_segments = set()
+_process_segments_lock = threading.Lock()
+
+
+def own_segment(path):
+    with _process_segments_lock:
+        _process_segments.add(path)
+
+
+def release_segment(path):
+    with _process_segments_lock:
+        _process_segments.discard(path)
+
+
+def claim_segment(path):
+    # Renaming is atomic, so of two processes replaying the same orphan only one finds it; the other skips it.
+    # The claimed name keeps the creation time (and ordering) and carries our pid, so it is orphaned again if we die.
+    _pid, _sep, created = path.stem.partition('-')
+    claimed = path.with_name(f'{os.getpid()}-{created}{path.suffix}')
+    own_segment(claimed)
+    try:
+        os.rename(path, claimed)
+    except FileNotFoundError:
+        release_segment(claimed)
+        return None
+    return claimed
+
+
+def _process_alive(pid):
+    if pid == os.getpid():
+        return False
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def claim_orphans(spool_dir, suffix):
+    with _process_segments_lock:
+        owned = set(_process_segments)
+    orphaned = []
+    for path in spool_dir.glob(f'*{suffix}') if spool_dir.exists() else []:
+        pid, _sep, created = path.stem.partition('-')
+        if path in owned or not (pid.isdigit() and created.isdigit()) or _process_alive(int(pid)):
+            continue
+        orphaned.append((int(created), path))
+    claimed = [claim_segment(path) for _created, path in sorted(orphaned)]
+    return [path for path in claimed if path is not None]
+
+
+def read_segment(path):
+    entries = []
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A torn final line means the process died mid-append; that entry was never acknowledged.
+                logger.warning('Skipping unreadable audit spool line in %s', path)
+    return entries
+
+
+def _entry_key(entry):
+    return (
+        parse_datetime(entry['created_at']),
+        entry['action'],
+        entry['entity'],
+        entry['entity_id'],
+        entry['user_id'],
+        entry['description'],
+    )
+
+
+def unwritten_entries(entries):
+    # A segment can outlive its commit if the process died before unlinking it; skip rows already chained.
+    # Identical events logged in the same instant are distinct entries, so each committed row cancels one copy.
+    if not entries:
+        return []
+    keys = [_entry_key(entry) for entry in entries]
+    written = Counter(
+        AuditLog.objects.filter(created_at__in={key[0] for key in keys}).values_list(
+            'created_at', 'action', 'entity', 'entity_id', 'user_id', 'description'
+        )
+    )
+    unwritten = []
+    for entry, key in zip(entries, keys):
+        if written[key]:
+            written[key] -= 1
+        else:
+            unwritten.append(entry)
+    return unwritten
@@ -0,0 +1,595 @@
+from datetime import timedelta
+import gzip
+from io import StringIO
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from audittrail import chain, writer
+from audittrail.aggregation import AuditAggregator
+from audittrail.archive import archive_audit_logs, archive_root, query_audit_logs
+from audittrail.models import (
+    AuditArchiveSegment,
+    AuditChainHead,
+    AuditCheckpoint,
+    AuditLog,
+    AuditVerificationCheckpoint,
+    compute_checksum,
+    log_action,
+)
+from audittrail.verification import split_range, verify_audit_chain
+from audittrail.spool import read_segment, unwritten_entries
+from audittrail.writer import AuditWriter, write_entries
+
+User = get_user_model()
+
+
+class ChainAssertions:
+    def assertChainIntact(self):
+        previous = {}
+        for row in AuditLog.objects.order_by('id'):
+            self.assertEqual(row.previous_checksum, previous.get(row.shard, 'GENESIS'))
+            expected = compute_checksum(
+                action=row.action,
+                entity=row.entity,
+                entity_id=row.entity_id,
+                user_id=row.user_id,
+                description=row.description,
+                previous_checksum=row.previous_checksum,
+                occurrences=row.occurrences,
+            )
+            self.assertEqual(row.checksum, expected)
+            previous[row.shard] = row.checksum
+        heads = {head.shard: (head.checksum, head.entry_count) for head in AuditChainHead.objects.all()}
+        counts = {shard: AuditLog.objects.filter(shard=shard).count() for shard in previous}
+        self.assertEqual(heads, {shard: (previous[shard], counts[shard]) for shard in previous})
+
+
+class AsyncAuditWriterTests(ChainAssertions, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='auditor', password='StrongPass123!', role='auditor')
+        self.spool_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.spool_dir, ignore_errors=True)
+
+    def _writer(self):
+        return AuditWriter(spool_dir=self.spool_dir, background=False)
+
+    def _log(self, idx):
+        log_action(
+            user=self.user,
+            action=AuditLog.Action.VIEW,
+            entity='Dashboard',
+            entity_id=idx,
+            description=f'Viewed dashboard {idx}',
+        )
+
+    @override_settings(AUDIT_ASYNC_WRITES=True)
+    def test_entries_are_spooled_then_chained_in_one_batch(self):
+        writer = self._writer()
+        with patch('audittrail.writer.get_writer', return_value=writer):
+            with self.assertNumQueries(0):
+                for idx in range(25):
+                    self._log(idx)
+        self.assertEqual(sum(1 for _line in next(self.spool_dir.glob('*.ndjson')).open()), 25)
+
+        # Head lookup, head creation and re-lock on first use, one bulk insert and one head update.
+        with self.assertNumQueries(7):
+            self.assertEqual(writer.flush(), 25)
+        self.assertEqual(AuditLog.objects.count(), 25)
+        self.assertEqual(list(self.spool_dir.glob('*.ndjson')), [])
+        self.assertChainIntact()
+
+        with patch('audittrail.writer.get_writer', return_value=writer):
+            self._log(99)
+        self.assertEqual(writer.flush(), 1)
+        self.assertChainIntact()
+
+    @override_settings(AUDIT_ASYNC_WRITES=True)
+    def test_spool_left_by_a_dead_process_is_replayed_once(self):
+        crashed = self._writer()
+        with patch('audittrail.writer.get_writer', return_value=crashed):
+            for idx in range(3):
+                self._log(idx)
+        crashed.segment.close()
+        segment = next(self.spool_dir.glob('*.ndjson'))
+        dead_segment = segment.with_name(f'999999999-{segment.stem.split("-")[1]}.ndjson')
+        segment.rename(dead_segment)
+        leftover = dead_segment.read_text()
+
+        output = StringIO()
+        with override_settings(AUDIT_SPOOL_DIR=str(self.spool_dir)):
+            call_command('flush_audit_spool', stdout=output)
+        self.assertIn('Replayed 1 spool segment(s) and wrote 3 audit entries.', output.getvalue())
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+        # The process died after committing but before deleting its segment.
+        dead_segment.write_text(leftover + '{"torn')
+        self.assertEqual(self._writer().flush(), 0)
+        self.assertEqual(AuditLog.objects.count(), 3)
+        self.assertFalse(dead_segment.exists())
+        self.assertChainIntact()
+
+    @override_settings(AUDIT_ASYNC_WRITES=True)
+    def test_identical_entries_are_replayed_one_for_one(self):
+        writer = self._writer()
+        instant = timezone.now()
+        with patch('audittrail.writer.get_writer', return_value=writer):
+            with patch('django.utils.timezone.now', return_value=instant):
+                for _idx in range(3):
+                    self._log(1)
+        writer.segment.close()
+        entries = read_segment(next(self.spool_dir.glob('*.ndjson')))
+        self.assertEqual(len({json.dumps(entry, sort_keys=True) for entry in entries}), 1)
+
+        # One copy committed before the process died; the other two still need writing.
+        write_entries(entries[:1])
+        self.assertEqual(len(unwritten_entries(entries)), 2)
+        write_entries(unwritten_entries(entries))
+        self.assertEqual(unwritten_entries(entries), [])
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+    def test_new_rows_reject_save_options_the_chain_cannot_honour(self):
+        row = AuditLog(user=self.user, action=AuditLog.Action.VIEW, entity='Dashboard', description='Viewed')
+        with self.assertRaises(ValueError):
+            row.save(using='replica')
+        row.save()
+        self.assertEqual(AuditLog.objects.get().shard, 'dashboard')
+
+    @override_settings(AUDIT_ASYNC_WRITES=True)
+    def test_orphaned_segment_is_claimed_by_one_replayer_only(self):
+        crashed = self._writer()
+        with patch('audittrail.writer.get_writer', return_value=crashed):
+            for idx in range(3):
+                self._log(idx)
+        crashed.segment.close()
+        segment = next(self.spool_dir.glob('*.ndjson'))
+        created = segment.stem.split('-')[1]
+        segment.rename(segment.with_name(f'999999999-{created}.ndjson'))
+
+        first, second = self._writer(), self._writer()
+        claimed = first.recover()
+        self.assertEqual([path.name for path in claimed], [f'{os.getpid()}-{created}.ndjson'])
+        self.assertEqual(second.recover(), [])
+
+        # Another live process renamed the file between our directory scan and our claim.
+        orphan = claimed[0].rename(claimed[0].with_name(f'999999999-{created}.ndjson'))
+        with patch('audittrail.spool.os.rename', side_effect=FileNotFoundError):
+            self.assertEqual(self._writer().recover(), [])
+        orphan.rename(claimed[0])
+
+        self.assertEqual(first.flush(), 3)
+        self.assertEqual(second.flush(), 0)
+        self.assertEqual(AuditLog.objects.count(), 3)
+        self.assertChainIntact()
+
+    def test_synchronous_mode_writes_immediately(self):
+        self._log(1)
+        with self.assertNumQueries(5):
+            self._log(2)
+        self.assertEqual(AuditLog.objects.count(), 2)
+        self.assertChainIntact()
+
+
+class ShardedAuditChainTests(ChainAssertions, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='chainadmin', password='StrongPass123!', role='admin')
+
+    def _log(self, entity, idx):
+        log_action(
+            user=self.user,
+            action=AuditLog.Action.UPDATE,
+            entity=entity,
+            entity_id=idx,
+            description=f'Updated {entity} #{idx}',
+        )
+
+    def test_each_entity_extends_its_own_chain(self):
+        for idx in range(3):
+            self._log('FlightLog', idx)
+            self._log('Aircraft', idx)
+        AuditLog.objects.create(user=self.user, action=AuditLog.Action.VIEW, entity='Dashboard', description='Viewed')
+
+        firsts = AuditLog.objects.filter(previous_checksum='GENESIS').values_list('shard', flat=True)
+        self.assertEqual(sorted(firsts), ['aircraft', 'dashboard', 'flightlog'])
+        self.assertChainIntact()
+
+    @override_settings(AUDIT_CHAIN_SHARDING='worker', AUDIT_WORKER_SLOTS=3, AUDIT_WORKER_SLOT=None)
+    def test_worker_sharding_reuses_a_fixed_set_of_heads(self):
+        # Every process id, including those of restarted workers, lands on one of the configured slots.
+        for pid in range(4100, 4110):
+            with patch('audittrail.chain.os.getpid', return_value=pid):
+                self._log('FlightLog', pid)
+        self.assertEqual(sorted(AuditChainHead.objects.values_list('shard', flat=True)), ['worker-0', 'worker-1', 'worker-2'])
+        self.assertChainIntact()
+
+        with override_settings(AUDIT_WORKER_SLOT=1):
+            self.assertEqual(chain.worker_shard(), 'worker-1')
+
+    def test_head_moved_by_another_writer_is_retried(self):
+        self._log('FlightLog', 1)
+        locked_heads = chain._locked_heads
+        calls = []
+
+        def stale_heads(shards):
+            heads = locked_heads(shards)
+            if not calls:
+                heads['flightlog'].checksum = 'f' * 64
+            calls.append(shards)
+            return heads
+
+        with patch('audittrail.chain._locked_heads', side_effect=stale_heads):
+            self._log('FlightLog', 2)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(AuditLog.objects.count(), 2)
+        self.assertChainIntact()
+
+    def test_checkpoints_chain_merkle_roots_of_shard_heads(self):
+        self._log('FlightLog', 1)
+        self._log('Aircraft', 1)
+        first = chain.create_checkpoint()
+        heads = list(AuditChainHead.objects.order_by('shard'))
+        self.assertEqual(
+            first.merkle_root,
+            chain.merkle_root([chain.head_leaf(head.shard, head.checksum, head.entry_count) for head in heads]),
+        )
+        self.assertEqual(first.previous_checksum, 'GENESIS')
+        self.assertIsNone(chain.create_checkpoint())
+
+        self._log('Aircraft', 2)
+        second = chain.create_checkpoint()
+        self.assertNotEqual(second.merkle_root, first.merkle_root)
+        self.assertEqual(second.previous_checksum, first.checksum)
+        self.assertEqual(second.checksum, chain.checkpoint_checksum(first.checksum, second.merkle_root))
+
+        output = StringIO()
+        call_command('create_audit_checkpoint', '--force', stdout=output)
+        self.assertIn('Checkpoint', output.getvalue())
+        self.assertEqual(AuditCheckpoint.objects.count(), 3)
+
+
+class InlineExecutor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def map(self, fn, iterable):
+        return map(fn, iterable)
+
+
+@override_settings(AUDIT_VERIFY_CHECKPOINT_ROWS=5)
+class AuditChainVerificationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='verifier', password='StrongPass123!', role='auditor')
+        for idx in range(12):
+            self._log('FlightLog', idx)
+        for idx in range(3):
+            self._log('Aircraft', idx)
+
+    def _log(self, entity, idx):
+        log_action(
+            user=self.user,
+            action=AuditLog.Action.UPDATE,
+            entity=entity,
+            entity_id=idx,
+            description=f'Updated {entity} #{idx}',
+        )
+
+    def _shard(self, report, shard):
+        return next(item for item in report['shards'] if item['shard'] == shard)
+
+    def _flightlog_ids(self):
+        return list(AuditLog.objects.filter(shard='flightlog').order_by('id').values_list('id', flat=True))
+
+    def test_clean_run_records_signed_checkpoints_and_later_runs_resume(self):
+        report = verify_audit_chain()
+        self.assertTrue(report['ok'])
+        self.assertEqual(self._shard(report, 'flightlog')['rows'], 12)
+        ids = self._flightlog_ids()
+        marks = AuditVerificationCheckpoint.objects.filter(shard='flightlog').order_by('entry_id')
+        self.assertEqual([mark.entry_id for mark in marks], [ids[4], ids[9], ids[11]])
+        self.assertEqual([mark.entry_count for mark in marks], [5, 10, 12])
+
+        self._log('FlightLog', 12)
+        self._log('FlightLog', 13)
+        report = verify_audit_chain()
+        flightlog = self._shard(report, 'flightlog')
+        self.assertTrue(report['ok'])
+        self.assertEqual((flightlog['resumed_from'], flightlog['rows'], flightlog['entry_count']), (ids[11], 2, 14))
+        self.assertEqual(self._shard(report, 'aircraft')['rows'], 0)
+
+    def test_edited_row_is_located_and_its_checkpoint_is_not_trusted(self):
+        verify_audit_chain()
+        ids = self._flightlog_ids()
+        AuditLog.objects.filter(pk=ids[11]).update(description='Nothing happened here')
+        AuditVerificationCheckpoint.objects.filter(shard='flightlog', entry_id=ids[9]).update(signature='0' * 64)
+
+        flightlog = self._shard(verify_audit_chain(), 'flightlog')
+        self.assertFalse(flightlog['ok'])
+        self.assertEqual(flightlog['resumed_from'], ids[4])
+        self.assertEqual(
+            [item['reason'] for item in flightlog['rejected_checkpoints']],
+            ['row no longer matches the checkpoint', 'signature does not match'],
+        )
+        self.assertEqual(flightlog['breaks'], [{'id': ids[11], 'reason': 'checksum does not match the row contents'}])
+
+        full = self._shard(verify_audit_chain(resume=False), 'flightlog')
+        self.assertEqual((full['resumed_from'], full['rows'], full['break_count']), (None, 12, 1))
+
+    def test_parallel_ranges_are_joined_at_their_boundaries(self):
+        ids = self._flightlog_ids()
+        self.assertEqual(split_range('flightlog', None, ids[-1], 3), [(None, ids[3]), (ids[3], ids[7]), (ids[7], ids[-1])])
+
+        with patch('audittrail.verification._executor', return_value=InlineExecutor()):
+            report = verify_audit_chain(resume=False, workers=3)
+        self.assertTrue(report['ok'])
+        self.assertEqual(self._shard(report, 'flightlog')['rows'], 12)
+
+        # Internally consistent, but no longer linked to the row before it: only the join can see that.
+        row = AuditLog.objects.get(pk=ids[4])
+        forged = compute_checksum(
+            action=row.action,
+            entity=row.entity,
+            entity_id=row.entity_id,
+            user_id=row.user_id,
+            description=row.description,
+            previous_checksum='f' * 64,
+        )
+        AuditLog.objects.filter(pk=row.pk).update(previous_checksum='f' * 64, checksum=forged)
+        with patch('audittrail.verification._executor', return_value=InlineExecutor()):
+            report = verify_audit_chain(resume=False, workers=3)
+        self.assertFalse(report['ok'])
+        self.assertEqual(
+            self._shard(report, 'flightlog')['breaks'][0],
+            {'id': ids[4], 'reason': 'previous_checksum does not match the preceding row'},
+        )
+
+    def test_merkle_checkpoints_are_verified(self):
+        chain.create_checkpoint()
+        self._log('Aircraft', 3)
+        latest = chain.create_checkpoint()
+        checkpoints = verify_audit_chain()['checkpoints']
+        self.assertEqual((checkpoints['ok'], checkpoints['checked']), (True, 2))
+
+        AuditCheckpoint.objects.filter(pk=latest.pk).update(signature='0' * 64)
+        checkpoints = verify_audit_chain()['checkpoints']
+        self.assertEqual(checkpoints['breaks'], [{'id': latest.id, 'reason': 'signature does not match'}])
+
+    def test_command_and_api(self):
+        output = StringIO()
+        call_command('verify_audit_chain', '--full', stdout=output)
+        self.assertIn('flightlog: 12 row(s) verified, 12 in chain', output.getvalue())
+        self.assertIn('Audit chain verified.', output.getvalue())
+
+        self.client.force_login(self.user)
+        response = self.client.post('/api/audit/verify/', {'shards': 'aircraft'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['shard'] for item in response.json()['shards']], ['aircraft'])
+
+        response = self.client.post('/api/audit/verify/', {'full': True}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('verify_audit_chain --full', response.json()['detail'])
+
+        # Editing the row under the newest resume point rejects it, so the resumed API run re-reads the shard.
+        AuditLog.objects.filter(shard='aircraft', entity_id=2).update(entity_id=7)
+        response = self.client.post('/api/audit/verify/', content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        with self.assertRaises(CommandError):
+            call_command('verify_audit_chain', '--full', stdout=StringIO(), stderr=StringIO())
+
+        pilot = User.objects.create_user(username='ops-verify', password='StrongPass123!', role='flight_ops')
+        self.client.force_login(pilot)
+        self.assertEqual(self.client.post('/api/audit/verify/').status_code, 403)
+
+
+@override_settings(AUDIT_AGGREGATE_ACTIONS=['view', 'create:FlightData'])
+class AuditAggregationTests(ChainAssertions, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer', password='StrongPass123!', role='commander')
+        self.spool_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.spool_dir, ignore_errors=True)
+        self.aggregator = self._aggregator()
+        patcher = patch('audittrail.writer.get_aggregator', return_value=self.aggregator)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _aggregator(self):
+        return AuditAggregator(emit=writer.write_entries, window_seconds=300, spool_dir=self.spool_dir, background=False)
+
+    def _log(self, action, entity, description, user=None):
+        log_action(user=user or self.user, action=action, entity=entity, entity_id=None, description=description)
+
+    def _orphan_window(self):
+        # What a killed worker leaves behind: its open window, under a pid that no longer exists.
+        self.aggregator.current['handle'].close()
+        path = self.aggregator.current['path']
+        return path.rename(path.with_name(f'999999999-{path.stem.split("-")[1]}{path.suffix}'))
+
+    def test_window_of_a_killed_process_is_replayed_once(self):
+        for _idx in range(5):
+            self._log(AuditLog.Action.VIEW, 'Dashboard', 'Viewed dashboard')
+        orphan = self._orphan_window()
+        leftover = orphan.read_text()
+        self.assertFalse(AuditLog.objects.exists())
+
+        self.assertEqual(self._aggregator().flush(), 1)
+        self.assertEqual(AuditLog.objects.get().occurrences, 5)
+        self.assertFalse(orphan.exists())
+
+        # The process died after the summary committed but before deleting its window.
+        orphan.write_text(leftover)
+        output = StringIO()
+        with override_settings(AUDIT_SPOOL_DIR=str(self.spool_dir)):
+            call_command('flush_audit_spool', stdout=output)
+        self.assertIn('Replayed 1 aggregate window(s) and wrote 0 summary row(s).', output.getvalue())
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertFalse(orphan.exists())
+        self.assertChainIntact()
+
+    def test_failed_summary_write_keeps_the_window_spooled(self):
+        for _idx in range(3):
+            self._log(AuditLog.Action.VIEW, 'Dashboard', 'Viewed dashboard')
+        with patch.object(self.aggregator, 'emit', side_effect=RuntimeError('database down')):
+            with self.assertRaises(RuntimeError):
+                self.aggregator.flush(force=True)
+        self.assertEqual(len(list(self.spool_dir.glob('*.agg'))), 1)
+
+        self.assertEqual(self.aggregator.flush(), 1)
+        self.assertEqual(AuditLog.objects.get().occurrences, 3)
+        self.assertEqual(list(self.spool_dir.glob('*.agg')), [])
+
+    def test_views_are_collapsed_into_one_chained_summary_per_window(self):
+        with self.assertNumQueries(0):
+            for _idx in range(50):
+                self._log(AuditLog.Action.VIEW, 'Dashboard', 'Viewed dashboard')
+        other = User.objects.create_user(username='viewer-2', password='StrongPass123!', role='auditor')
+        self._log(AuditLog.Action.VIEW, 'Dashboard', 'Viewed dashboard', user=other)
+        self._log(AuditLog.Action.CREATE, 'FlightLog', 'Created flight log')
+        self.assertEqual(list(AuditLog.objects.values_list('entity', flat=True)), ['FlightLog'])
+
+        self.assertEqual(self.aggregator.flush(), 0)
+        with patch('audittrail.aggregation.time.monotonic', return_value=time.monotonic() + 301):
+            self.assertEqual(self.aggregator.flush(), 2)
+
+        summary = AuditLog.objects.get(entity='Dashboard', user=self.user)
+        self.assertEqual(summary.occurrences, 50)
+        self.assertLessEqual(summary.first_occurred_at, summary.created_at)
+        self.assertTrue(summary.description.startswith('Viewed dashboard (50 times, '))
+        single = AuditLog.objects.get(entity='Dashboard', user=other)
+        self.assertEqual((single.occurrences, single.first_occurred_at, single.description), (1, None, 'Viewed dashboard'))
+        self.assertChainIntact()
+        self.assertTrue(verify_audit_chain(resume=False)['ok'])
+
+        AuditLog.objects.filter(pk=summary.pk).update(occurrences=5)
+        self.assertFalse(verify_audit_chain(resume=False)['ok'])
+
+    def test_entity_rules_and_differing_descriptions(self):
+        self._log(AuditLog.Action.CREATE, 'FlightData', 'Ingested 10 FlightData samples (bulk)')
+        self._log(AuditLog.Action.CREATE, 'FlightData', 'Ingested 4 FlightData samples (bulk)')
+        self._log(AuditLog.Action.CREATE, 'Aircraft', 'Created aircraft')
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+        self.aggregator.close()
+        summary = AuditLog.objects.get(entity='FlightData')
+        self.assertEqual(summary.occurrences, 2)
+        self.assertIn('2 FlightData create events', summary.description)
+        self.assertTrue(summary.description.endswith('Last: Ingested 4 FlightData samples (bulk)'))
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_dashboard_loads_do_not_write_a_row_each(self):
+        self.client.force_login(self.user)
+        for _idx in range(3):
+            self.assertEqual(self.client.get('/dashboard/').status_code, 200)
+        self.assertFalse(AuditLog.objects.filter(action=AuditLog.Action.VIEW).exists())
+        self.aggregator.close()
+        self.assertEqual(AuditLog.objects.get(action=AuditLog.Action.VIEW).occurrences, 3)
+
+
+class AuditArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='archivist', password='StrongPass123!', role='auditor')
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir, ignore_errors=True)
+        archive_settings = override_settings(AUDIT_ARCHIVE_DIR=archive_dir)
+        archive_settings.enable()
+        self.addCleanup(archive_settings.disable)
+
+        for idx in range(6):
+            self._log('FlightLog', idx)
+        for idx in range(2):
+            self._log('Aircraft', idx)
+        self.old_ids = list(AuditLog.objects.filter(shard='flightlog').order_by('id').values_list('id', flat=True)[:4])
+        self.old_ids += list(AuditLog.objects.filter(shard='aircraft').values_list('id', flat=True))
+        self.long_ago = timezone.now() - timedelta(days=400)
+        AuditLog.objects.filter(pk__in=self.old_ids).update(created_at=self.long_ago)
+
+    def _log(self, entity, idx):
+        log_action(
+            user=self.user,
+            action=AuditLog.Action.UPDATE,
+            entity=entity,
+            entity_id=idx,
+            description=f'Updated {entity} #{idx}',
+        )
+
+    def test_expired_chain_prefix_moves_to_segments_and_still_verifies(self):
+        chain.create_checkpoint()
+        segments = archive_audit_logs(segment_rows=3)
+
+        self.assertEqual([(item.shard, item.row_count, item.entry_count) for item in segments], [
+            ('aircraft', 2, 2),
+            ('flightlog', 3, 3),
+            ('flightlog', 1, 4),
+        ])
+        self.assertEqual(segments[1].previous_checksum, 'GENESIS')
+        self.assertEqual(segments[2].previous_checksum, segments[1].checksum)
+        self.assertFalse(AuditLog.objects.filter(pk__in=self.old_ids).exists())
+        self.assertEqual(AuditLog.objects.filter(shard='flightlog').count(), 2)
+        self.assertEqual(archive_audit_logs(), [])
+
+        self._log('Aircraft', 2)
+        report = verify_audit_chain(resume=False)
+        self.assertTrue(report['ok'])
+        self.assertTrue(report['checkpoints']['ok'])
+        flightlog = next(item for item in report['shards'] if item['shard'] == 'flightlog')
+        self.assertEqual((flightlog['archived_rows_verified'], flightlog['rows'], flightlog['entry_count']), (4, 2, 6))
+        self.assertTrue(verify_audit_chain()['ok'])
+
+    def test_edited_segment_file_or_manifest_is_reported(self):
+        segment = archive_audit_logs()[-1]
+        path = archive_root() / segment.path
+        records = [json.loads(line) for line in gzip.open(path, 'rt', encoding='utf-8')]
+        records[0]['description'] = 'Nothing happened here'
+        with gzip.open(path, 'wt', encoding='utf-8') as handle:
+            handle.writelines(json.dumps(record) + '\n' for record in records)
+
+        # Resumed runs trust the signed manifest; a full run re-reads the file.
+        self.assertTrue(verify_audit_chain()['ok'])
+        flightlog = next(item for item in verify_audit_chain(resume=False)['shards'] if item['shard'] == 'flightlog')
+        self.assertEqual(flightlog['breaks'], [{'id': segment.first_id, 'reason': f'archive file {segment.path} was modified'}])
+
+        AuditArchiveSegment.objects.filter(pk=segment.pk).update(row_count=3)
+        self.assertFalse(verify_audit_chain()['ok'])
+
+    def test_queries_span_hot_rows_and_segments(self):
+        archive_audit_logs()
+        rows = query_audit_logs(self.long_ago - timedelta(days=1), timezone.now() + timedelta(minutes=1))
+        self.assertEqual(len(rows), 8)
+        self.assertEqual([row.archived for row in rows], [False, False] + [True] * 6)
+        self.assertEqual(rows[-1].user, self.user)
+
+        recent = query_audit_logs(self.long_ago + timedelta(days=1), timezone.now() + timedelta(minutes=1))
+        self.assertEqual(len(recent), 2)
+        aircraft = query_audit_logs(self.long_ago, self.long_ago + timedelta(seconds=1), entities=['Aircraft'])
+        self.assertEqual([row.entity_id for row in aircraft], [1, 0])
+        self.assertEqual(len(query_audit_logs(self.long_ago, timezone.now() + timedelta(minutes=1), limit=3)), 3)
+
+        self.client.force_login(self.user)
+        response = self.client.get(
+            '/api/audit/logs/',
+            {'date_from': (timezone.localdate() - timedelta(days=401)).isoformat(), 'entity': 'FlightLog'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['archived'] for item in response.json()['results']], [False, False, True, True, True, True])
+        self.assertEqual(self.client.get('/api/audit/logs/', {'date_from': '2026-13-01'}).status_code, 400)
+
+        pilot = User.objects.create_user(username='ops-archive', password='StrongPass123!', role='flight_ops')
+        self.client.force_login(pilot)
+        self.assertEqual(self.client.get('/api/audit/logs/').status_code, 403)
+
+    def test_command(self):
+        output = StringIO()
+        call_command('archive_audit_logs', '--days', '30', stdout=output)
+        self.assertIn('Archived 6 audit row(s) into 2 segment(s).', output.getvalue())
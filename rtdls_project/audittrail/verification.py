@@ -0,0 +1,311 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+
+from .archive import archived_start, verify_segments
+from .chain import GENESIS, checkpoint_checksum, head_leaf, merkle_root, sign, signature_valid
+from .models import (
+    AuditArchiveSegment,
+    AuditChainHead,
+    AuditCheckpoint,
+    AuditLog,
+    AuditVerificationCheckpoint,
+    compute_checksum,
+)
+
+ROW_FIELDS = (
+    'id',
+    'action',
+    'entity',
+    'entity_id',
+    'user_id',
+    'description',
+    'occurrences',
+    'previous_checksum',
+    'checksum',
+)
+# Enough to locate tampering without an unbounded report when a whole shard was rewritten.
+MAX_REPORTED_BREAKS = 20
+
+
+def mark_message(shard, entry_id, entry_count, checksum):
+    return f'{shard}|{entry_id}|{entry_count}|{checksum}'
+
+
+def record_mark(shard, entry_id, entry_count, checksum):
+    mark, _created = AuditVerificationCheckpoint.objects.update_or_create(
+        shard=shard,
+        entry_id=entry_id,
+        defaults={
+            'entry_count': entry_count,
+            'checksum': checksum,
+            'signature': sign(mark_message(shard, entry_id, entry_count, checksum)),
+        },
+    )
+    return mark
+
+
+def _stored_checksum(shard, entry_id):
+    # The checkpointed row is re-hashed too, so an edit to it cannot hide behind its unchanged checksum column.
+    row = AuditLog.objects.filter(pk=entry_id, shard=shard).values_list(*ROW_FIELDS[1:]).first()
+    if row is None:
+        return None
+    action, entity, entity_id, user_id, description, occurrences, previous_checksum, checksum = row
+    recomputed = compute_checksum(
+        action=action,
+        entity=entity,
+        entity_id=entity_id,
+        user_id=user_id,
+        description=description,
+        previous_checksum=previous_checksum,
+        occurrences=occurrences,
+    )
+    return checksum if recomputed == checksum else None
+
+
+def resume_point(shard, after_id=None):
+    rejected = []
+    marks = AuditVerificationCheckpoint.objects.filter(shard=shard)
+    if after_id is not None:
+        # Marks inside the archived prefix point at rows that now live in segment files.
+        marks = marks.filter(entry_id__gt=after_id)
+    for mark in marks.order_by('-entry_id').iterator():
+        if not signature_valid(mark_message(shard, mark.entry_id, mark.entry_count, mark.checksum), mark.signature):
+            rejected.append({'entry_id': mark.entry_id, 'reason': 'signature does not match'})
+        elif _stored_checksum(shard, mark.entry_id) != mark.checksum:
+            rejected.append({'entry_id': mark.entry_id, 'reason': 'row no longer matches the checkpoint'})
+        else:
+            return mark, rejected
+    return None, rejected
+
+
+def _break(result, entry_id, reason):
+    result['break_count'] += 1
+    if len(result['breaks']) < MAX_REPORTED_BREAKS:
+        result['breaks'].append({'id': entry_id, 'reason': reason})
+
+
+def verify_range(shard, after_id=None, through_id=None, previous=None, entry_count=0, checkpoint_every=0, chunk_size=None):
+    # previous=None trusts the first row's link; the caller then checks it against the range before.
+    queryset = AuditLog.objects.filter(shard=shard)
+    if after_id is not None:
+        queryset = queryset.filter(id__gt=after_id)
+    if through_id is not None:
+        queryset = queryset.filter(id__lte=through_id)
+    rows = queryset.order_by('id').values_list(*ROW_FIELDS).iterator(
+        chunk_size=chunk_size or settings.AUDIT_VERIFY_CHUNK_SIZE
+    )
+
+    result = {
+        'anchored': previous is not None,
+        'first_id': None,
+        'first_previous': None,
+        'last_id': after_id,
+        'last_checksum': previous,
+        'rows': 0,
+        'breaks': [],
+        'break_count': 0,
+    }
+    for row_id, action, entity, entity_id, user_id, description, occurrences, previous_checksum, checksum in rows:
+        if result['first_id'] is None:
+            result['first_id'], result['first_previous'] = row_id, previous_checksum
+            previous = previous_checksum if previous is None else previous
+        if previous_checksum != previous:
+            _break(result, row_id, 'previous_checksum does not match the preceding row')
+        elif checksum != compute_checksum(
+            action=action,
+            entity=entity,
+            entity_id=entity_id,
+            user_id=user_id,
+            description=description,
+            previous_checksum=previous_checksum,
+            occurrences=occurrences,
+        ):
+            _break(result, row_id, 'checksum does not match the row contents')
+        # Carry on from the stored checksum so one edited row is reported once, not as a broken tail.
+        previous = checksum
+        result['rows'] += 1
+        result['last_id'] = row_id
+        if checkpoint_every and not result['break_count'] and (entry_count + result['rows']) % checkpoint_every == 0:
+            record_mark(shard, row_id, entry_count + result['rows'], checksum)
+    result['last_checksum'] = previous
+    return result
+
+
+def _verify_range_task(task):
+    shard, after_id, through_id, chunk_size = task
+    return verify_range(shard, after_id=after_id, through_id=through_id, chunk_size=chunk_size)
+
+
+def _init_worker():
+    # Spawned (not forked) workers start without Django configured.
+    if not apps.ready:
+        django.setup()
+
+
+def _executor(workers):
+    # Forked workers must open their own connections instead of sharing the parent's sockets.
+    connections.close_all()
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def split_range(shard, after_id, through_id, parts):
+    queryset = AuditLog.objects.filter(shard=shard)
+    if after_id is not None:
+        queryset = queryset.filter(id__gt=after_id)
+    if through_id is not None:
+        queryset = queryset.filter(id__lte=through_id)
+    total = queryset.count()
+    parts = max(1, min(parts, total))
+    ids = queryset.order_by('id').values_list('id', flat=True)
+    bounds = [after_id] + [ids[total * part // parts - 1] for part in range(1, parts)] + [through_id]
+    return list(zip(bounds, bounds[1:]))
+
+
+def _join(shard, head, start, parts, rejected, archive):
+    result = {
+        'shard': shard,
+        'resumed_from': start['after_id'],
+        'archived_segments': archive['segments'],
+        'archived_rows_verified': archive['rows'],
+        'rows': 0,
+        'entry_count': start['entry_count'],
+        'last_id': start['after_id'],
+        'breaks': [],
+        'break_count': 0,
+        'rejected_checkpoints': rejected,
+    }
+    for item in archive['breaks']:
+        _break(result, item['id'], item['reason'])
+    previous = start['previous']
+    for part in parts:
+        if not part['rows']:
+            continue
+        if not part['anchored'] and part['first_previous'] != previous:
+            _break(result, part['first_id'], 'previous_checksum does not match the preceding row')
+        for item in part['breaks']:
+            _break(result, item['id'], item['reason'])
+        result['break_count'] += part['break_count'] - len(part['breaks'])
+        result['rows'] += part['rows']
+        result['last_id'] = part['last_id']
+        previous = part['last_checksum']
+    result['entry_count'] += result['rows']
+
+    if head is None:
+        if result['rows']:
+            _break(result, None, 'shard has rows but no chain head')
+    elif head.checksum != previous or head.entry_count != result['entry_count']:
+        _break(result, head.last_entry_id, 'chain head does not match the last verified row')
+    result['ok'] = not result['break_count']
+    # A clean run always leaves a resume point at its end, not only every N rows.
+    if result['ok'] and result['rows']:
+        record_mark(shard, result['last_id'], result['entry_count'], previous)
+    return result
+
+
+def _archived_head(segments, row_id, committed):
+    # Archived rows are covered by the segment checks; only a segment ending on the row records its checksum.
+    shard, checksum = committed
+    for first_id, last_id, segment_checksum in segments.get(shard, ()):
+        if first_id <= row_id <= last_id:
+            return shard, segment_checksum if row_id == last_id else checksum
+    return None
+
+
+def verify_checkpoints(chunk_size=None):
+    result = {'checked': 0, 'breaks': [], 'break_count': 0}
+    segments = {}
+    for shard, first_id, last_id, checksum in AuditArchiveSegment.objects.values_list(
+        'shard', 'first_id', 'last_id', 'checksum'
+    ):
+        segments.setdefault(shard, []).append((first_id, last_id, checksum))
+    previous = GENESIS
+    for checkpoint in AuditCheckpoint.objects.order_by('id').iterator(
+        chunk_size=chunk_size or settings.AUDIT_VERIFY_CHUNK_SIZE
+    ):
+        committed = {last_id: (shard, checksum) for shard, checksum, _count, last_id in checkpoint.heads if last_id}
+        found = {
+            row_id: (shard, checksum)
+            for row_id, shard, checksum in AuditLog.objects.filter(pk__in=committed).values_list('id', 'shard', 'checksum')
+        }
+        for row_id in set(committed) - set(found):
+            found[row_id] = _archived_head(segments, row_id, committed[row_id])
+        leaves = [head_leaf(shard, checksum, count) for shard, checksum, count, _last_id in checkpoint.heads]
+        if checkpoint.previous_checksum != previous:
+            _break(result, checkpoint.id, 'checkpoint does not extend the one before it')
+        elif merkle_root(leaves) != checkpoint.merkle_root:
+            _break(result, checkpoint.id, 'merkle root does not match the recorded shard heads')
+        elif checkpoint.checksum != checkpoint_checksum(previous, checkpoint.merkle_root):
+            _break(result, checkpoint.id, 'checksum does not match the merkle root')
+        elif not signature_valid(checkpoint.checksum, checkpoint.signature):
+            _break(result, checkpoint.id, 'signature does not match')
+        elif found != committed:
+            _break(result, checkpoint.id, 'a shard head it commits to no longer matches the log')
+        previous = checkpoint.checksum
+        result['checked'] += 1
+    result['ok'] = not result['break_count']
+    return result
+
+
+def verify_audit_chain(shards=None, resume=True, workers=1, chunk_size=None):
+    chunk_size = chunk_size or settings.AUDIT_VERIFY_CHUNK_SIZE
+    heads = {head.shard: head for head in AuditChainHead.objects.all()}
+    if shards is None:
+        shards = set(heads)
+        if not resume:
+            # Only a full run looks for rows whose shard has no head at all.
+            shards |= set(AuditLog.objects.order_by().values_list('shard', flat=True).distinct())
+        shards = sorted(shards)
+
+    plans = []
+    for shard in shards:
+        # Archived rows are only re-read on a full run; otherwise their signed manifests vouch for them.
+        archive = verify_segments(shard, contents=not resume)
+        start = archived_start(shard)
+        mark, rejected = resume_point(shard, start['after_id']) if resume else (None, [])
+        if mark:
+            start = {'after_id': mark.entry_id, 'previous': mark.checksum, 'entry_count': mark.entry_count}
+        # Rows appended after the head was read belong to the next run.
+        through_id = heads[shard].last_entry_id if shard in heads else None
+        ranges = split_range(shard, start['after_id'], through_id, workers) if workers > 1 else None
+        plans.append((shard, start, through_id, ranges, rejected, archive))
+
+    if workers > 1:
+        tasks = [
+            (shard, after_id, through_id, chunk_size)
+            for shard, _start, _through, ranges, _rejected, _archive in plans
+            for after_id, through_id in ranges
+        ]
+        with _executor(workers) as pool:
+            results = iter(list(pool.map(_verify_range_task, tasks)))
+        parts = [
+            [next(results) for _range in ranges] for _shard, _start, _through, ranges, _rejected, _archive in plans
+        ]
+    else:
+        parts = [
+            [
+                verify_range(
+                    shard,
+                    after_id=start['after_id'],
+                    through_id=through_id,
+                    previous=start['previous'],
+                    entry_count=start['entry_count'],
+                    checkpoint_every=settings.AUDIT_VERIFY_CHECKPOINT_ROWS,
+                    chunk_size=chunk_size,
+                )
+            ]
+            for shard, start, through_id, _ranges, _rejected, _archive in plans
+        ]
+
+    report = {
+        'shards': [
+            _join(shard, heads.get(shard), start, shard_parts, rejected, archive)
+            for (shard, start, _through, _ranges, rejected, archive), shard_parts in zip(plans, parts)
+        ],
+        'checkpoints': verify_checkpoints(chunk_size),
+    }
+    report['ok'] = report['checkpoints']['ok'] and all(shard['ok'] for shard in report['shards'])
+    return report
@@ -0,0 +1,170 @@
+import atexit
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.dateparse import parse_datetime
+
+from .aggregation import AuditAggregator, is_aggregated
+from .chain import append_rows, create_checkpoint
+from .models import AuditLog
+from .spool import claim_orphans, own_segment, read_segment, release_segment, unwritten_entries
+
+logger = logging.getLogger(__name__)
+
+
+def _build_row(entry):
+    return AuditLog(
+        user_id=entry['user_id'],
+        action=entry['action'],
+        entity=entry['entity'],
+        entity_id=entry['entity_id'],
+        description=entry['description'],
+        ip_address=entry['ip_address'],
+        created_at=parse_datetime(entry['created_at']),
+        occurrences=entry.get('occurrences', 1),
+        first_occurred_at=parse_datetime(entry['first_occurred_at']) if entry.get('first_occurred_at') else None,
+    )
+
+
+def write_entries(entries):
+    return append_rows([_build_row(entry) for entry in entries])
+
+
+class AuditWriter:
+    def __init__(self, spool_dir=None, batch_size=None, flush_ms=None, background=True):
+        self.spool_dir = Path(spool_dir or settings.AUDIT_SPOOL_DIR)
+        self.batch_size = batch_size or settings.AUDIT_BATCH_SIZE
+        self.flush_seconds = (flush_ms or settings.AUDIT_FLUSH_MS) / 1000
+        self.background = background
+        self.pending = []
+        self.segment_path = None
+        self.segment = None
+        self.backlog = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.start_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.recovered = False
+
+    def submit(self, entry):
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self.lock:
+            if self.segment is None:
+                self.spool_dir.mkdir(parents=True, exist_ok=True)
+                # A recycled pid must never append to a dead process's segment, hence the timestamp and exclusive mode.
+                self.segment_path = self.spool_dir / f'{os.getpid()}-{time.time_ns()}.ndjson'
+                self.segment = open(self.segment_path, 'x', encoding='utf-8')
+                own_segment(self.segment_path)
+            # Spooled before it is queued: a crash between here and the flush leaves the entry on disk for recovery.
+            self.segment.write(line)
+            self.segment.flush()
+            self.pending.append(entry)
+            queued = len(self.pending)
+        if queued >= self.batch_size:
+            self.wakeup.set()
+        if self.background:
+            self.start()
+
+    def recover(self):
+        orphaned = claim_orphans(self.spool_dir, '.ndjson')
+        self.backlog[:0] = [(path, None) for path in orphaned]
+        self.recovered = True
+        return orphaned
+
+    def flush(self):
+        with self.flush_lock:
+            if not self.recovered:
+                self.recover()
+            with self.lock:
+                if self.pending:
+                    # The pending entries leave together with the segment holding them, so the file can go once they commit.
+                    self.segment.close()
+                    self.backlog.append((self.segment_path, self.pending))
+                    self.pending, self.segment, self.segment_path = [], None, None
+
+            # Segments are written oldest first and a failure stops the loop, so the chain keeps submission order.
+            written = 0
+            while self.backlog:
+                path, entries = self.backlog[0]
+                if entries is None:
+                    entries = unwritten_entries(read_segment(path))
+                write_entries(entries)
+                path.unlink(missing_ok=True)
+                release_segment(path)
+                self.backlog.pop(0)
+                written += len(entries)
+            return written
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.start_lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        last_checkpoint = time.monotonic()
+        while True:
+            self.wakeup.wait(self.flush_seconds)
+            self.wakeup.clear()
+            try:
+                self.flush()
+                if time.monotonic() - last_checkpoint >= settings.AUDIT_CHECKPOINT_SECONDS:
+                    create_checkpoint()
+                    last_checkpoint = time.monotonic()
+            except Exception:
+                logger.exception('Audit flush failed; entries stay spooled for the next attempt.')
+            finally:
+                close_old_connections()
+
+    def close(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Audit flush at shutdown failed; the spool is replayed on next start.')
+
+
+_writer = None
+_writer_lock = threading.Lock()
+_aggregator = None
+
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AuditWriter()
+            atexit.register(_writer.close)
+    return _writer
+
+
+def get_aggregator():
+    global _aggregator
+    with _writer_lock:
+        if _aggregator is None:
+            # Summaries are written directly: one transaction per window, and the aggregate spool covers the gap.
+            _aggregator = AuditAggregator(emit=write_entries)
+            atexit.register(_aggregator.close)
+    return _aggregator
+
+
+def _write(entry):
+    if settings.AUDIT_ASYNC_WRITES:
+        get_writer().submit(entry)
+    else:
+        write_entries([entry])
+
+
+def submit(entry):
+    if is_aggregated(entry):
+        get_aggregator().add(entry)
+    else:
+        _write(entry)
@@ -1,9 +1,21 @@
+import asyncio
 import json
+import logging
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from asgiref.sync import sync_to_async
+from django.conf import settings
 
-from .services import get_dashboard_metrics
+from operations.serializers import FlightDataIngestSerializer
+from operations.telemetry import store_stream_batch
+
+from .encoding import dumps
+from .opensky import get_opensky_feed, opensky_group, opensky_message
+from .realtime import default_topics, topic_exists
+from .services import get_cached_dashboard_metrics
+
+logger = logging.getLogger(__name__)
 
 
 class DashboardConsumer(AsyncWebsocketConsumer):
@@ -13,30 +25,192 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             await self.close(code=4001)
             return
 
-        await self.channel_layer.group_add('dashboard', self.channel_name)
+        self.topics = set()
+        self.opensky_versions = {}
+        for topic in default_topics(user):
+            await self._join(topic)
         await self.accept()
 
-        initial_metrics = await sync_to_async(get_dashboard_metrics)()
+        initial_metrics = await sync_to_async(get_cached_dashboard_metrics)()
         await self.send(
-            text_data=json.dumps(
+            text_data=dumps(
                 {
                     'event': 'initial_state',
                     'payload': {},
+                    'topics': sorted(self.topics),
                     'metrics': initial_metrics,
                 }
             )
         )
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard('dashboard', self.channel_name)
+        for topic in list(getattr(self, 'topics', ())):
+            await self.channel_layer.group_discard(topic, self.channel_name)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            message = json.loads(text_data or '')
+        except ValueError:
+            message = None
+        if not isinstance(message, dict):
+            await self._send_error('Messages must be JSON objects.')
+            return
+
+        action = message.get('action')
+        if action not in {'subscribe', 'unsubscribe'}:
+            await self._send_error(f'Unknown action: {action!r}.')
+            return
+        # A bare "scope" is shorthand for the matching OpenSky topic.
+        topic = message.get('topic') or (opensky_group(message['scope']) if 'scope' in message else None)
+        if not await database_sync_to_async(topic_exists)(topic):
+            await self._send_error(f'Unknown topic: {topic!r}.')
+            return
+
+        scope = topic.partition('.')[2] if topic.startswith('opensky.') else None
+        if action == 'unsubscribe':
+            self.topics.discard(topic)
+            await self.channel_layer.group_discard(topic, self.channel_name)
+            if scope:
+                self.opensky_versions.pop(scope, None)
+                await self.send(text_data=dumps({'event': 'opensky_unsubscribed', 'scope': scope}))
+            else:
+                await self.send(text_data=dumps({'event': 'unsubscribed', 'topic': topic}))
+            return
+
+        await self._join(topic)
+        if not scope:
+            await self.send(text_data=dumps({'event': 'subscribed', 'topic': topic}))
+            return
+        since = message.get('since')
+        payload = await sync_to_async(get_opensky_feed)(scope, since=since if isinstance(since, int) else None)
+        await self._send_opensky(scope, payload.get('version'), opensky_message(scope, payload))
+
+    async def _join(self, topic):
+        self.topics.add(topic)
+        await self.channel_layer.group_add(topic, self.channel_name)
+
+    async def opensky_update(self, event):
+        scope = event['scope']
+        if scope not in self.opensky_versions:
+            return
+        if event['delta_text'] and self.opensky_versions[scope] == event['since']:
+            await self._send_opensky(scope, event['version'], event['delta_text'])
+        else:
+            await self._send_opensky(scope, event['version'], event['text'])
+
+    async def _send_opensky(self, scope, version, text):
+        self.opensky_versions[scope] = version
+        await self.send(text_data=text)
+
+    async def _send_error(self, detail):
+        await self.send(text_data=dumps({'event': 'error', 'detail': detail}))
 
     async def dashboard_event(self, event):
-        await self.send(
-            text_data=json.dumps(
-                {
-                    'event': event.get('event'),
-                    'payload': event.get('payload', {}),
-                    'metrics': event.get('metrics', {}),
-                }
-            )
-        )
+        await self.send(text_data=event['text'])
+
+
+class TelemetryIngestConsumer(AsyncWebsocketConsumer):
+    ingest_roles = {'admin', 'flight_ops'}
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated:
+            await self.close(code=4001)
+            return
+        if user.role not in self.ingest_roles:
+            await self.close(code=4003)
+            return
+
+        self.batch_size = settings.TELEMETRY_STREAM_BATCH_SIZE
+        self.buffer_max = max(settings.TELEMETRY_STREAM_BUFFER_MAX, self.batch_size)
+        self.flush_interval = settings.TELEMETRY_STREAM_FLUSH_MS / 1000.0
+        self.buffer = []
+        self.flush_lock = asyncio.Lock()
+        self.flush_task = None
+        self.flush_timer = None
+        self.stored = 0
+        self.connected = True
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if not hasattr(self, 'buffer'):
+            return
+        self.connected = False
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+        await self.flush()
+
+    async def receive(self, text_data=None, bytes_data=None):
+        raw = text_data if text_data is not None else (bytes_data or b'').decode('utf-8', errors='replace')
+        accepted = 0
+        rejected = []
+        for line_number, line in enumerate(raw.splitlines(), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                rejected.append({'line': line_number, 'errors': 'Invalid JSON.'})
+                continue
+
+            for sample in record if isinstance(record, list) else [record]:
+                serializer = FlightDataIngestSerializer(data=sample)
+                if not serializer.is_valid():
+                    rejected.append({'line': line_number, 'errors': serializer.errors})
+                    continue
+                if len(self.buffer) >= self.buffer_max:
+                    # The writer is behind: stop reading frames until the buffer drains.
+                    await self._send_event('backpressure', buffered=len(self.buffer))
+                    await self.flush()
+                    await self._send_event('resume', buffered=len(self.buffer))
+                self.buffer.append(serializer.validated_data)
+                accepted += 1
+
+        if len(self.buffer) >= self.batch_size:
+            self._start_flush()
+        elif self.buffer and self.flush_timer is None:
+            self.flush_timer = asyncio.get_running_loop().call_later(self.flush_interval, self._start_flush)
+
+        await self._send_event('ack', accepted=accepted, rejected=rejected, buffered=len(self.buffer))
+
+    def _start_flush(self):
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        async with self.flush_lock:
+            while self.buffer:
+                batch, self.buffer = self.buffer[: self.batch_size], self.buffer[self.batch_size:]
+                try:
+                    stored, unknown_flight_logs = await database_sync_to_async(store_stream_batch)(
+                        batch,
+                        user=self.scope['user'],
+                        ip_address=(self.scope.get('client') or [None])[0],
+                    )
+                except Exception:
+                    # Flushes run as background tasks; report the lost batch instead of leaving it to the event loop.
+                    logger.exception('Telemetry stream batch of %d sample(s) could not be stored.', len(batch))
+                    await self._send_event(
+                        'error',
+                        detail='Telemetry batch could not be stored.',
+                        rejected=len(batch),
+                        buffered=len(self.buffer),
+                    )
+                    continue
+                self.stored += stored
+                await self._send_event(
+                    'flushed',
+                    stored=stored,
+                    total_stored=self.stored,
+                    unknown_flight_logs=unknown_flight_logs,
+                    buffered=len(self.buffer),
+                )
+
+    async def _send_event(self, event, **payload):
+        if not self.connected:
+            return
+        await self.send(text_data=json.dumps({'event': event, **payload}))
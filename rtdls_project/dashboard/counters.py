@@ -0,0 +1,176 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from maintenance.models import Alert
+from operations.models import Aircraft, Crew, FlightLog
+
+from .models import DashboardCounter
+
+AIRCRAFT_AVAILABLE = 'aircraft:available'
+CREW_AVAILABLE = 'crew:available'
+ALERTS_UNRESOLVED = 'alerts:unresolved'
+AIRCRAFT_HOURS_PREFIX = 'aircraft_hours:'
+FLIGHT_DAY_FIELDS = ('total', 'active', 'completed', 'delayed', 'cancelled')
+
+# Float counters (flight hours) accumulate rounding error; anything below this is not drift.
+DRIFT_TOLERANCE = 1e-6
+METRICS_VERSION_KEY = 'dashboard:metrics:version'
+
+
+def flight_day_key(day, field):
+    return f'flights:{day.isoformat()}:{field}'
+
+
+def aircraft_hours_key(aircraft_id):
+    return f'{AIRCRAFT_HOURS_PREFIX}{aircraft_id}'
+
+
+def flight_log_contributions(log):
+    day = timezone.localdate(log.flight_datetime)
+    contributions = {
+        flight_day_key(day, 'total'): 1,
+        aircraft_hours_key(log.aircraft_id): float(log.flight_hours or 0.0),
+    }
+    if log.mission_status == FlightLog.MissionStatus.ACTIVE:
+        contributions[flight_day_key(day, 'active')] = 1
+    elif log.mission_status == FlightLog.MissionStatus.COMPLETED:
+        contributions[flight_day_key(day, 'completed')] = 1
+    if log.is_delayed:
+        contributions[flight_day_key(day, 'delayed')] = 1
+    if log.is_cancelled:
+        contributions[flight_day_key(day, 'cancelled')] = 1
+    return contributions
+
+
+def aircraft_contributions(aircraft):
+    if aircraft.status == Aircraft.Status.AVAILABLE:
+        return {AIRCRAFT_AVAILABLE: 1}
+    return {}
+
+
+def crew_contributions(crew):
+    if crew.is_available:
+        return {CREW_AVAILABLE: 1}
+    return {}
+
+
+def alert_contributions(alert):
+    if not alert.is_resolved:
+        return {ALERTS_UNRESOLVED: 1}
+    return {}
+
+
+def metrics_version():
+    version = cache.get(METRICS_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted version key never revives an older cached snapshot.
+        cache.add(METRICS_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(METRICS_VERSION_KEY)
+    return version
+
+
+def invalidate_dashboard_metrics():
+    try:
+        cache.incr(METRICS_VERSION_KEY)
+    except ValueError:
+        metrics_version()
+
+
+def apply_deltas(deltas):
+    if any(deltas.values()):
+        transaction.on_commit(invalidate_dashboard_metrics)
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        updated = DashboardCounter.objects.filter(key=key).update(value=F('value') + delta)
+        if updated:
+            continue
+        _counter, created = DashboardCounter.objects.get_or_create(key=key, defaults={'value': delta})
+        if not created:
+            DashboardCounter.objects.filter(key=key).update(value=F('value') + delta)
+
+
+def record_change(previous, current, contributions):
+    before = contributions(previous) if previous is not None else {}
+    after = contributions(current) if current is not None else {}
+    deltas = {}
+    for key in set(before) | set(after):
+        deltas[key] = after.get(key, 0) - before.get(key, 0)
+    apply_deltas(deltas)
+
+
+def read_counters(keys):
+    values = dict(DashboardCounter.objects.filter(key__in=list(keys)).values_list('key', 'value'))
+    return {key: values.get(key, 0.0) for key in keys}
+
+
+def top_aircraft_hours(limit=5):
+    rows = list(
+        DashboardCounter.objects.filter(key__startswith=AIRCRAFT_HOURS_PREFIX, value__gt=DRIFT_TOLERANCE)
+        .order_by('-value')
+        .values_list('key', 'value')[:limit]
+    )
+    aircraft_ids = [int(key[len(AIRCRAFT_HOURS_PREFIX):]) for key, _value in rows]
+    tail_numbers = dict(Aircraft.objects.filter(id__in=aircraft_ids).values_list('id', 'tail_number'))
+    return [
+        {'aircraft': tail_numbers.get(aircraft_id, ''), 'hours': float(value)}
+        for aircraft_id, (_key, value) in zip(aircraft_ids, rows)
+    ]
+
+
+def compute_counters():
+    expected = {
+        AIRCRAFT_AVAILABLE: Aircraft.objects.filter(status=Aircraft.Status.AVAILABLE).count(),
+        CREW_AVAILABLE: Crew.objects.filter(is_available=True).count(),
+        ALERTS_UNRESOLVED: Alert.objects.filter(is_resolved=False).count(),
+    }
+
+    per_day = (
+        FlightLog.objects.annotate(day=TruncDate('flight_datetime'))
+        .values('day')
+        .annotate(
+            total=Count('id'),
+            active=Count('id', filter=Q(mission_status=FlightLog.MissionStatus.ACTIVE)),
+            completed=Count('id', filter=Q(mission_status=FlightLog.MissionStatus.COMPLETED)),
+            delayed=Count('id', filter=Q(is_delayed=True)),
+            cancelled=Count('id', filter=Q(is_cancelled=True)),
+        )
+        .order_by('day')
+    )
+    for row in per_day:
+        for field in FLIGHT_DAY_FIELDS:
+            if row[field]:
+                expected[flight_day_key(row['day'], field)] = row[field]
+
+    per_aircraft = FlightLog.objects.values('aircraft_id').annotate(total_hours=Sum('flight_hours')).order_by()
+    for row in per_aircraft:
+        expected[aircraft_hours_key(row['aircraft_id'])] = float(row['total_hours'] or 0.0)
+
+    return expected
+
+
+def reconcile_counters(apply=True):
+    expected = compute_counters()
+    stored = dict(DashboardCounter.objects.values_list('key', 'value'))
+
+    drift = {}
+    for key in sorted(set(expected) | set(stored)):
+        stored_value = stored.get(key, 0.0)
+        expected_value = expected.get(key, 0.0)
+        if abs(stored_value - expected_value) > DRIFT_TOLERANCE:
+            drift[key] = (stored_value, expected_value)
+
+    if apply and drift:
+        transaction.on_commit(invalidate_dashboard_metrics)
+    if apply:
+        for key, (_stored_value, expected_value) in drift.items():
+            if expected_value:
+                DashboardCounter.objects.update_or_create(key=key, defaults={'value': expected_value})
+            else:
+                DashboardCounter.objects.filter(key=key).delete()
+    return drift
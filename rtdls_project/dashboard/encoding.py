@@ -0,0 +1,14 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ENCODER_NAME = 'orjson' if orjson is not None else 'json'
+
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(data, separators=(',', ':'))
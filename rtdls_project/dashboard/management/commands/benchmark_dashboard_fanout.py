@@ -0,0 +1,63 @@
+import asyncio
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.consumers import DashboardConsumer
+from dashboard.encoding import ENCODER_NAME
+from dashboard.realtime import METRICS_TOPIC, _topic_message
+from dashboard.services import get_dashboard_metrics
+
+
+class _BenchmarkConsumer(DashboardConsumer):
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Measures dashboard broadcast fan-out cost: per-socket JSON encoding versus one pre-encoded payload.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sockets', type=int, nargs='+', default=[100, 1000], help='Socket counts to measure.')
+        parser.add_argument('--events', type=int, default=20, help='Broadcasts timed per socket count.')
+
+    def handle(self, *args, **options):
+        events = [{'event': 'flight_data_logged', 'payload': {'flight_data_id': 1, 'flight_log_id': 1}}]
+        metrics = get_dashboard_metrics()
+        body = {
+            'event': 'flight_data_logged',
+            'topic': METRICS_TOPIC,
+            'payload': events[0]['payload'],
+            'events': events,
+            'dropped_events': 0,
+            'metrics': metrics,
+        }
+        rounds = max(1, options['events'])
+        encoded = _topic_message(events, topic=METRICS_TOPIC, metrics=metrics)['text']
+        self.stdout.write(f'Encoder: {ENCODER_NAME}; {len(encoded)} bytes/message; {rounds} broadcast(s) per size.')
+
+        for size in options['sockets']:
+            consumers = [_BenchmarkConsumer() for _ in range(max(1, size))]
+            per_socket = asyncio.run(self._per_socket(consumers, body, rounds))
+            encode_once = asyncio.run(self._encode_once(consumers, events, metrics, rounds))
+            self.stdout.write(
+                f'{len(consumers)} sockets: per-socket json.dumps {per_socket * 1000:.3f} ms/event, '
+                f'encode-once {encode_once * 1000:.3f} ms/event '
+                f'({per_socket / max(encode_once, 1e-9):.1f}x)'
+            )
+
+    async def _per_socket(self, consumers, body, rounds):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for consumer in consumers:
+                await consumer.send(text_data=json.dumps(body))
+        return (time.perf_counter() - started) / rounds
+
+    async def _encode_once(self, consumers, events, metrics, rounds):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            message = _topic_message(events, topic=METRICS_TOPIC, metrics=metrics)
+            for consumer in consumers:
+                await consumer.dashboard_event(message)
+        return (time.perf_counter() - started) / rounds
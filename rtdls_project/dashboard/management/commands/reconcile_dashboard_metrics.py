@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Re-derives dashboard counters from source tables and reports/repairs drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without correcting the stored counters.',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        drift = reconcile_counters(apply=not dry_run)
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Dashboard counters are consistent.'))
+            return
+
+        for key, (stored_value, expected_value) in drift.items():
+            self.stdout.write(
+                self.style.WARNING(f'{key}: stored={stored_value:g} expected={expected_value:g}')
+            )
+        verb = 'Detected' if dry_run else 'Corrected'
+        self.stdout.write(self.style.WARNING(f'{verb} drift on {len(drift)} counter(s).'))
@@ -0,0 +1,44 @@
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.opensky import opensky_cache_stats, refresh_scopes, run_refresher
+from dashboard.services import OPENSKY_SCOPES
+
+
+class Command(BaseCommand):
+    help = 'Polls OpenSky for every configured map scope and stores the results in the shared cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Refresh every scope once and exit.')
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=settings.OPENSKY_REFRESH_SECONDS,
+            help='Seconds between refresh cycles when running continuously.',
+        )
+        parser.add_argument('--scope', action='append', dest='scopes', help='Limit refreshing to this scope (repeatable).')
+        parser.add_argument('--stats', action='store_true', help='Print cache hit/stale/coalescing counters and exit.')
+
+    def handle(self, *args, **options):
+        scopes = options['scopes'] or list(OPENSKY_SCOPES)
+        unknown = sorted(set(scopes) - set(OPENSKY_SCOPES))
+        if unknown:
+            raise CommandError(f'Unknown OpenSky scope(s): {", ".join(unknown)}')
+
+        if options['stats']:
+            for name, value in opensky_cache_stats().items():
+                self.stdout.write(f'{name}: {value}')
+            return
+
+        if options['once']:
+            # Explicit one-off refreshes bypass the per-scope lock and leave a running refresher's lock alone.
+            payloads = asyncio.run(refresh_scopes(scopes, force=True))
+            for scope, payload in payloads.items():
+                self.stdout.write(f'{scope}: {len(payload["flights"])} flight(s) from {payload["source"]}')
+            return
+
+        interval = max(1, options['interval'])
+        self.stdout.write(f'Refreshing {len(scopes)} OpenSky scope(s) every {interval}s.')
+        asyncio.run(run_refresher(interval, scopes))
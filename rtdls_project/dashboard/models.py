@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class DashboardCounter(models.Model):
+    key = models.CharField(max_length=96, unique=True)
+    value = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['key']
+
+    def __str__(self):
+        return f'{self.key} = {self.value}'
@@ -0,0 +1,396 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+
+from .encoding import dumps
+from .services import (
+    CUSTOM_OPENSKY_SCOPE,
+    OPENSKY_SCOPES,
+    build_opensky_payload,
+    normalize_opensky_scope,
+    opensky_payload,
+)
+from .spatial import StateSnapshot
+
+logger = logging.getLogger(__name__)
+
+FETCH_ERRORS = (HTTPError, URLError, TimeoutError, OSError, ValueError)
+STAT_NAMES = ('fresh', 'stale', 'miss', 'coalesced', 'refreshed', 'failed')
+# Pseudo-scope for the shared global state snapshot that every bbox query is answered from.
+SNAPSHOT_SCOPE = 'snapshot'
+SNAPSHOT_META_KEY = 'dashboard:opensky:snapshot'
+
+_snapshot_lock = threading.Lock()
+_snapshot_memo = {'version': None, 'snapshot': None}
+
+
+def opensky_cache_key(scope):
+    return f'dashboard:opensky:{scope}'
+
+
+def _lock_key(scope):
+    return f'dashboard:opensky:lock:{scope}'
+
+
+def _snapshot_data_key(version):
+    return f'dashboard:opensky:snapshot:{version}'
+
+
+def _version_key(scope, version):
+    return f'dashboard:opensky:{scope}:v{version}'
+
+
+def _stat_key(name):
+    return f'dashboard:opensky:stats:{name}'
+
+
+def _record(name, amount=1):
+    key = _stat_key(name)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        cache.set(key, amount, None)
+
+
+def opensky_cache_stats():
+    values = cache.get_many([_stat_key(name) for name in STAT_NAMES])
+    return {name: values.get(_stat_key(name), 0) for name in STAT_NAMES}
+
+
+def acquire_refresh_lock(scope):
+    # Long enough to cover a scoped fetch plus the global fallback fetch.
+    timeout = int(os.getenv('OPENSKY_TIMEOUT_SECONDS', '8')) * 2 + 5
+    return cache.add(_lock_key(scope), time.time(), timeout)
+
+
+def _release_refresh_lock(scope, succeeded):
+    # A successful refresh keeps the lock until the next cycle so other workers do not refetch the same scope.
+    hold = settings.OPENSKY_REFRESH_SECONDS - 1
+    if succeeded and hold > 0:
+        cache.touch(_lock_key(scope), hold)
+    else:
+        cache.delete(_lock_key(scope))
+
+
+def _fetch_opensky_states(bbox, timeout):
+    endpoint = os.getenv('OPENSKY_STATES_URL', 'https://opensky-network.org/api/states/all')
+    if bbox:
+        params = urlencode(bbox)
+        url = f'{endpoint}?{params}'
+    else:
+        url = endpoint
+
+    request = Request(url, headers={'User-Agent': 'GAF-RTDLS-Dashboard/1.0'})
+    username = os.getenv('OPENSKY_USERNAME', '').strip()
+    password = os.getenv('OPENSKY_PASSWORD', '').strip()
+    if username and password:
+        token = base64.b64encode(f'{username}:{password}'.encode('utf-8')).decode('ascii')
+        request.add_header('Authorization', f'Basic {token}')
+
+    with urlopen(request, timeout=timeout) as response:
+        content = response.read().decode('utf-8')
+        raw = json.loads(content)
+    return raw.get('states') or []
+
+
+async def fetch_states(bbox, timeout):
+    try:
+        return await asyncio.to_thread(_fetch_opensky_states, bbox, timeout), True
+    except FETCH_ERRORS as exc:
+        logger.warning('OpenSky fetch failed for bbox %s: %s', bbox, exc)
+        return [], False
+
+
+def _acquire_locks(scopes):
+    acquired = []
+    for scope in scopes:
+        if acquire_refresh_lock(scope):
+            acquired.append(scope)
+        else:
+            _record('coalesced')
+    return acquired
+
+
+def _store_snapshot(snapshot, fetched_at, version):
+    cache.set_many(
+        {
+            _snapshot_data_key(version): snapshot,
+            SNAPSHOT_META_KEY: {'version': version, 'fetched_at': fetched_at},
+        },
+        settings.OPENSKY_CACHE_SECONDS,
+    )
+    with _snapshot_lock:
+        _snapshot_memo.update(version=version, snapshot=snapshot)
+
+
+def load_snapshot():
+    meta = cache.get(SNAPSHOT_META_KEY)
+    if meta is None:
+        return None, None
+    # Unpickling the columnar snapshot is the expensive part, so each process keeps the current version in memory.
+    with _snapshot_lock:
+        if _snapshot_memo['version'] == meta['version']:
+            return _snapshot_memo['snapshot'], meta
+    snapshot = cache.get(_snapshot_data_key(meta['version']))
+    if snapshot is None:
+        return None, None
+    with _snapshot_lock:
+        _snapshot_memo.update(version=meta['version'], snapshot=snapshot)
+    return snapshot, meta
+
+
+def _snapshot_payload(snapshot, scope, bbox=None, source='opensky'):
+    bbox = OPENSKY_SCOPES[scope]['bbox'] if scope in OPENSKY_SCOPES else bbox
+    flights = snapshot.flights(snapshot.query(bbox)) if snapshot is not None else []
+    return opensky_payload(scope, flights, source=source, bbox=bbox)
+
+
+def diff_flights(previous, current):
+    previous_by_id = {flight['icao24']: flight for flight in previous}
+    current_ids = set()
+    added = []
+    changed = []
+    for flight in current:
+        current_ids.add(flight['icao24'])
+        before = previous_by_id.get(flight['icao24'])
+        if before is None:
+            added.append(flight)
+        elif before != flight:
+            changed.append(flight)
+    removed = [icao24 for icao24 in previous_by_id if icao24 not in current_ids]
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+
+def _flights_at(scope, version, bbox=None):
+    if bbox is not None:
+        snapshot = cache.get(_snapshot_data_key(version))
+        return None if snapshot is None else _snapshot_payload(snapshot, CUSTOM_OPENSKY_SCOPE, bbox=bbox)['flights']
+    return cache.get(_version_key(scope, version))
+
+
+def _as_delta(payload, scope, since, bbox=None):
+    # Clients that are too far behind (base version evicted) or new get the full payload instead.
+    if since is None or payload.get('version') is None:
+        return payload
+    base = payload['flights'] if since == payload['version'] else _flights_at(scope, since, bbox=bbox)
+    if base is None:
+        return payload
+    delta = {key: value for key, value in payload.items() if key != 'flights'}
+    delta.update(diff_flights(base, payload['flights']), delta=True, since=since)
+    return delta
+
+
+async def refresh_scopes(scopes=None, locked=False, force=False):
+    # locked: the caller already holds each scope's lock. force: refresh without taking or releasing any lock.
+    if settings.OPENSKY_FETCH_MODE == 'global':
+        scopes = [SNAPSHOT_SCOPE]
+    else:
+        scopes = list(scopes or OPENSKY_SCOPES)
+    if not (locked or force):
+        scopes = await asyncio.to_thread(_acquire_locks, scopes)
+    if not scopes:
+        return {}
+
+    timeout = int(os.getenv('OPENSKY_TIMEOUT_SECONDS', '8'))
+    ok = {}
+    try:
+        regions = [scope for scope in scopes if scope != SNAPSHOT_SCOPE]
+        results = await asyncio.gather(*(fetch_states(OPENSKY_SCOPES[scope]['bbox'], timeout) for scope in regions))
+        states_by_scope = {}
+        for scope, (states, fetched) in zip(regions, results):
+            states_by_scope[scope] = states
+            ok[scope] = fetched
+
+        # Empty regional answers and the snapshot itself are served from one shared global fetch.
+        empty_regions = [scope for scope in regions if not states_by_scope[scope] and OPENSKY_SCOPES[scope]['bbox']]
+        global_scope = next((scope for scope in regions if OPENSKY_SCOPES[scope]['bbox'] is None), None)
+        if global_scope:
+            global_states, global_ok = states_by_scope[global_scope], ok[global_scope]
+        elif empty_regions or SNAPSHOT_SCOPE in scopes:
+            global_states, global_ok = await fetch_states(None, timeout)
+        else:
+            global_states, global_ok = [], False
+        snapshot = await asyncio.to_thread(StateSnapshot.from_states, global_states) if global_ok else None
+
+        payloads = {}
+        if SNAPSHOT_SCOPE in scopes:
+            ok[SNAPSHOT_SCOPE] = global_ok
+            if global_ok and settings.OPENSKY_FETCH_MODE == 'global':
+                payloads = {scope: _snapshot_payload(snapshot, scope) for scope in OPENSKY_SCOPES}
+        for scope in regions:
+            if scope in empty_regions:
+                ok[scope] = ok[scope] or global_ok
+                bbox = OPENSKY_SCOPES[scope]['bbox']
+                flights = snapshot.flights(snapshot.query(bbox)) if snapshot is not None else []
+                payloads[scope] = opensky_payload(scope, flights, source='opensky_global_filtered' if flights else 'opensky')
+            else:
+                payloads[scope] = build_opensky_payload(scope, states_by_scope[scope])
+
+        fetched_at = time.time()
+        version = int(fetched_at * 1000)
+        previous = await asyncio.to_thread(cache.get_many, [opensky_cache_key(scope) for scope in payloads])
+        envelopes = {}
+        for scope, payload in payloads.items():
+            # A failed upstream call keeps serving the last good snapshot until its hard TTL runs out.
+            if not ok.get(scope, global_ok):
+                continue
+            payload['version'] = version
+            envelopes[opensky_cache_key(scope)] = {'payload': payload, 'fetched_at': fetched_at, 'version': version}
+            # Each version's flight list stays addressable so polling clients can ask for a delta against it.
+            envelopes[_version_key(scope, version)] = payload['flights']
+        await asyncio.to_thread(cache.set_many, envelopes, settings.OPENSKY_CACHE_SECONDS)
+        if snapshot is not None:
+            await asyncio.to_thread(_store_snapshot, snapshot, fetched_at, version)
+        await publish_opensky_updates(
+            {scope: payloads[scope] for scope in payloads if opensky_cache_key(scope) in envelopes},
+            {scope: previous.get(opensky_cache_key(scope)) for scope in payloads},
+        )
+        return payloads
+    finally:
+        await asyncio.to_thread(_finish_refresh, scopes, ok, not force)
+
+
+def opensky_group(scope):
+    return f'opensky.{scope}'
+
+
+def opensky_message(scope, payload):
+    return dumps({'event': 'opensky_feed', 'scope': scope, 'payload': payload})
+
+
+async def publish_opensky_updates(payloads, previous):
+    channel_layer = get_channel_layer()
+    if not channel_layer:
+        return
+    for scope, payload in payloads.items():
+        payload = dict(payload, age_seconds=0.0, stale=False)
+        delta = None
+        if previous.get(scope) and previous[scope].get('version'):
+            # Subscribers already holding the previous version get the delta; the consumer falls back to the full payload.
+            delta = {key: value for key, value in payload.items() if key != 'flights'}
+            delta.update(
+                diff_flights(previous[scope]['payload']['flights'], payload['flights']),
+                delta=True,
+                since=previous[scope]['version'],
+            )
+        await channel_layer.group_send(
+            opensky_group(scope),
+            {
+                'type': 'opensky.update',
+                'scope': scope,
+                'version': payload.get('version'),
+                'text': opensky_message(scope, payload),
+                'since': delta['since'] if delta else None,
+                'delta_text': opensky_message(scope, delta) if delta else None,
+            },
+        )
+
+
+def _finish_refresh(scopes, ok, release=True):
+    for scope in scopes:
+        succeeded = ok.get(scope, False)
+        _record('refreshed' if succeeded else 'failed')
+        if release:
+            # A forced refresh never took the lock, so it must not extend or drop a running refresher's.
+            _release_refresh_lock(scope, succeeded)
+
+
+def _revalidate_in_background(scope):
+    if settings.OPENSKY_FETCH_MODE == 'global':
+        scope = SNAPSHOT_SCOPE
+    if not acquire_refresh_lock(scope):
+        _record('coalesced')
+        return False
+    thread = threading.Thread(
+        target=lambda: asyncio.run(refresh_scopes([scope], locked=True)),
+        name=f'opensky-revalidate-{scope}',
+        daemon=True,
+    )
+    thread.start()
+    return True
+
+
+def _pending_payload(scope, revalidate_scope, bbox=None):
+    _record('miss')
+    _revalidate_in_background(revalidate_scope)
+    # Cold cache: answer immediately with a placeholder instead of waiting on OpenSky.
+    payload = opensky_payload(scope, [], source='pending', bbox=bbox)
+    payload['pending'] = True
+    return payload
+
+
+def _with_freshness(payload, fetched_at, revalidate_scope):
+    age = time.time() - fetched_at
+    payload['age_seconds'] = round(age, 1)
+    payload['stale'] = age > settings.OPENSKY_SOFT_TTL_SECONDS
+    if payload['stale']:
+        # Stale-while-revalidate: one caller per scope wins the lock and refreshes; everyone gets the old snapshot.
+        _record('stale')
+        _revalidate_in_background(revalidate_scope)
+    else:
+        _record('fresh')
+    return payload
+
+
+def get_opensky_feed(scope='africa', bbox=None, since=None):
+    if bbox is not None:
+        snapshot, meta = load_snapshot()
+        if snapshot is None:
+            return _pending_payload(CUSTOM_OPENSKY_SCOPE, SNAPSHOT_SCOPE, bbox=bbox)
+        payload = _snapshot_payload(snapshot, CUSTOM_OPENSKY_SCOPE, bbox=bbox)
+        payload['version'] = meta['version']
+        payload = _with_freshness(payload, meta['fetched_at'], SNAPSHOT_SCOPE)
+        return _as_delta(payload, CUSTOM_OPENSKY_SCOPE, since, bbox=bbox)
+
+    normalized_scope = normalize_opensky_scope(scope)
+    envelope = cache.get(opensky_cache_key(normalized_scope))
+    if envelope is None:
+        return _pending_payload(normalized_scope, normalized_scope)
+    payload = _with_freshness(dict(envelope['payload']), envelope['fetched_at'], normalized_scope)
+    return _as_delta(payload, normalized_scope, since)
+
+
+def get_ghana_opensky_feed():
+    return get_opensky_feed('ghana')
+
+
+async def run_refresher(interval_seconds, scopes=None):
+    while True:
+        try:
+            await refresh_scopes(scopes)
+        except Exception:
+            logger.exception('OpenSky refresh cycle failed')
+        await asyncio.sleep(interval_seconds)
+
+
+class OpenSkyLifespan:
+    def __init__(self, interval_seconds=None, enabled=None):
+        self.interval_seconds = interval_seconds or settings.OPENSKY_REFRESH_SECONDS
+        self.enabled = settings.OPENSKY_REFRESH_IN_PROCESS if enabled is None else enabled
+        self.task = None
+
+    async def __call__(self, scope, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if self.enabled and self.task is None:
+                    self.task = asyncio.create_task(run_refresher(self.interval_seconds))
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.task is not None:
+                    self.task.cancel()
+                    self.task = None
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
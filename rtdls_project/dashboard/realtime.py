@@ -1,20 +1,169 @@
+import logging
+import threading
+import time
+
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import close_old_connections, transaction
 
-from .services import get_dashboard_metrics
+from operations.models import Base, FlightLog
 
+from .encoding import dumps
+from .counters import invalidate_dashboard_metrics
+from .services import OPENSKY_SCOPES, store_dashboard_metrics
 
-def broadcast_dashboard_update(event='dashboard_refresh', payload=None):
-    channel_layer = get_channel_layer()
-    if not channel_layer:
-        return
-    data = get_dashboard_metrics()
-    async_to_sync(channel_layer.group_send)(
-        'dashboard',
+logger = logging.getLogger(__name__)
+
+# Upper bound on event payloads carried by one coalesced message; the rest are only counted.
+MAX_EVENTS_PER_MESSAGE = 200
+METRICS_TOPIC = 'metrics'
+ALERTS_TOPIC = 'alerts'
+ALERT_EVENTS = {'maintenance_alert', 'maintenance_log_created'}
+TELEMETRY_EVENTS = {'flight_data_logged', 'flight_data_batch_logged'}
+ROLE_TOPICS = {
+    'admin': (METRICS_TOPIC, ALERTS_TOPIC),
+    'maintenance': (METRICS_TOPIC, ALERTS_TOPIC),
+}
+DEFAULT_TOPICS = (METRICS_TOPIC,)
+
+
+def telemetry_topic(flight_log_id):
+    return f'telemetry.{flight_log_id}'
+
+
+def base_topic(base_id):
+    return f'base.{base_id}'
+
+
+def default_topics(user):
+    return ROLE_TOPICS.get(getattr(user, 'role', None), DEFAULT_TOPICS)
+
+
+def topic_exists(topic):
+    if topic in (METRICS_TOPIC, ALERTS_TOPIC):
+        return True
+    if not isinstance(topic, str):
+        return False
+    kind, _, key = topic.partition('.')
+    if kind == 'opensky':
+        return key in OPENSKY_SCOPES
+    if not key.isdigit():
+        return False
+    if kind == 'telemetry':
+        return FlightLog.objects.filter(pk=int(key)).exists()
+    if kind == 'base':
+        return Base.objects.filter(pk=int(key)).exists()
+    return False
+
+
+def event_topics(event, payload):
+    topics = []
+    if event in ALERT_EVENTS:
+        topics.append(ALERTS_TOPIC)
+    if event in TELEMETRY_EVENTS:
+        flight_log_ids = payload.get('flight_log_ids') or [payload.get('flight_log_id')]
+        topics.extend(telemetry_topic(flight_log_id) for flight_log_id in flight_log_ids if flight_log_id)
+    topics.extend(base_topic(base_id) for base_id in payload.get('base_ids', []))
+    return topics
+
+
+def _topic_message(events, **extra):
+    carried = events[-MAX_EVENTS_PER_MESSAGE:]
+    if not events:
+        event, payload = 'dashboard_refresh', {}
+    else:
+        event, payload = carried[-1]['event'] if len(events) == 1 else 'dashboard_batch', carried[-1]['payload']
+    # Encoded once here; every subscriber's consumer forwards the same text unchanged.
+    text = dumps(
         {
-            'type': 'dashboard.event',
             'event': event,
-            'payload': payload or {},
-            'metrics': data,
-        },
+            'payload': payload,
+            'events': carried,
+            'dropped_events': len(events) - len(carried),
+            **extra,
+        }
     )
+    return {'type': 'dashboard.event', 'text': text}
+
+
+async def _send_topic_messages(channel_layer, messages):
+    for topic, message in messages.items():
+        await channel_layer.group_send(topic, message)
+
+
+def publish_dashboard_events(events):
+    channel_layer = get_channel_layer()
+    if not channel_layer or not events:
+        return
+    by_topic = {}
+    unrouted = []
+    for entry in events:
+        topics = event_topics(entry['event'], entry['payload'])
+        for topic in topics:
+            by_topic.setdefault(topic, []).append(entry)
+        if not topics:
+            unrouted.append(entry)
+    # Every role joins metrics, so it carries the recomputed KPIs and only events no narrower topic delivers.
+    messages = {METRICS_TOPIC: _topic_message(unrouted, topic=METRICS_TOPIC, metrics=store_dashboard_metrics())}
+    for topic, entries in by_topic.items():
+        messages[topic] = _topic_message(entries, topic=topic)
+    async_to_sync(_send_topic_messages)(channel_layer, messages)
+
+
+class BroadcastScheduler:
+    def __init__(self, window_seconds, publish=publish_dashboard_events):
+        self.window_seconds = window_seconds
+        self.publish = publish
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def schedule(self, event, payload):
+        entry = {'event': event, 'payload': payload}
+        if self.window_seconds <= 0:
+            self.publish([entry])
+            return
+        with self._lock:
+            self._pending.append(entry)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='dashboard-broadcast', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def drain(self):
+        with self._lock:
+            events = self._pending
+            self._pending = []
+            self._wakeup.clear()
+        return events
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            # Let the burst accumulate for one window, then fan out a single message.
+            time.sleep(self.window_seconds)
+            events = self.drain()
+            if not events:
+                continue
+            try:
+                self.publish(events)
+            except Exception:
+                logger.exception('Dashboard broadcast failed; dropped %d coalesced event(s).', len(events))
+            finally:
+                close_old_connections()
+
+
+scheduler = BroadcastScheduler(settings.DASHBOARD_BROADCAST_WINDOW_MS / 1000.0)
+
+
+def broadcast_dashboard_update(event='dashboard_refresh', payload=None):
+    payload = payload or {}
+    # Defer until commit so the worker thread sees the rows that triggered the event.
+    transaction.on_commit(lambda: _invalidate_and_schedule(event, payload))
+
+
+def _invalidate_and_schedule(event, payload):
+    invalidate_dashboard_metrics()
+    scheduler.schedule(event, payload)
@@ -1,17 +1,25 @@
 import json
 import os
-import base64
 import random
-from urllib.error import HTTPError, URLError
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 
+from django.conf import settings
 from django.core.cache import cache
-from django.db.models import Q, Sum
 from django.utils import timezone
 
-from maintenance.models import Alert
-from operations.models import Aircraft, Crew, FlightData, FlightLog
+from operations.models import FlightData, FlightLog
+from operations.downsampling import downsample_series
+from rtdls.dates import date_window_filter
+
+from .counters import (
+    AIRCRAFT_AVAILABLE,
+    ALERTS_UNRESOLVED,
+    CREW_AVAILABLE,
+    FLIGHT_DAY_FIELDS,
+    flight_day_key,
+    metrics_version,
+    read_counters,
+    top_aircraft_hours,
+)
 
 GHANA_BBOX = {
     'lamin': 4.5,
@@ -96,6 +104,8 @@ def _load_opensky_scopes():
 
 OPENSKY_SCOPES = _load_opensky_scopes()
 
+CUSTOM_OPENSKY_SCOPE = 'custom'
+CUSTOM_OPENSKY_SCOPE_LABEL = 'Custom area'
 DEFAULT_OPENSKY_SCOPE = os.getenv('OPENSKY_DEFAULT_SCOPE', 'africa').strip().lower()
 if DEFAULT_OPENSKY_SCOPE not in OPENSKY_SCOPES:
     DEFAULT_OPENSKY_SCOPE = 'africa'
@@ -117,16 +127,6 @@ def _in_bbox(latitude, longitude, bbox):
     )
 
 
-def _state_in_bbox(state, bbox):
-    if bbox is None:
-        return True
-    longitude = state[5]
-    latitude = state[6]
-    if longitude is None or latitude is None:
-        return False
-    return _in_bbox(float(latitude), float(longitude), bbox)
-
-
 def _build_demo_flights(scope_key, bbox):
     random.seed(f'ghaf-rtdls-{scope_key}')
     seed_points = [
@@ -174,27 +174,6 @@ def _build_demo_flights(scope_key, bbox):
     return flights[:20]
 
 
-def _fetch_opensky_states(bbox, timeout):
-    endpoint = os.getenv('OPENSKY_STATES_URL', 'https://opensky-network.org/api/states/all')
-    if bbox:
-        params = urlencode(bbox)
-        url = f'{endpoint}?{params}'
-    else:
-        url = endpoint
-    request = Request(url, headers={'User-Agent': 'GAF-RTDLS-Dashboard/1.0'})
-
-    username = os.getenv('OPENSKY_USERNAME', '').strip()
-    password = os.getenv('OPENSKY_PASSWORD', '').strip()
-    if username and password:
-        token = base64.b64encode(f'{username}:{password}'.encode('utf-8')).decode('ascii')
-        request.add_header('Authorization', f'Basic {token}')
-
-    with urlopen(request, timeout=timeout) as response:
-        content = response.read().decode('utf-8')
-        raw = json.loads(content)
-    return raw.get('states') or []
-
-
 def _normalize_opensky_state(state):
     longitude = state[5]
     latitude = state[6]
@@ -217,47 +196,52 @@ def _normalize_opensky_state(state):
     }
 
 
-def get_opensky_feed(scope='africa'):
+def normalize_opensky_scope(scope):
     normalized_scope = (scope or '').strip().lower() or DEFAULT_OPENSKY_SCOPE
     if normalized_scope not in OPENSKY_SCOPES:
         normalized_scope = DEFAULT_OPENSKY_SCOPE
+    return normalized_scope
 
-    cache_key = f'dashboard:opensky:{normalized_scope}'
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return cached
 
-    timeout = int(os.getenv('OPENSKY_TIMEOUT_SECONDS', '8'))
-    scope_config = OPENSKY_SCOPES[normalized_scope]
-    query_bbox = scope_config['bbox']
+def parse_bbox(raw_bbox):
+    parts = [part.strip() for part in (raw_bbox or '').split(',')]
+    if len(parts) != 4:
+        raise ValueError('bbox must be "lamin,lomin,lamax,lomax".')
+    try:
+        lamin, lomin, lamax, lomax = (float(part) for part in parts)
+    except ValueError:
+        raise ValueError('bbox values must be numbers.')
+    if not (-90.0 <= lamin < lamax <= 90.0):
+        raise ValueError('bbox latitudes must satisfy -90 <= lamin < lamax <= 90.')
+    if not (-180.0 <= lomin <= 180.0 and -180.0 <= lomax <= 180.0):
+        raise ValueError('bbox longitudes must be within -180..180.')
+    return {'lamin': lamin, 'lomin': lomin, 'lamax': lamax, 'lomax': lomax}
 
+
+def opensky_payload(scope, flights, source='opensky', bbox=None):
+    scope_config = OPENSKY_SCOPES.get(scope) or {'label': CUSTOM_OPENSKY_SCOPE_LABEL, 'bbox': bbox}
+    query_bbox = scope_config['bbox']
     payload = {
-        'source': 'opensky',
+        'source': source,
         'generated_at': timezone.now().isoformat(),
-        'requested_scope': normalized_scope,
+        'requested_scope': scope,
         'requested_scope_label': scope_config['label'],
-        'query_scope': normalized_scope,
+        'query_scope': scope,
         'query_scope_label': scope_config['label'],
         'query_bbox': query_bbox,
         'simulated': False,
-        'flights': [],
+        'flights': flights,
     }
 
-    try:
-        states = _fetch_opensky_states(query_bbox, timeout)
-    except (HTTPError, URLError, TimeoutError, OSError, ValueError):
-        states = []
-
-    # If scoped query is empty, try global and filter back into the requested region.
-    if not states and query_bbox is not None:
-        try:
-            global_states = _fetch_opensky_states(None, timeout)
-            states = [state for state in global_states if _state_in_bbox(state, query_bbox)]
-            if states:
-                payload['source'] = 'opensky_global_filtered'
-        except (HTTPError, URLError, TimeoutError, OSError, ValueError):
-            states = []
+    if not payload['flights'] and _env_bool('OPENSKY_DEMO_FALLBACK', True):
+        payload['simulated'] = True
+        payload['source'] = 'simulated'
+        payload['flights'] = _build_demo_flights(scope, query_bbox)
+        payload['note'] = 'Live OpenSky traffic unavailable. Showing simulated demo flights.'
+    return payload
+
 
+def build_opensky_payload(scope, states, source='opensky'):
     flights = []
     for state in states:
         normalized = _normalize_opensky_state(state)
@@ -265,57 +249,59 @@ def get_opensky_feed(scope='africa'):
             flights.append(normalized)
 
     flights.sort(key=lambda row: row['callsign'])
-    payload['flights'] = flights[:250]
+    return opensky_payload(scope, flights[:250], source=source)
 
-    if not payload['flights'] and _env_bool('OPENSKY_DEMO_FALLBACK', True):
-        payload['simulated'] = True
-        payload['source'] = 'simulated'
-        payload['flights'] = _build_demo_flights(normalized_scope, query_bbox)
-        payload['note'] = 'Live OpenSky traffic unavailable. Showing simulated demo flights.'
 
-    cache.set(cache_key, payload, 20)
-    return payload
+def metrics_cache_key(version):
+    return f'dashboard:metrics:{version}'
+
+
+def store_dashboard_metrics(version=None):
+    # Read the version first so a write committed mid-computation leaves this snapshot unused.
+    version = metrics_version() if version is None else version
+    metrics = get_dashboard_metrics()
+    cache.set(metrics_cache_key(version), metrics, settings.DASHBOARD_METRICS_CACHE_SECONDS)
+    return metrics
 
 
-def get_ghana_opensky_feed():
-    return get_opensky_feed('ghana')
+def get_cached_dashboard_metrics():
+    version = metrics_version()
+    metrics = cache.get(metrics_cache_key(version))
+    if metrics is None:
+        metrics = store_dashboard_metrics(version)
+    return metrics
 
 
 def get_dashboard_metrics():
     now = timezone.now()
     today = timezone.localdate()
-    flights_today_qs = FlightLog.objects.filter(flight_datetime__date=today)
-    flights_today = flights_today_qs.count()
-    active_missions = flights_today_qs.filter(mission_status=FlightLog.MissionStatus.ACTIVE).count()
-    delayed_arrivals = flights_today_qs.filter(
-        Q(remarks__icontains='delay') | Q(remarks__icontains='late')
-    ).count()
-    cancelled_flights = flights_today_qs.filter(remarks__icontains='cancel').count()
-    completed_flights = flights_today_qs.filter(mission_status=FlightLog.MissionStatus.COMPLETED).count()
+    counters = read_counters(
+        [AIRCRAFT_AVAILABLE, CREW_AVAILABLE, ALERTS_UNRESOLVED]
+        + [flight_day_key(today, field) for field in FLIGHT_DAY_FIELDS]
+    )
+    flights_today = int(counters[flight_day_key(today, 'total')])
+    active_missions = int(counters[flight_day_key(today, 'active')])
+    delayed_arrivals = int(counters[flight_day_key(today, 'delayed')])
+    cancelled_flights = int(counters[flight_day_key(today, 'cancelled')])
+    completed_flights = int(counters[flight_day_key(today, 'completed')])
     landed_flights = max(completed_flights - cancelled_flights, 0)
-    scheduled_flights = flights_today_qs.filter(flight_datetime__gt=now).exclude(remarks__icontains='cancel').count()
+    # "Scheduled" depends on the current time, so it cannot be kept as an incremental counter.
+    scheduled_flights = (
+        FlightLog.objects.filter(**date_window_filter('flight_datetime', today), flight_datetime__gt=now)
+        .exclude(is_cancelled=True)
+        .count()
+    )
     on_time_departure_rate = (
         round((max(flights_today - delayed_arrivals - cancelled_flights, 0) / flights_today) * 100, 1)
         if flights_today
         else 100.0
     )
 
-    maintenance_alerts = Alert.objects.filter(is_resolved=False).count()
-    crew_available = Crew.objects.filter(is_available=True).count()
-    aircraft_available = Aircraft.objects.filter(status=Aircraft.Status.AVAILABLE).count()
+    maintenance_alerts = int(counters[ALERTS_UNRESOLVED])
+    crew_available = int(counters[CREW_AVAILABLE])
+    aircraft_available = int(counters[AIRCRAFT_AVAILABLE])
 
-    utilization_data = (
-        FlightLog.objects.values('aircraft__tail_number')
-        .annotate(total_hours=Sum('flight_hours'))
-        .order_by('-total_hours')[:5]
-    )
-    utilization = [
-        {
-            'aircraft': row['aircraft__tail_number'],
-            'hours': float(row['total_hours'] or 0.0),
-        }
-        for row in utilization_data
-    ]
+    utilization = top_aircraft_hours(5)
 
     status_distribution = {
         'airborne': active_missions,
@@ -344,16 +330,16 @@ def get_dashboard_metrics():
             'updated_time': timezone.localtime(latest_telemetry.timestamp).strftime('%I:%M:%S %p'),
         }
 
-    trend_qs = FlightData.objects.none()
+    trend_points = []
     if latest_telemetry:
-        trend_qs = FlightData.objects.filter(flight_log_id=latest_telemetry.flight_log_id).order_by('timestamp')[:18]
+        trend_points = downsample_series(latest_telemetry.flight_log_id, 'altitude', points=18)['points']
 
     altitude_trend = [
         {
-            'time': timezone.localtime(item.timestamp).strftime('%H:%M'),
-            'altitude': float(item.altitude),
+            'time': timezone.localtime(point['time']).strftime('%H:%M'),
+            'altitude': round(point['value'], 1),
         }
-        for item in trend_qs
+        for point in trend_points
     ]
     if not altitude_trend:
         altitude_trend = [
@@ -382,5 +368,6 @@ def get_dashboard_metrics():
         'status_distribution': status_distribution,
         'live_feed': live_feed,
         'altitude_trend': altitude_trend,
+        'telemetry_flight_log_id': latest_telemetry.flight_log_id if latest_telemetry else None,
         'last_updated': timezone.now().isoformat(),
     }
@@ -0,0 +1,102 @@
+import numpy as np
+
+# Grid cells are CELL_DEGREES on a side; cell ids run row-major from (-90, -180).
+CELL_DEGREES = 1.0
+GRID_COLUMNS = int(360 / CELL_DEGREES)
+GRID_ROWS = int(180 / CELL_DEGREES)
+NUMERIC_COLUMNS = ('latitude', 'longitude', 'altitude_ft', 'speed_knots', 'heading')
+TEXT_COLUMNS = ('icao24', 'callsign', 'origin_country')
+
+
+def _cell_coordinates(latitude, longitude):
+    rows = np.clip(((np.asarray(latitude) + 90.0) // CELL_DEGREES).astype(np.int64), 0, GRID_ROWS - 1)
+    columns = np.clip(((np.asarray(longitude) + 180.0) // CELL_DEGREES).astype(np.int64), 0, GRID_COLUMNS - 1)
+    return rows, columns
+
+
+class StateSnapshot:
+    def __init__(self, columns):
+        self.columns = columns
+        rows, cols = _cell_coordinates(columns['latitude'], columns['longitude'])
+        cells = rows * GRID_COLUMNS + cols
+        self.order = np.argsort(cells, kind='stable')
+        self.sorted_cells = cells[self.order]
+
+    def __len__(self):
+        return len(self.columns['latitude'])
+
+    @classmethod
+    def from_states(cls, states):
+        records = {name: [] for name in NUMERIC_COLUMNS + TEXT_COLUMNS + ('on_ground',)}
+        for state in states:
+            longitude = state[5]
+            latitude = state[6]
+            if longitude is None or latitude is None:
+                continue
+            altitude_m = float((state[13] if state[13] is not None else state[7]) or 0.0)
+            records['icao24'].append(state[0])
+            records['callsign'].append((state[1] or '').strip() or (state[0] or '').upper())
+            records['origin_country'].append(state[2])
+            records['latitude'].append(float(latitude))
+            records['longitude'].append(float(longitude))
+            records['altitude_ft'].append(altitude_m * 3.28084)
+            records['speed_knots'].append(float(state[9] or 0.0) * 1.94384)
+            records['heading'].append(float(state[10] or 0.0))
+            records['on_ground'].append(bool(state[8]))
+
+        columns = {name: np.asarray(records[name], dtype=np.float64) for name in NUMERIC_COLUMNS}
+        columns.update({name: np.asarray(records[name], dtype=object) for name in TEXT_COLUMNS})
+        columns['on_ground'] = np.asarray(records['on_ground'], dtype=bool)
+        return cls(columns)
+
+    def query(self, bbox):
+        if bbox is None:
+            return np.arange(len(self))
+        low_row, low_col = _cell_coordinates(bbox['lamin'], bbox['lomin'])
+        high_row, high_col = _cell_coordinates(bbox['lamax'], bbox['lomax'])
+        if low_col <= high_col:
+            column_spans = [(low_col, high_col)]
+        else:
+            # The box crosses the antimeridian.
+            column_spans = [(low_col, GRID_COLUMNS - 1), (0, high_col)]
+
+        # Each grid row maps to one contiguous run of sorted cell ids per column span.
+        slices = []
+        for row in range(int(low_row), int(high_row) + 1):
+            for first, last in column_spans:
+                start = np.searchsorted(self.sorted_cells, row * GRID_COLUMNS + first, side='left')
+                stop = np.searchsorted(self.sorted_cells, row * GRID_COLUMNS + last, side='right')
+                if stop > start:
+                    slices.append(self.order[start:stop])
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+
+        candidates = np.concatenate(slices)
+        latitude = self.columns['latitude'][candidates]
+        longitude = self.columns['longitude'][candidates]
+        inside = (latitude >= bbox['lamin']) & (latitude <= bbox['lamax'])
+        if bbox['lomin'] <= bbox['lomax']:
+            inside &= (longitude >= bbox['lomin']) & (longitude <= bbox['lomax'])
+        else:
+            inside &= (longitude >= bbox['lomin']) | (longitude <= bbox['lomax'])
+        return candidates[inside]
+
+    def flights(self, indices, limit=250):
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices):
+            indices = indices[np.argsort(self.columns['callsign'][indices].astype(str), kind='stable')][:limit]
+        columns = self.columns
+        return [
+            {
+                'icao24': columns['icao24'][idx],
+                'callsign': columns['callsign'][idx],
+                'origin_country': columns['origin_country'][idx],
+                'longitude': round(float(columns['longitude'][idx]), 5),
+                'latitude': round(float(columns['latitude'][idx]), 5),
+                'altitude_ft': int(round(columns['altitude_ft'][idx])),
+                'speed_knots': int(round(columns['speed_knots'][idx])),
+                'heading': round(float(columns['heading'][idx]), 1),
+                'on_ground': bool(columns['on_ground'][idx]),
+            }
+            for idx in indices
+        ]
@@ -1,8 +1,37 @@
+import asyncio
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+import json
+import os
+import threading
+import time
+
+import numpy as np
+from channels.db import database_sync_to_async
+from asgiref.testing import ApplicationCommunicator
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
 from django.test import TestCase
 from django.test.utils import override_settings
+from django.utils import timezone
 from unittest.mock import patch
 
+from dashboard import realtime
+from dashboard.consumers import DashboardConsumer, TelemetryIngestConsumer
+from dashboard.counters import CREW_AVAILABLE, flight_day_key, reconcile_counters
+from dashboard.models import DashboardCounter
+from dashboard.opensky import SNAPSHOT_SCOPE, acquire_refresh_lock, opensky_cache_key, opensky_cache_stats, refresh_scopes
+from dashboard.realtime import BroadcastScheduler
+from dashboard.services import build_opensky_payload, get_cached_dashboard_metrics, get_dashboard_metrics
+from dashboard.spatial import StateSnapshot
+from maintenance.models import MaintenanceLog
+from operations.models import Aircraft, Base, Crew, FlightData, FlightLog, Pilot
+from rtdls.tests import QueryPlanTestCase
+
 User = get_user_model()
 
 
@@ -53,3 +82,537 @@ class SecurityViewTests(TestCase):
                 'flights': [],
             },
         )
+
+
+class DashboardCounterTests(TestCase):
+    def setUp(self):
+        self.base_a = Base.objects.create(name='Accra', location='Accra')
+        self.base_b = Base.objects.create(name='Kumasi', location='Kumasi')
+        self.aircraft = Aircraft.objects.create(tail_number='GAF-010', model='C-295', home_base=self.base_a)
+        self.pilot = Pilot.objects.create(full_name='Flt Lt Boateng', rank='Flt Lt')
+        self.user = User.objects.create_user(username='counterops', password='StrongPass123!', role='flight_ops')
+
+    def _create_flight(self, **overrides):
+        atd = timezone.now() - timedelta(minutes=30)
+        values = {
+            'aircraft': self.aircraft,
+            'pilot': self.pilot,
+            'mission_type': 'Training',
+            'atd': atd,
+            'eta': atd + timedelta(hours=1),
+            'flight_hours': 1.5,
+            'fuel_used': 200,
+            'departure_base': self.base_a,
+            'arrival_base': self.base_b,
+            'remarks': 'Routine',
+            'logged_by': self.user,
+        }
+        values.update(overrides)
+        return FlightLog.objects.create(**values)
+
+    def test_signals_keep_counters_in_sync_with_source_tables(self):
+        flight = self._create_flight()
+        self._create_flight(remarks='Departure delayed by weather', marked_delayed=True, flight_hours=2.0)
+        Crew.objects.create(full_name='Sgt Owusu', rank='Sgt', role='Crew', is_available=True)
+
+        flight.ata = flight.eta
+        flight.remarks = 'Cancelled after engine start'
+        flight.is_cancelled = True
+        flight.save()
+
+        log = MaintenanceLog.objects.create(
+            aircraft=self.aircraft,
+            total_flight_hours=150,
+            last_maintenance_date=timezone.localdate(),
+            component_status='Engine check',
+            logged_by=self.user,
+        )
+        log.total_flight_hours = 10
+        log.save()
+
+        self.aircraft.status = Aircraft.Status.IN_MAINTENANCE
+        self.aircraft.save()
+        flight.delete()
+
+        self.assertEqual(reconcile_counters(apply=False), {})
+        metrics = get_dashboard_metrics()
+        self.assertEqual(metrics['flights_today'], 1)
+        self.assertEqual(metrics['delayed_arrivals'], 1)
+        self.assertEqual(metrics['aircraft_available'], 0)
+        self.assertEqual(metrics['crew_availability'], 1)
+        self.assertEqual(metrics['maintenance_alerts'], 0)
+        self.assertEqual(metrics['aircraft_utilization'], [{'aircraft': 'GAF-010', 'hours': 2.0}])
+
+    def test_reconcile_command_reports_and_repairs_drift(self):
+        self._create_flight()
+        DashboardCounter.objects.filter(key=flight_day_key(timezone.localdate(), 'total')).update(value=7)
+        DashboardCounter.objects.create(key=CREW_AVAILABLE, value=3)
+
+        output = StringIO()
+        call_command('reconcile_dashboard_metrics', '--dry-run', stdout=output)
+        self.assertIn('Detected drift on 2 counter(s).', output.getvalue())
+
+        call_command('reconcile_dashboard_metrics', stdout=StringIO())
+        self.assertEqual(reconcile_counters(apply=False), {})
+        self.assertEqual(get_dashboard_metrics()['flights_today'], 1)
+
+    def test_dashboard_metrics_query_budget(self):
+        flight = self._create_flight(marked_delayed=True)
+        FlightData.objects.create(
+            flight_log=flight,
+            timestamp=timezone.now(),
+            altitude=3500,
+            speed=240,
+            engine_temp=610,
+            fuel_level=70,
+            heading=90,
+        )
+        # Counters, scheduled flights, utilization (2), latest telemetry, rollup bounds and rollup series.
+        with self.assertNumQueries(7):
+            metrics = get_dashboard_metrics()
+        self.assertEqual(metrics['delayed_arrivals'], 1)
+
+    def test_cached_metrics_are_reused_until_a_write_commits(self):
+        cache.clear()
+        flights_today = get_cached_dashboard_metrics()['flights_today']
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_dashboard_metrics()['flights_today'], flights_today)
+
+        with patch.object(realtime.scheduler, 'schedule'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self._create_flight()
+                self.assertEqual(get_cached_dashboard_metrics()['flights_today'], flights_today)
+        self.assertEqual(get_cached_dashboard_metrics()['flights_today'], flights_today + 1)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class DashboardQueryPlanTests(QueryPlanTestCase):
+    def test_dashboard_metrics_use_indexes(self):
+        plans = self.assertNoSequentialScans(get_dashboard_metrics)
+        self.assertTrue(any('flightdata_ts_idx' in ' '.join(plan) for _sql, plan in plans))
+
+    def test_dashboard_page_uses_indexes(self):
+        self.client.force_login(self.planner)
+        plans = self.assertNoSequentialScans(self.client.get, '/dashboard/')
+        self.assertTrue(any('alert_unresolved_idx' in ' '.join(plan) for _sql, plan in plans))
+
+
+class BroadcastSchedulerTests(TestCase):
+    def test_burst_of_events_is_coalesced_into_one_publish(self):
+        published = []
+        done = threading.Event()
+
+        def publish(events):
+            published.append(events)
+            done.set()
+
+        scheduler = BroadcastScheduler(0.05, publish=publish)
+        for idx in range(500):
+            scheduler.schedule('flight_data_logged', {'flight_data_id': idx})
+
+        self.assertTrue(done.wait(2))
+        self.assertEqual(len(published), 1)
+        self.assertEqual(len(published[0]), 500)
+        self.assertEqual(published[0][-1]['payload'], {'flight_data_id': 499})
+
+    def test_broadcast_is_deferred_until_commit(self):
+        with patch.object(realtime.scheduler, 'schedule') as mock_schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                realtime.broadcast_dashboard_update(event='maintenance_alert', payload={'alert_id': 3})
+                mock_schedule.assert_not_called()
+        mock_schedule.assert_called_once_with('maintenance_alert', {'alert_id': 3})
+
+
+class DashboardTopicTests(TestCase):
+    def setUp(self):
+        self.base_a = Base.objects.create(name='Accra', location='Accra')
+        self.base_b = Base.objects.create(name='Takoradi', location='Takoradi')
+        aircraft = Aircraft.objects.create(tail_number='GAF-040', model='C-295', home_base=self.base_a)
+        User.objects.create_user(username='topicops', password='StrongPass123!', role='flight_ops')
+        User.objects.create_user(username='topicmaint', password='StrongPass123!', role='maintenance')
+        self.flight_log = FlightLog.objects.create(
+            aircraft=aircraft,
+            mission_type='Training',
+            atd=timezone.now() - timedelta(hours=1),
+            eta=timezone.now() + timedelta(hours=1),
+            flight_hours=2.0,
+            fuel_used=300,
+            departure_base=self.base_a,
+            arrival_base=self.base_b,
+        )
+
+    async def _connect(self, username):
+        user = await database_sync_to_async(User.objects.get)(username=username)
+        communicator = ApplicationCommunicator(
+            DashboardConsumer.as_asgi(),
+            {'type': 'websocket', 'path': '/ws/dashboard/', 'headers': [], 'subprotocols': [], 'user': user},
+        )
+        await communicator.send_input({'type': 'websocket.connect'})
+        self.assertEqual((await communicator.receive_output(timeout=2))['type'], 'websocket.accept')
+        initial = json.loads((await communicator.receive_output(timeout=2))['text'])
+        return communicator, initial
+
+    async def _send(self, communicator, message):
+        await communicator.send_input({'type': 'websocket.receive', 'text': json.dumps(message)})
+        return json.loads((await communicator.receive_output(timeout=2))['text'])
+
+    async def _receive(self, communicator):
+        return json.loads((await communicator.receive_output(timeout=2))['text'])
+
+    async def test_events_fan_out_only_to_subscribed_topics(self):
+        ops, initial = await self._connect('topicops')
+        self.assertEqual(initial['topics'], ['metrics'])
+        maintenance, initial = await self._connect('topicmaint')
+        self.assertEqual(initial['topics'], ['alerts', 'metrics'])
+        metrics_subscriber, _ = await self._connect('topicops')
+
+        telemetry = f'telemetry.{self.flight_log.id}'
+        self.assertEqual((await self._send(ops, {'action': 'subscribe', 'topic': 'telemetry.999999'}))['event'], 'error')
+        self.assertEqual((await self._send(ops, {'action': 'subscribe', 'topic': telemetry}))['event'], 'subscribed')
+        self.assertEqual((await self._send(ops, {'action': 'unsubscribe', 'topic': 'metrics'}))['event'], 'unsubscribed')
+
+        await database_sync_to_async(realtime.publish_dashboard_events)(
+            [{'event': 'flight_data_logged', 'payload': {'flight_data_id': 1, 'flight_log_id': self.flight_log.id}}]
+        )
+        pushed = await self._receive(ops)
+        self.assertEqual(pushed['topic'], telemetry)
+        self.assertNotIn('metrics', pushed)
+        self.assertTrue(await ops.receive_nothing(timeout=0.1))
+        metrics_only = await self._receive(maintenance)
+        self.assertEqual(metrics_only['topic'], 'metrics')
+        self.assertEqual((metrics_only['event'], metrics_only['events']), ('dashboard_refresh', []))
+        self.assertIn('flights_today', metrics_only['metrics'])
+        self.assertTrue(await maintenance.receive_nothing(timeout=0.1))
+        # The telemetry event itself never reaches a socket that only follows metrics.
+        self.assertEqual((await self._receive(metrics_subscriber))['events'], [])
+        self.assertTrue(await metrics_subscriber.receive_nothing(timeout=0.1))
+
+        await database_sync_to_async(realtime.publish_dashboard_events)(
+            [{'event': 'maintenance_alert', 'payload': {'alert_id': 1, 'base_ids': [self.base_a.id]}}]
+        )
+        received = {message['topic']: message for message in [await self._receive(maintenance) for _idx in range(2)]}
+        self.assertEqual(sorted(received), ['alerts', 'metrics'])
+        self.assertEqual([item['event'] for item in received['alerts']['events']], ['maintenance_alert'])
+        self.assertEqual(received['metrics']['events'], [])
+        self.assertTrue(await ops.receive_nothing(timeout=0.1))
+        self.assertEqual((await self._receive(metrics_subscriber))['events'], [])
+
+        for communicator in (ops, maintenance, metrics_subscriber):
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait(timeout=2)
+
+    async def test_broadcast_is_encoded_once_for_all_subscribers(self):
+        first, _ = await self._connect('topicops')
+        second, _ = await self._connect('topicmaint')
+        with patch('dashboard.realtime.dumps', wraps=realtime.dumps) as mock_dumps:
+            await database_sync_to_async(realtime.publish_dashboard_events)(
+                [{'event': 'dashboard_refresh', 'payload': {}}]
+            )
+        self.assertEqual(mock_dumps.call_count, 1)
+        text = (await first.receive_output(timeout=2))['text']
+        self.assertEqual((await second.receive_output(timeout=2))['text'], text)
+        self.assertIn('flights_today', json.loads(text)['metrics'])
+
+        for communicator in (first, second):
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait(timeout=2)
+
+    def test_fanout_benchmark_reports_each_socket_count(self):
+        output = StringIO()
+        call_command('benchmark_dashboard_fanout', sockets=[5, 20], events=2, stdout=output)
+        self.assertIn('5 sockets:', output.getvalue())
+        self.assertIn('20 sockets:', output.getvalue())
+
+
+@override_settings(TELEMETRY_STREAM_BATCH_SIZE=4, TELEMETRY_STREAM_BUFFER_MAX=6, TELEMETRY_STREAM_FLUSH_MS=50)
+class TelemetryIngestConsumerTests(TestCase):
+    def setUp(self):
+        base_a = Base.objects.create(name='Accra', location='Accra')
+        base_b = Base.objects.create(name='Tamale', location='Tamale')
+        aircraft = Aircraft.objects.create(tail_number='GAF-030', model='C-295', home_base=base_a)
+        pilot = Pilot.objects.create(full_name='Flt Lt Quaye', rank='Flt Lt')
+        self.ops = User.objects.create_user(username='streamops', password='StrongPass123!', role='flight_ops')
+        self.flight_log = FlightLog.objects.create(
+            aircraft=aircraft,
+            pilot=pilot,
+            mission_type='Recon',
+            atd=timezone.now() - timedelta(hours=1),
+            eta=timezone.now() + timedelta(hours=1),
+            flight_hours=2.0,
+            fuel_used=300,
+            departure_base=base_a,
+            arrival_base=base_b,
+            logged_by=self.ops,
+        )
+
+    def _communicator(self, user):
+        return ApplicationCommunicator(
+            TelemetryIngestConsumer.as_asgi(),
+            {'type': 'websocket', 'path': '/ws/telemetry/', 'headers': [], 'subprotocols': [], 'user': user},
+        )
+
+    async def _connect(self, communicator):
+        await communicator.send_input({'type': 'websocket.connect'})
+        return await communicator.receive_output(timeout=2)
+
+    async def _send_text(self, communicator, text):
+        await communicator.send_input({'type': 'websocket.receive', 'text': text})
+
+    def _line(self, idx):
+        return json.dumps(
+            {
+                'flight_log': self.flight_log.id,
+                'altitude': 1000 + idx,
+                'speed': 250,
+                'engine_temp': 80,
+                'fuel_level': 70,
+                'heading': 90,
+            }
+        )
+
+    async def _receive_until(self, communicator, event_name):
+        while True:
+            output = await communicator.receive_output(timeout=2)
+            message = json.loads(output['text'])
+            if message['event'] == event_name:
+                return message
+
+    async def test_stream_flushes_in_batches_and_applies_backpressure(self):
+        communicator = self._communicator(self.ops)
+        accepted = await self._connect(communicator)
+        self.assertEqual(accepted['type'], 'websocket.accept')
+
+        await self._send_text(communicator, '\n'.join(self._line(idx) for idx in range(8)) + '\nnot-json')
+        backpressure = await self._receive_until(communicator, 'backpressure')
+        self.assertEqual(backpressure['buffered'], 6)
+        ack = await self._receive_until(communicator, 'ack')
+        self.assertEqual(ack['accepted'], 8)
+        self.assertEqual(len(ack['rejected']), 1)
+
+        await self._send_text(communicator, self._line(99))
+        flushed = await self._receive_until(communicator, 'flushed')
+        self.assertEqual(flushed['total_stored'], 9)
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(timeout=2)
+
+        count = await database_sync_to_async(FlightData.objects.filter(flight_log=self.flight_log).count)()
+        self.assertEqual(count, 9)
+
+    async def test_failed_batch_is_reported_and_logged(self):
+        communicator = self._communicator(self.ops)
+        await self._connect(communicator)
+
+        with patch('dashboard.consumers.store_stream_batch', side_effect=DatabaseError('database is locked')):
+            with self.assertLogs('dashboard.consumers', level='ERROR'):
+                await self._send_text(communicator, '\n'.join(self._line(idx) for idx in range(4)))
+                error = await self._receive_until(communicator, 'error')
+        self.assertEqual((error['rejected'], error['buffered']), (4, 0))
+
+        await self._send_text(communicator, self._line(99))
+        flushed = await self._receive_until(communicator, 'flushed')
+        self.assertEqual(flushed['total_stored'], 1)
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(timeout=2)
+
+    async def test_stream_rejects_read_only_roles(self):
+        auditor = await database_sync_to_async(User.objects.create_user)(
+            username='streamauditor', password='StrongPass123!', role='auditor'
+        )
+        closed = await self._connect(self._communicator(auditor))
+        self.assertEqual(closed, {'type': 'websocket.close', 'code': 4003})
+
+
+class OpenSkyStubHandler(BaseHTTPRequestHandler):
+    # Regional (bbox) queries come back empty; the global query returns one aircraft over Accra.
+    requests = []
+    release = threading.Event()
+    global_states = []
+
+    def do_GET(self):
+        OpenSkyStubHandler.requests.append(self.path)
+        OpenSkyStubHandler.release.wait(timeout=5)
+        states = [] if '?' in self.path else OpenSkyStubHandler.global_states
+        body = json.dumps({'time': 0, 'states': states}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OpenSkyRefreshTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        OpenSkyStubHandler.requests = []
+        OpenSkyStubHandler.release.set()
+        OpenSkyStubHandler.global_states = [self._state('abc123', 'GAF101  ', 5.6, -0.17)]
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), OpenSkyStubHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        env = patch.dict(os.environ, {'OPENSKY_STATES_URL': f'http://127.0.0.1:{self.server.server_port}/states'})
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client.force_login(User.objects.create_user(username='mapviewer', password='StrongPass123!', role='auditor'))
+
+    def _state(self, icao24, callsign, latitude, longitude):
+        return [icao24, callsign, 'Ghana', 0, 0, longitude, latitude, 3000.0, False, 120.0, 90.0, 0, None, 3100.0, None, False, 0]
+
+    def _wait_for_revalidation(self):
+        for thread in threading.enumerate():
+            if thread.name.startswith('opensky-revalidate-'):
+                thread.join(timeout=5)
+
+    def test_cold_cache_misses_are_coalesced_into_one_background_refresh(self):
+        OpenSkyStubHandler.release.clear()
+        responses = [self.client.get('/dashboard/api/opensky/?scope=ghana').json() for _ in range(5)]
+        OpenSkyStubHandler.release.set()
+        self._wait_for_revalidation()
+
+        self.assertTrue(all(response['pending'] for response in responses))
+        # One global snapshot fetch, however many callers missed.
+        self.assertEqual(OpenSkyStubHandler.requests, ['/states'])
+        stats = opensky_cache_stats()
+        self.assertEqual((stats['miss'], stats['coalesced'], stats['refreshed']), (5, 4, 1))
+        feed = self.client.get('/dashboard/api/opensky/?scope=ghana').json()
+        self.assertFalse(feed['stale'])
+        self.assertEqual([flight['callsign'] for flight in feed['flights']], ['GAF101'])
+
+    def test_stale_snapshot_is_served_while_revalidating(self):
+        stale = build_opensky_payload('global', [], source='opensky')
+        cache.set(opensky_cache_key('global'), {'payload': stale, 'fetched_at': time.time() - 60}, 300)
+
+        feed = self.client.get('/dashboard/api/opensky/?scope=global').json()
+        self._wait_for_revalidation()
+
+        self.assertTrue(feed['stale'])
+        self.assertEqual(feed['generated_at'], stale['generated_at'])
+        self.assertEqual(OpenSkyStubHandler.requests, ['/states'])
+        self.assertFalse(self.client.get('/dashboard/api/opensky/?scope=global').json()['stale'])
+
+    def test_failed_one_off_refresh_leaves_the_running_refresher_lock(self):
+        self.assertTrue(acquire_refresh_lock(SNAPSHOT_SCOPE))
+        with patch.dict(os.environ, {'OPENSKY_STATES_URL': 'http://127.0.0.1:1/states', 'OPENSKY_TIMEOUT_SECONDS': '1'}):
+            call_command('refresh_opensky_feed', '--once', stdout=StringIO())
+
+        self.assertEqual(opensky_cache_stats()['failed'], 1)
+        self.assertFalse(acquire_refresh_lock(SNAPSHOT_SCOPE))
+
+    @override_settings(OPENSKY_FETCH_MODE='scoped')
+    def test_scoped_refresh_command_populates_cache_for_every_scope(self):
+        call_command('refresh_opensky_feed', '--once', stdout=StringIO())
+
+        # One request per scope; empty regions reuse the global scope's answer instead of refetching it.
+        self.assertEqual(len(OpenSkyStubHandler.requests), 4)
+        feed = self.client.get('/dashboard/api/opensky/?scope=ghana').json()
+        self.assertEqual(feed['source'], 'opensky_global_filtered')
+        self.assertEqual([flight['callsign'] for flight in feed['flights']], ['GAF101'])
+        self.assertEqual(self.client.get('/dashboard/api/opensky/?scope=global').json()['source'], 'opensky')
+        self.assertEqual(len(OpenSkyStubHandler.requests), 4)
+
+    def test_global_snapshot_answers_every_scope_and_custom_bbox(self):
+        call_command('refresh_opensky_feed', '--once', stdout=StringIO())
+        self.assertEqual(OpenSkyStubHandler.requests, ['/states'])
+
+        for scope in ('ghana', 'west_africa', 'africa', 'global'):
+            feed = self.client.get(f'/dashboard/api/opensky/?scope={scope}').json()
+            self.assertEqual([flight['callsign'] for flight in feed['flights']], ['GAF101'], scope)
+
+        custom = self.client.get('/dashboard/api/opensky/?bbox=5,-1,6,0').json()
+        self.assertEqual(custom['requested_scope'], 'custom')
+        self.assertEqual(custom['flights'][0]['icao24'], 'abc123')
+        elsewhere = self.client.get('/dashboard/api/opensky/?bbox=40,10,50,20').json()
+        self.assertTrue(elsewhere['simulated'])
+        self.assertEqual(self.client.get('/dashboard/api/opensky/?bbox=5,-1').status_code, 400)
+        self.assertEqual(OpenSkyStubHandler.requests, ['/states'])
+
+    def test_polling_clients_receive_deltas_and_not_modified(self):
+        call_command('refresh_opensky_feed', '--once', stdout=StringIO())
+        first = self.client.get('/dashboard/api/opensky/?scope=ghana')
+        version = first.json()['version']
+
+        unchanged = self.client.get(f'/dashboard/api/opensky/?scope=ghana&since={version}', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(unchanged.status_code, 304)
+
+        OpenSkyStubHandler.global_states = [
+            self._state('abc123', 'GAF101  ', 5.7, -0.17),
+            self._state('def456', 'GAF202  ', 6.0, -1.0),
+        ]
+        time.sleep(0.002)
+        call_command('refresh_opensky_feed', '--once', stdout=StringIO())
+        delta = self.client.get(f'/dashboard/api/opensky/?scope=ghana&since={version}', HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(delta.status_code, 200)
+        self.assertNotEqual(delta['ETag'], first['ETag'])
+        body = delta.json()
+        self.assertTrue(body['delta'])
+        self.assertNotIn('flights', body)
+        self.assertEqual([flight['icao24'] for flight in body['added']], ['def456'])
+        self.assertEqual([flight['latitude'] for flight in body['changed']], [5.7])
+        self.assertEqual(body['removed'], [])
+        # An unknown base version falls back to the full payload.
+        self.assertIn('flights', self.client.get('/dashboard/api/opensky/?scope=ghana&since=1').json())
+
+    async def test_dashboard_socket_pushes_updates_to_scope_subscribers(self):
+        await refresh_scopes(locked=True)
+        user = await database_sync_to_async(User.objects.get)(username='mapviewer')
+        communicator = ApplicationCommunicator(
+            DashboardConsumer.as_asgi(),
+            {'type': 'websocket', 'path': '/ws/dashboard/', 'headers': [], 'subprotocols': [], 'user': user},
+        )
+        await communicator.send_input({'type': 'websocket.connect'})
+        self.assertEqual((await communicator.receive_output(timeout=2))['type'], 'websocket.accept')
+        self.assertEqual(json.loads((await communicator.receive_output(timeout=2))['text'])['event'], 'initial_state')
+
+        async def send(message):
+            await communicator.send_input({'type': 'websocket.receive', 'text': json.dumps(message)})
+            return json.loads((await communicator.receive_output(timeout=2))['text'])
+
+        self.assertEqual((await send({'action': 'subscribe', 'scope': 'atlantis'}))['event'], 'error')
+        subscribed = await send({'action': 'subscribe', 'scope': 'ghana'})
+        self.assertEqual(subscribed['event'], 'opensky_feed')
+        self.assertEqual([flight['icao24'] for flight in subscribed['payload']['flights']], ['abc123'])
+
+        OpenSkyStubHandler.global_states = [self._state('def456', 'GAF202  ', 6.0, -1.0)]
+        await asyncio.sleep(0.002)
+        await refresh_scopes(locked=True)
+        pushed = json.loads((await communicator.receive_output(timeout=2))['text'])
+        self.assertTrue(pushed['payload']['delta'])
+        self.assertEqual(pushed['payload']['since'], subscribed['payload']['version'])
+        self.assertEqual([flight['icao24'] for flight in pushed['payload']['added']], ['def456'])
+        self.assertEqual(pushed['payload']['removed'], ['abc123'])
+
+        self.assertEqual((await send({'action': 'unsubscribe', 'scope': 'ghana'}))['event'], 'opensky_unsubscribed')
+        await refresh_scopes(locked=True)
+        self.assertTrue(await communicator.receive_nothing(timeout=0.2))
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(timeout=2)
+
+
+class StateSnapshotTests(TestCase):
+    def test_grid_query_matches_linear_scan(self):
+        rng = np.random.default_rng(7)
+        latitudes = rng.uniform(-89, 89, 5000)
+        longitudes = rng.uniform(-180, 180, 5000)
+        states = [
+            [f'{idx:06x}', f'T{idx}', 'Test', 0, 0, lon, lat, 1000.0, False, 100.0, 0.0, 0, None, None, None, False, 0]
+            for idx, (lat, lon) in enumerate(zip(latitudes, longitudes))
+        ]
+        snapshot = StateSnapshot.from_states(states + [['nopos', 'X', 'Test', 0, 0, None, None] + [None] * 10])
+
+        for bbox in (
+            {'lamin': 4.5, 'lomin': -3.5, 'lamax': 11.5, 'lomax': 1.5},
+            {'lamin': -35.0, 'lomin': -20.0, 'lamax': 38.0, 'lomax': 55.0},
+            {'lamin': -10.0, 'lomin': 170.0, 'lamax': 10.0, 'lomax': -170.0},
+        ):
+            inside_lon = (
+                (longitudes >= bbox['lomin']) & (longitudes <= bbox['lomax'])
+                if bbox['lomin'] <= bbox['lomax']
+                else (longitudes >= bbox['lomin']) | (longitudes <= bbox['lomax'])
+            )
+            expected = np.flatnonzero((latitudes >= bbox['lamin']) & (latitudes <= bbox['lamax']) & inside_lon)
+            self.assertEqual(sorted(snapshot.query(bbox).tolist()), expected.tolist())
+        self.assertEqual(len(snapshot), 5000)
@@ -1,19 +1,21 @@
-from django.http import JsonResponse
+from django.http import HttpResponseNotModified, JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render
 from django.utils import timezone
 from django.urls import reverse
+from django.utils.http import parse_etags, quote_etag
 
 from audittrail.models import AuditLog, log_action
 from maintenance.models import Alert
 from operations.models import FlightLog
 
+from .opensky import get_opensky_feed
 from .services import (
     DEFAULT_OPENSKY_SCOPE,
     GHANA_BBOX,
     OPENSKY_SCOPES,
     get_dashboard_metrics,
-    get_opensky_feed,
+    parse_bbox,
 )
 
 
@@ -46,10 +48,20 @@ def dashboard_home(request):
             'opensky_default_scope': DEFAULT_OPENSKY_SCOPE,
             'opensky_feed_url': reverse('dashboard:opensky-feed'),
             'opensky_legacy_feed_url': reverse('dashboard:opensky-ghana'),
+            'flight_logs_api_url': reverse('api-flight-logs-list'),
         },
     )
 
 
+def _opensky_etag(payload, bbox):
+    if payload.get('version') is None:
+        return None
+    area = payload['query_scope']
+    if bbox is not None:
+        area = '_'.join(f'{bbox[key]:g}' for key in ('lamin', 'lomin', 'lamax', 'lomax'))
+    return quote_etag(f'opensky-{area}-{payload["version"]}')
+
+
 @login_required
 def opensky_feed(request):
     requested_scope = request.GET.get('scope')
@@ -58,8 +70,22 @@ def opensky_feed(request):
     if not requested_scope:
         requested_scope = DEFAULT_OPENSKY_SCOPE
 
+    bbox = None
+    if request.GET.get('bbox'):
+        try:
+            bbox = parse_bbox(request.GET['bbox'])
+        except ValueError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+
+    since = None
+    if request.GET.get('since'):
+        try:
+            since = int(request.GET['since'])
+        except ValueError:
+            return JsonResponse({'error': 'since must be a snapshot version number.'}, status=400)
+
     try:
-        payload = get_opensky_feed(requested_scope)
+        payload = get_opensky_feed(requested_scope, bbox=bbox, since=since)
     except Exception:
         payload = {
             'source': 'opensky',
@@ -72,4 +98,13 @@ def opensky_feed(request):
             'flights': [],
             'error': 'Feed unavailable',
         }
-    return JsonResponse(payload)
+
+    etag = _opensky_etag(payload, bbox)
+    if etag and etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    response = JsonResponse(payload)
+    if etag:
+        response['ETag'] = etag
+    return response
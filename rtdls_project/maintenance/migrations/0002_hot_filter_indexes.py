@@ -0,0 +1,25 @@
+# Generated by Django 4.2.17 on 2026-10-17 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('is_resolved', False)), fields=['-created_at'], name='alert_unresolved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['aircraft', 'is_resolved'], name='alert_aircraft_resolved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancelog',
+            index=models.Index(fields=['-created_at'], name='maintenancelog_created_idx'),
+        ),
+    ]
@@ -16,6 +16,9 @@ class MaintenanceLog(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='maintenancelog_created_idx'),
+        ]
 
     def __str__(self):
         return f'Maintenance {self.aircraft.tail_number} @ {self.created_at:%Y-%m-%d}'
@@ -38,6 +41,10 @@ class Alert(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='alert_unresolved_idx', condition=models.Q(is_resolved=False)),
+            models.Index(fields=['aircraft', 'is_resolved'], name='alert_aircraft_resolved_idx'),
+        ]
 
     def __str__(self):
         return f'{self.aircraft.tail_number} - {self.severity}'
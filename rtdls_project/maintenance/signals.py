@@ -1,6 +1,7 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from dashboard.counters import ALERTS_UNRESOLVED, alert_contributions, apply_deltas, record_change
 from dashboard.realtime import broadcast_dashboard_update
 
 from .models import Alert, MaintenanceLog
@@ -34,17 +35,41 @@ def predictive_alert_logic(sender, instance, created, **kwargs):
             alert.is_resolved = False
             alert.save(update_fields=['title', 'message', 'severity', 'recipient_role', 'is_resolved'])
     else:
-        Alert.objects.filter(
+        resolved = Alert.objects.filter(
             aircraft=instance.aircraft,
             maintenance_log=instance,
             is_resolved=False,
         ).update(is_resolved=True)
+        # Queryset updates bypass the Alert signals, so adjust the counter directly.
+        apply_deltas({ALERTS_UNRESOLVED: -resolved})
 
     if created:
-        broadcast_dashboard_update(event='maintenance_log_created', payload={'maintenance_log_id': instance.id})
+        broadcast_dashboard_update(
+            event='maintenance_log_created',
+            payload={'maintenance_log_id': instance.id, 'base_ids': [instance.aircraft.home_base_id]},
+        )
+
+
+@receiver(pre_save, sender=Alert)
+def capture_alert_previous_state(sender, instance, **kwargs):
+    instance._counter_previous = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Alert)
+def update_alert_counters(sender, instance, **kwargs):
+    record_change(getattr(instance, '_counter_previous', None), instance, alert_contributions)
+    instance._counter_previous = None
+
+
+@receiver(post_delete, sender=Alert)
+def remove_alert_counters(sender, instance, **kwargs):
+    record_change(instance, None, alert_contributions)
 
 
 @receiver(post_save, sender=Alert)
 def alert_realtime_update(sender, instance, created, **kwargs):
     if created:
-        broadcast_dashboard_update(event='maintenance_alert', payload={'alert_id': instance.id})
+        broadcast_dashboard_update(
+            event='maintenance_alert',
+            payload={'alert_id': instance.id, 'base_ids': [instance.aircraft.home_base_id]},
+        )
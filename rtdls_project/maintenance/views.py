@@ -5,6 +5,7 @@ from django.shortcuts import redirect, render
 from accounts.decorators import role_required
 from audittrail.models import AuditLog, log_action
 from operations.models import Aircraft
+from rtdls.aggregates import aggregate_counters, count_if
 
 from .forms import MaintenanceLogForm
 from .models import Alert, MaintenanceLog
@@ -34,10 +35,15 @@ def maintenance_log_create_view(request):
 
     recent_logs = MaintenanceLog.objects.select_related('aircraft', 'logged_by').all()[:10]
     active_alerts = Alert.objects.select_related('aircraft').filter(is_resolved=False)[:8]
+    alert_stats = aggregate_counters(
+        Alert.objects.filter(is_resolved=False),
+        open_alerts=count_if(),
+        high_alerts=count_if(severity=Alert.Severity.HIGH),
+    )
     stats = {
         'total_logs': MaintenanceLog.objects.count(),
-        'open_alerts': Alert.objects.filter(is_resolved=False).count(),
-        'high_alerts': Alert.objects.filter(is_resolved=False, severity=Alert.Severity.HIGH).count(),
+        'open_alerts': alert_stats['open_alerts'],
+        'high_alerts': alert_stats['high_alerts'],
         'aircraft_in_maintenance': Aircraft.objects.filter(status=Aircraft.Status.IN_MAINTENANCE).count(),
     }
     return render(
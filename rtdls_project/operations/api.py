@@ -1,19 +1,28 @@
-from rest_framework import viewsets
+from django.conf import settings
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 from accounts.permissions import IsAdminRole, IsCommanderAuditorOrAdmin, IsFlightOpsOrAdmin
 from audittrail.models import AuditLog, log_action
 from dashboard.realtime import broadcast_dashboard_update
 
 from .models import Aircraft, Base, Crew, FlightData, FlightLog, Pilot
+from .parsers import NDJSONParser
 from .serializers import (
     AircraftSerializer,
     BaseSerializer,
     CrewSerializer,
+    FlightDataIngestSerializer,
     FlightDataSerializer,
     FlightLogSerializer,
     PilotSerializer,
+    TelemetrySeriesQuerySerializer,
 )
+from .downsampling import downsample_series
+from .telemetry import ingest_samples, record_ingest
 
 
 class BaseAuditViewSet(viewsets.ModelViewSet):
@@ -115,7 +124,7 @@ class FlightLogViewSet(BaseAuditViewSet):
     filterset_fields = ['aircraft', 'pilot', 'mission_status', 'mission_type', 'departure_base', 'arrival_base', 'atd', 'eta', 'ata']
 
     def get_permissions(self):
-        if self.action in {'list', 'retrieve'}:
+        if self.action in {'list', 'retrieve', 'telemetry_series'}:
             return [IsAuthenticated()]
         if self.action in {'create', 'update', 'partial_update'}:
             return [IsAuthenticated(), IsFlightOpsOrAdmin()]
@@ -123,6 +132,13 @@ class FlightLogViewSet(BaseAuditViewSet):
             return [IsAuthenticated(), IsAdminRole()]
         return [IsAuthenticated(), IsCommanderAuditorOrAdmin()]
 
+    @action(detail=True, methods=['get'], url_path='telemetry-series')
+    def telemetry_series(self, request, pk=None):
+        flight = self.get_object()
+        query = TelemetrySeriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return Response(downsample_series(flight.id, **query.validated_data))
+
     def perform_create(self, serializer):
         flight = serializer.save(logged_by=self.request.user)
         log_action(
@@ -169,10 +185,29 @@ class FlightDataViewSet(BaseAuditViewSet):
     def get_permissions(self):
         if self.action in {'list', 'retrieve'}:
             return [IsAuthenticated()]
-        if self.action in {'create', 'update', 'partial_update'}:
+        if self.action in {'create', 'update', 'partial_update', 'bulk'}:
             return [IsAuthenticated(), IsFlightOpsOrAdmin()]
         return [IsAuthenticated(), IsAdminRole()]
 
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        samples = request.data
+        if isinstance(samples, dict):
+            samples = samples.get('samples')
+        if not isinstance(samples, list) or not samples:
+            return Response({'detail': 'Expected a non-empty list of telemetry samples.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(samples) > settings.TELEMETRY_BULK_MAX_SAMPLES:
+            return Response(
+                {'detail': f'Batch exceeds the limit of {settings.TELEMETRY_BULK_MAX_SAMPLES} samples.'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        serializer = FlightDataIngestSerializer(data=samples, many=True)
+        serializer.is_valid(raise_exception=True)
+        created = ingest_samples(serializer.validated_data)
+        flight_log_ids = record_ingest(created, user=request.user, ip_address=self._client_ip())
+        return Response({'created': len(created), 'flight_log_ids': flight_log_ids}, status=status.HTTP_201_CREATED)
+
     def perform_create(self, serializer):
         telemetry = serializer.save()
         log_action(
@@ -0,0 +1,94 @@
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+
+from .models import FlightDataRollup
+from .rollups import bucket_start, choose_resolution, telemetry_bounds
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+
+def lttb_indices(x, y, threshold):
+    size = len(x)
+    if threshold >= size:
+        return np.arange(size)
+    if threshold < 3:
+        return np.array([0, size - 1][:max(threshold, 1)])
+
+    # First and last points are fixed; the interior is split into threshold - 2 buckets.
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = size - 1
+    anchor = 0
+    for idx in range(threshold - 2):
+        low, high = edges[idx], edges[idx + 1]
+        next_high = edges[idx + 2] if idx + 2 < len(edges) else size
+        avg_x = x[high:next_high].mean()
+        avg_y = y[high:next_high].mean()
+        areas = np.abs(
+            (x[anchor] - avg_x) * (y[low:high] - y[anchor])
+            - (x[anchor] - x[low:high]) * (avg_y - y[anchor])
+        )
+        anchor = low + int(areas.argmax())
+        selected[idx + 1] = anchor
+    return selected
+
+
+def minmax_indices(low_values, high_values, threshold):
+    buckets = max(1, threshold // 2)
+    edges = np.linspace(0, len(low_values), buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    lows = np.array([start + int(low_values[start:end].argmin()) for start, end in zip(starts, edges[1:])])
+    highs = np.array([start + int(high_values[start:end].argmax()) for start, end in zip(starts, edges[1:])])
+    return lows, highs
+
+
+def load_channel(flight_log_id, channel, start=None, end=None, source_points=None):
+    source_points = source_points or settings.TELEMETRY_SERIES_SOURCE_POINTS
+    start, end = telemetry_bounds(flight_log_id, start, end)
+    if start is None or end is None:
+        return None, np.empty(0), np.empty(0), np.empty(0), np.empty(0)
+
+    resolution = choose_resolution(start, end, source_points)
+    rows = (
+        FlightDataRollup.objects.filter(
+            flight_log_id=flight_log_id,
+            resolution=resolution,
+            bucket_start__gte=bucket_start(start, resolution),
+            bucket_start__lte=end,
+        )
+        .order_by('bucket_start')
+        .values_list('bucket_start', 'sample_count', f'{channel}_sum', f'{channel}_min', f'{channel}_max')
+    )
+    data = np.array([(ts.timestamp(), count, total, low, high) for ts, count, total, low, high in rows], dtype=float)
+    if not len(data):
+        return resolution, np.empty(0), np.empty(0), np.empty(0), np.empty(0)
+    return resolution, data[:, 0], data[:, 2] / np.maximum(data[:, 1], 1), data[:, 3], data[:, 4]
+
+
+def _point(epoch, value):
+    return {'time': datetime.fromtimestamp(float(epoch), tz=dt_timezone.utc), 'value': round(float(value), 3)}
+
+
+def downsample_series(flight_log_id, channel='altitude', points=200, method='lttb', start=None, end=None):
+    resolution, times, averages, lows, highs = load_channel(flight_log_id, channel, start, end)
+    # Min/max pairs only help when the source is larger than the budget; otherwise every bucket is returned.
+    if method == 'minmax' and points < len(times):
+        low_idx, high_idx = minmax_indices(lows, highs, points)
+        # A flat bucket yields the same row as its min and its max; the set keeps that point once.
+        picked = sorted(
+            {(times[idx], lows[idx]) for idx in low_idx} | {(times[idx], highs[idx]) for idx in high_idx}
+        )
+        series = [_point(epoch, value) for epoch, value in picked]
+    else:
+        series = [_point(times[idx], averages[idx]) for idx in lttb_indices(times, averages, points)]
+    return {
+        'flight_log': flight_log_id,
+        'channel': channel,
+        'method': method,
+        'resolution_seconds': resolution,
+        'source_points': len(times),
+        'points': series,
+    }
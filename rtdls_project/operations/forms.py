@@ -38,6 +38,8 @@ class FlightLogForm(forms.ModelForm):
             'departure_base',
             'arrival_base',
             'remarks',
+            'marked_delayed',
+            'is_cancelled',
             'altitude_ft',
             'speed_knots',
         ]
@@ -68,7 +70,9 @@ class FlightLogForm(forms.ModelForm):
         }
         for name, field in self.fields.items():
             css = field.widget.attrs.get('class', '')
-            if isinstance(field.widget, forms.SelectMultiple):
+            if isinstance(field.widget, forms.CheckboxInput):
+                field.widget.attrs['class'] = f'{css} form-check-input'.strip()
+            elif isinstance(field.widget, forms.SelectMultiple):
                 field.widget.attrs['class'] = f'{css} form-select'.strip()
             elif isinstance(field.widget, forms.Select):
                 field.widget.attrs['class'] = f'{css} form-select'.strip()
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from operations.partitions import (
+    archive_month,
+    drop_month,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    month_start,
+)
+
+
+class Command(BaseCommand):
+    help = 'Creates upcoming FlightData partitions and archives/drops old months of telemetry.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=3, help='Monthly partitions to pre-create after the current month.')
+        parser.add_argument('--drop-before', help='Drop telemetry for every month before YYYY-MM.')
+        parser.add_argument('--archive-dir', help='Write each dropped month to <dir>/<partition>.ndjson.gz first.')
+        parser.add_argument('--list', action='store_true', help='List telemetry months/partitions and exit.')
+
+    def handle(self, *args, **options):
+        mode = 'partitioned (PostgreSQL)' if is_partitioned() else 'single table'
+        months = list_partitions()
+
+        if options['list']:
+            self.stdout.write(f'FlightData storage: {mode}')
+            for month in months:
+                self.stdout.write(f'  {month:%Y-%m}')
+            return
+
+        for name in ensure_partitions(timezone.now(), options['months_ahead']):
+            self.stdout.write(self.style.SUCCESS(f'Created partition {name}'))
+
+        if not options['drop_before']:
+            return
+        try:
+            cutoff = month_start(options['drop_before'])
+        except ValueError:
+            raise CommandError('--drop-before must use the YYYY-MM format.')
+        if cutoff > month_start(timezone.now()):
+            raise CommandError('Refusing to drop telemetry for the current or future months.')
+
+        for month in months:
+            if month >= cutoff:
+                continue
+            if options['archive_dir']:
+                path, archived = archive_month(month, options['archive_dir'])
+                self.stdout.write(f'Archived {archived} sample(s) for {month:%Y-%m} to {path}')
+            dropped = drop_month(month)
+            self.stdout.write(self.style.SUCCESS(f'Dropped {dropped} sample(s) for {month:%Y-%m}'))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-17 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0004_flightlog_timing_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flightdata',
+            index=models.Index(fields=['flight_log', 'timestamp'], name='flightdata_log_ts_idx'),
+        ),
+    ]
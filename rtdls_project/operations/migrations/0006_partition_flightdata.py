@@ -0,0 +1,90 @@
+from django.db import migrations
+
+TABLE = 'operations_flightdata'
+LEGACY_TABLE = 'operations_flightdata_unpartitioned'
+SEQUENCE = 'operations_flightdata_id_seq_partitioned'
+MONTHS_AHEAD = 3
+
+
+def _add_month(value, months=1):
+    year = value.year + (value.month - 1 + months) // 12
+    month = (value.month - 1 + months) % 12 + 1
+    return value.replace(year=year, month=month)
+
+
+def partition_flightdata(apps, schema_editor):
+    # Monthly range partitions are PostgreSQL-only; SQLite keeps the plain table plus the composite index.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{LEGACY_TABLE}"')
+        cursor.execute('ALTER INDEX "flightdata_log_ts_idx" RENAME TO "flightdata_log_ts_idx_unpartitioned"')
+        cursor.execute(f'CREATE SEQUENCE "{SEQUENCE}"')
+        cursor.execute(
+            f"""
+            CREATE TABLE "{TABLE}" (
+                "id" bigint NOT NULL DEFAULT nextval('{SEQUENCE}'),
+                "timestamp" timestamp with time zone NOT NULL,
+                "altitude" double precision NOT NULL,
+                "speed" double precision NOT NULL,
+                "engine_temp" double precision NOT NULL,
+                "fuel_level" double precision NOT NULL,
+                "heading" double precision NOT NULL,
+                "created_at" timestamp with time zone NOT NULL,
+                "flight_log_id" bigint NOT NULL
+                    REFERENCES "operations_flightlog" ("id") DEFERRABLE INITIALLY DEFERRED,
+                PRIMARY KEY ("id", "timestamp")
+            ) PARTITION BY RANGE ("timestamp")
+            """
+        )
+        cursor.execute(f'CREATE INDEX "flightdata_log_ts_idx" ON "{TABLE}" ("flight_log_id", "timestamp")')
+        cursor.execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+
+        cursor.execute(
+            f"""
+            SELECT DISTINCT date_trunc('month', "timestamp" AT TIME ZONE 'UTC')
+            FROM "{LEGACY_TABLE}"
+            UNION
+            SELECT date_trunc('month', now() AT TIME ZONE 'UTC')
+            """
+        )
+        months = sorted(row[0] for row in cursor.fetchall())
+        last_month = months[-1]
+        for _ in range(MONTHS_AHEAD):
+            last_month = _add_month(last_month)
+            months.append(last_month)
+
+        for month in months:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{TABLE}_{month:%Y%m}" PARTITION OF "{TABLE}" '
+                f"FOR VALUES FROM (%s::timestamp AT TIME ZONE 'UTC') TO (%s::timestamp AT TIME ZONE 'UTC')",
+                [month, _add_month(month)],
+            )
+
+        cursor.execute(
+            f"""
+            INSERT INTO "{TABLE}"
+                ("id", "timestamp", "altitude", "speed", "engine_temp", "fuel_level", "heading", "created_at", "flight_log_id")
+            SELECT "id", "timestamp", "altitude", "speed", "engine_temp", "fuel_level", "heading", "created_at", "flight_log_id"
+            FROM "{LEGACY_TABLE}"
+            """
+        )
+        cursor.execute(f'SELECT setval(%s, COALESCE((SELECT MAX("id") FROM "{TABLE}"), 0) + 1, false)', [SEQUENCE])
+        cursor.execute(f'ALTER SEQUENCE "{SEQUENCE}" OWNED BY "{TABLE}"."id"')
+        cursor.execute(f'DROP TABLE "{LEGACY_TABLE}"')
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0005_flightdata_log_ts_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_flightdata, noop_reverse),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.17 on 2026-10-17 15:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0006_partition_flightdata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightDataRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveIntegerField(choices=[(1, '1 second'), (60, '1 minute'), (600, '10 minutes')])),
+                ('bucket_start', models.DateTimeField()),
+                ('sample_count', models.PositiveIntegerField(default=0)),
+                ('last_timestamp', models.DateTimeField()),
+                ('altitude_min', models.FloatField()),
+                ('altitude_max', models.FloatField()),
+                ('altitude_sum', models.FloatField()),
+                ('altitude_last', models.FloatField()),
+                ('speed_min', models.FloatField()),
+                ('speed_max', models.FloatField()),
+                ('speed_sum', models.FloatField()),
+                ('speed_last', models.FloatField()),
+                ('engine_temp_min', models.FloatField()),
+                ('engine_temp_max', models.FloatField()),
+                ('engine_temp_sum', models.FloatField()),
+                ('engine_temp_last', models.FloatField()),
+                ('fuel_level_min', models.FloatField()),
+                ('fuel_level_max', models.FloatField()),
+                ('fuel_level_sum', models.FloatField()),
+                ('fuel_level_last', models.FloatField()),
+                ('heading_min', models.FloatField()),
+                ('heading_max', models.FloatField()),
+                ('heading_sum', models.FloatField()),
+                ('heading_last', models.FloatField()),
+                ('flight_log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='telemetry_rollups', to='operations.flightlog')),
+            ],
+            options={
+                'ordering': ['bucket_start'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='flightdatarollup',
+            constraint=models.UniqueConstraint(fields=('flight_log', 'resolution', 'bucket_start'), name='unique_flightdata_rollup_bucket'),
+        ),
+    ]
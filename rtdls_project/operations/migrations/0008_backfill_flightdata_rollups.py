@@ -0,0 +1,81 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import migrations
+
+CHANNELS = ('altitude', 'speed', 'engine_temp', 'fuel_level', 'heading')
+RESOLUTIONS = (1, 60, 600)
+
+
+def _bucket_start(timestamp, resolution):
+    epoch = int(timestamp.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % resolution, tz=dt_timezone.utc)
+
+
+def _new_bucket(sample):
+    bucket = {'sample_count': 0, 'last_timestamp': sample.timestamp}
+    for channel in CHANNELS:
+        value = float(getattr(sample, channel))
+        bucket.update({f'{channel}_min': value, f'{channel}_max': value, f'{channel}_sum': 0.0})
+    return bucket
+
+
+def _add_sample(bucket, sample):
+    bucket['sample_count'] += 1
+    bucket['last_timestamp'] = sample.timestamp
+    for channel in CHANNELS:
+        value = float(getattr(sample, channel))
+        bucket[f'{channel}_min'] = min(bucket[f'{channel}_min'], value)
+        bucket[f'{channel}_max'] = max(bucket[f'{channel}_max'], value)
+        bucket[f'{channel}_sum'] += value
+        bucket[f'{channel}_last'] = value
+
+
+def backfill_rollups(apps, schema_editor):
+    FlightData = apps.get_model('operations', 'FlightData')
+    FlightDataRollup = apps.get_model('operations', 'FlightDataRollup')
+
+    # Samples arrive ordered by flight and time, so each resolution has one open bucket: a new bucket start
+    # or a new flight closes it for good. Memory stays at three open buckets plus one write batch.
+    flight_log_id = None
+    open_buckets = {}
+    finished = []
+    samples = FlightData.objects.order_by('flight_log_id', 'timestamp').iterator(chunk_size=5000)
+    for sample in samples:
+        if sample.flight_log_id != flight_log_id:
+            finished.extend(_rollup(FlightDataRollup, flight_log_id, open_buckets))
+            flight_log_id, open_buckets = sample.flight_log_id, {}
+        for resolution in RESOLUTIONS:
+            start = _bucket_start(sample.timestamp, resolution)
+            current = open_buckets.get(resolution)
+            if current is None or current[0] != start:
+                if current is not None:
+                    finished.extend(_rollup(FlightDataRollup, flight_log_id, {resolution: current}))
+                current = open_buckets[resolution] = (start, _new_bucket(sample))
+            _add_sample(current[1], sample)
+        if len(finished) >= 1000:
+            FlightDataRollup.objects.bulk_create(finished, batch_size=1000)
+            finished = []
+    finished.extend(_rollup(FlightDataRollup, flight_log_id, open_buckets))
+    FlightDataRollup.objects.bulk_create(finished, batch_size=1000)
+
+
+def _rollup(FlightDataRollup, flight_log_id, open_buckets):
+    return [
+        FlightDataRollup(flight_log_id=flight_log_id, resolution=resolution, bucket_start=start, **bucket)
+        for resolution, (start, bucket) in open_buckets.items()
+    ]
+
+
+def clear_rollups(apps, schema_editor):
+    apps.get_model('operations', 'FlightDataRollup').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0007_flightdatarollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, clear_rollups),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.17 on 2026-10-17 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0008_backfill_flightdata_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aircraft',
+            index=models.Index(fields=['status'], name='aircraft_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='crew',
+            index=models.Index(fields=['is_available'], name='crew_available_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightdata',
+            index=models.Index(fields=['-timestamp'], name='flightdata_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightlog',
+            index=models.Index(fields=['-flight_datetime'], name='flightlog_datetime_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightlog',
+            index=models.Index(fields=['aircraft', '-flight_datetime'], name='flightlog_aircraft_dt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightlog',
+            index=models.Index(fields=['pilot', '-flight_datetime'], name='flightlog_pilot_dt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightlog',
+            index=models.Index(condition=models.Q(('mission_status', 'active')), fields=['-flight_datetime'], name='flightlog_active_dt_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.17 on 2026-10-17 15:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0009_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flightlog',
+            name='delay_minutes',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='flightlog',
+            name='is_cancelled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='flightlog',
+            name='is_delayed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='flightlog',
+            index=models.Index(condition=models.Q(('is_delayed', True)), fields=['-flight_datetime'], name='flightlog_delayed_dt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightlog',
+            index=models.Index(condition=models.Q(('is_cancelled', True)), fields=['-flight_datetime'], name='flightlog_cancelled_dt_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+from django.db.models import F, Q
+
+# Frozen copy of the FLIGHT_DELAY_THRESHOLD_MINUTES default, so the backfill gives the same result wherever it runs.
+DELAY_THRESHOLD_MINUTES = 15
+
+
+def backfill_delay_status(apps, schema_editor):
+    FlightLog = apps.get_model('operations', 'FlightLog')
+    # Status used to be inferred from free-text remarks; carry those flags over once.
+    FlightLog.objects.filter(Q(remarks__icontains='delay') | Q(remarks__icontains='late')).update(is_delayed=True)
+    FlightLog.objects.filter(remarks__icontains='cancel').update(is_cancelled=True)
+
+    late = []
+    for log in FlightLog.objects.filter(ata__gt=F('eta')).only('id', 'eta', 'ata', 'is_delayed').iterator(chunk_size=2000):
+        log.delay_minutes = int((log.ata - log.eta).total_seconds() // 60)
+        log.is_delayed = log.is_delayed or log.delay_minutes >= DELAY_THRESHOLD_MINUTES
+        late.append(log)
+        if len(late) >= 2000:
+            FlightLog.objects.bulk_update(late, ['delay_minutes', 'is_delayed'])
+            late = []
+    FlightLog.objects.bulk_update(late, ['delay_minutes', 'is_delayed'])
+
+
+def clear_delay_status(apps, schema_editor):
+    apps.get_model('operations', 'FlightLog').objects.update(is_delayed=False, is_cancelled=False, delay_minutes=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0010_flightlog_delay_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_delay_status, clear_delay_status),
+    ]
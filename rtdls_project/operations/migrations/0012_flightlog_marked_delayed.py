@@ -0,0 +1,35 @@
+# Generated by Django 4.2.17 on 2026-10-17 17:26
+
+from django.db import migrations, models
+
+# Frozen copy of the FLIGHT_DELAY_THRESHOLD_MINUTES default, so the migration gives the same result wherever it runs.
+DELAY_THRESHOLD_MINUTES = 15
+
+
+def carry_over_manual_flags(apps, schema_editor):
+    FlightLog = apps.get_model('operations', 'FlightLog')
+    # A flag the arrival time does not explain was set by hand (or by the old remark keywords).
+    FlightLog.objects.filter(is_delayed=True, delay_minutes__lt=DELAY_THRESHOLD_MINUTES).update(
+        marked_delayed=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0011_backfill_flightlog_delay_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flightlog',
+            name='marked_delayed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='flightlog',
+            name='is_delayed',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(carry_over_manual_flags, migrations.RunPython.noop),
+    ]
@@ -21,6 +21,11 @@ class Crew(models.Model):
     role = models.CharField(max_length=64)
     is_available = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_available'], name='crew_available_idx'),
+        ]
+
     def __str__(self):
         return self.full_name
 
@@ -51,10 +56,21 @@ class Aircraft(models.Model):
     status = models.CharField(max_length=24, choices=Status.choices, default=Status.AVAILABLE)
     home_base = models.ForeignKey(Base, on_delete=models.PROTECT, related_name='aircraft')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='aircraft_status_idx'),
+        ]
+
     def __str__(self):
         return f'{self.tail_number} ({self.model})'
 
 
+def arrival_delay_minutes(eta, ata):
+    if not eta or not ata or ata <= eta:
+        return 0
+    return int((ata - eta).total_seconds() // 60)
+
+
 class FlightLog(models.Model):
     class MissionStatus(models.TextChoices):
         ACTIVE = 'active', 'Active'
@@ -75,12 +91,37 @@ class FlightLog(models.Model):
     departure_base = models.ForeignKey(Base, on_delete=models.PROTECT, related_name='departures')
     arrival_base = models.ForeignKey(Base, on_delete=models.PROTECT, related_name='arrivals')
     remarks = models.TextField(blank=True)
+    # Set by operators; is_delayed is derived from it and the arrival time on every save.
+    marked_delayed = models.BooleanField(default=False)
+    is_delayed = models.BooleanField(default=False, editable=False)
+    is_cancelled = models.BooleanField(default=False)
+    delay_minutes = models.PositiveIntegerField(default=0, editable=False)
     logged_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='flight_logs')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-flight_datetime']
+        indexes = [
+            models.Index(fields=['-flight_datetime'], name='flightlog_datetime_idx'),
+            models.Index(fields=['aircraft', '-flight_datetime'], name='flightlog_aircraft_dt_idx'),
+            models.Index(fields=['pilot', '-flight_datetime'], name='flightlog_pilot_dt_idx'),
+            models.Index(
+                fields=['-flight_datetime'],
+                name='flightlog_active_dt_idx',
+                condition=models.Q(mission_status='active'),
+            ),
+            models.Index(
+                fields=['-flight_datetime'],
+                name='flightlog_delayed_dt_idx',
+                condition=models.Q(is_delayed=True),
+            ),
+            models.Index(
+                fields=['-flight_datetime'],
+                name='flightlog_cancelled_dt_idx',
+                condition=models.Q(is_cancelled=True),
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if self.pilot:
@@ -93,6 +134,8 @@ class FlightLog(models.Model):
             self.mission_status = self.MissionStatus.COMPLETED
         else:
             self.mission_status = self.MissionStatus.ACTIVE
+        self.delay_minutes = arrival_delay_minutes(self.eta, self.ata)
+        self.is_delayed = self.marked_delayed or self.delay_minutes >= settings.FLIGHT_DELAY_THRESHOLD_MINUTES
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -111,6 +154,57 @@ class FlightData(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['flight_log', 'timestamp'], name='flightdata_log_ts_idx'),
+            models.Index(fields=['-timestamp'], name='flightdata_ts_idx'),
+        ]
 
     def __str__(self):
         return f'FD#{self.id} - Flight {self.flight_log_id} @ {self.timestamp:%Y-%m-%d %H:%M:%S}'
+
+
+class FlightDataRollup(models.Model):
+    class Resolution(models.IntegerChoices):
+        SECOND = 1, '1 second'
+        MINUTE = 60, '1 minute'
+        TEN_MINUTES = 600, '10 minutes'
+
+    flight_log = models.ForeignKey(FlightLog, on_delete=models.CASCADE, related_name='telemetry_rollups')
+    resolution = models.PositiveIntegerField(choices=Resolution.choices)
+    bucket_start = models.DateTimeField()
+    sample_count = models.PositiveIntegerField(default=0)
+    last_timestamp = models.DateTimeField()
+    altitude_min = models.FloatField()
+    altitude_max = models.FloatField()
+    altitude_sum = models.FloatField()
+    altitude_last = models.FloatField()
+    speed_min = models.FloatField()
+    speed_max = models.FloatField()
+    speed_sum = models.FloatField()
+    speed_last = models.FloatField()
+    engine_temp_min = models.FloatField()
+    engine_temp_max = models.FloatField()
+    engine_temp_sum = models.FloatField()
+    engine_temp_last = models.FloatField()
+    fuel_level_min = models.FloatField()
+    fuel_level_max = models.FloatField()
+    fuel_level_sum = models.FloatField()
+    fuel_level_last = models.FloatField()
+    heading_min = models.FloatField()
+    heading_max = models.FloatField()
+    heading_sum = models.FloatField()
+    heading_last = models.FloatField()
+
+    class Meta:
+        ordering = ['bucket_start']
+        constraints = [
+            models.UniqueConstraint(fields=['flight_log', 'resolution', 'bucket_start'], name='unique_flightdata_rollup_bucket'),
+        ]
+
+    def average(self, channel):
+        if not self.sample_count:
+            return 0.0
+        return getattr(self, f'{channel}_sum') / self.sample_count
+
+    def __str__(self):
+        return f'Rollup {self.resolution}s - Flight {self.flight_log_id} @ {self.bucket_start:%Y-%m-%d %H:%M:%S}'
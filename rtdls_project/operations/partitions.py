@@ -0,0 +1,136 @@
+import gzip
+import json
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.db import connection, transaction
+from django.db.models.functions import TruncMonth
+
+from .models import FlightData, FlightDataRollup
+
+TABLE = FlightData._meta.db_table
+
+
+def month_start(value):
+    if isinstance(value, str):
+        value = datetime.strptime(value, '%Y-%m')
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def next_month(value):
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_{month:%Y%m}'
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass', [TABLE])
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    if is_partitioned():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = %s
+                ORDER BY child.relname
+                """,
+                [TABLE],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+        months = []
+        for name in names:
+            suffix = name[len(TABLE) + 1:]
+            if suffix.isdigit() and len(suffix) == 6:
+                months.append(datetime(int(suffix[:4]), int(suffix[4:]), 1, tzinfo=dt_timezone.utc))
+        return months
+
+    # SQLite/other backends keep one table; report the months that currently hold samples.
+    return [
+        month_start(row)
+        for row in FlightData.objects.annotate(month=TruncMonth('timestamp', tzinfo=dt_timezone.utc))
+        .values_list('month', flat=True)
+        .distinct()
+        .order_by('month')
+    ]
+
+
+def ensure_partitions(start, months_ahead=3):
+    if not is_partitioned():
+        return []
+    created = []
+    month = month_start(start)
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT to_regclass(%s)', [name])
+            if cursor.fetchone()[0] is None:
+                cursor.execute(
+                    f'CREATE TABLE "{name}" PARTITION OF "{TABLE}" FOR VALUES FROM (%s) TO (%s)',
+                    [month, next_month(month)],
+                )
+                created.append(name)
+        month = next_month(month)
+    return created
+
+
+def archive_month(month, directory):
+    month = month_start(month)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{partition_name(month)}.ndjson.gz'
+    rows = (
+        FlightData.objects.filter(timestamp__gte=month, timestamp__lt=next_month(month))
+        .order_by('timestamp', 'id')
+        .values('id', 'flight_log_id', 'timestamp', 'altitude', 'speed', 'engine_temp', 'fuel_level', 'heading')
+    )
+    count = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as handle:
+        for row in rows.iterator(chunk_size=5000):
+            row['timestamp'] = row['timestamp'].isoformat()
+            handle.write(json.dumps(row, separators=(',', ':')) + '\n')
+            count += 1
+    return path, count
+
+
+def _drop_rollups(month):
+    # Month starts fall on bucket boundaries at every resolution, so no bucket straddles two months.
+    FlightDataRollup.objects.filter(bucket_start__gte=month, bucket_start__lt=next_month(month)).delete()
+
+
+def drop_month(month):
+    month = month_start(month)
+    if is_partitioned():
+        name = partition_name(month)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT to_regclass(%s)', [name])
+            if cursor.fetchone()[0] is None:
+                return 0
+            cursor.execute(f'SELECT COUNT(*) FROM "{name}"')
+            count = cursor.fetchone()[0]
+            with transaction.atomic():
+                cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+                cursor.execute(f'DROP TABLE "{name}"')
+                _drop_rollups(month)
+        return count
+
+    # Single-table fallback: one range DELETE without loading rows or sending per-row signals.
+    bounds = [connection.ops.adapt_datetimefield_value(value) for value in (month, next_month(month))]
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{TABLE}" WHERE "timestamp" >= %s AND "timestamp" < %s', bounds)
+            count = cursor.rowcount
+        _drop_rollups(month)
+    return count
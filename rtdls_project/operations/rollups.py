@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import partial
+import math
+
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Min, Q, Sum
+
+from .models import FlightData, FlightDataRollup
+
+BULK_CREATE_BATCH_SIZE = 1000
+TELEMETRY_CHANNELS = ('altitude', 'speed', 'engine_temp', 'fuel_level', 'heading')
+ROLLUP_RESOLUTIONS = tuple(sorted(FlightDataRollup.Resolution.values))
+ROLLUP_FIELDS = ['sample_count', 'last_timestamp'] + [
+    f'{channel}_{stat}' for channel in TELEMETRY_CHANNELS for stat in ('min', 'max', 'sum', 'last')
+]
+
+
+def bucket_start(timestamp, resolution):
+    epoch = int(timestamp.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % resolution, tz=dt_timezone.utc)
+
+
+def _sample_bucket(sample):
+    bucket = {'sample_count': 1, 'last_timestamp': sample.timestamp}
+    for channel in TELEMETRY_CHANNELS:
+        value = float(getattr(sample, channel))
+        bucket[f'{channel}_min'] = value
+        bucket[f'{channel}_max'] = value
+        bucket[f'{channel}_sum'] = value
+        bucket[f'{channel}_last'] = value
+    return bucket
+
+
+def _merge_bucket(target, other):
+    for channel in TELEMETRY_CHANNELS:
+        target[f'{channel}_min'] = min(target[f'{channel}_min'], other[f'{channel}_min'])
+        target[f'{channel}_max'] = max(target[f'{channel}_max'], other[f'{channel}_max'])
+        target[f'{channel}_sum'] += other[f'{channel}_sum']
+    if other['last_timestamp'] >= target['last_timestamp']:
+        target['last_timestamp'] = other['last_timestamp']
+        for channel in TELEMETRY_CHANNELS:
+            target[f'{channel}_last'] = other[f'{channel}_last']
+    target['sample_count'] += other['sample_count']
+
+
+def aggregate_samples(samples):
+    buckets = {}
+    for sample in samples:
+        single = _sample_bucket(sample)
+        for resolution in ROLLUP_RESOLUTIONS:
+            key = (sample.flight_log_id, resolution, bucket_start(sample.timestamp, resolution))
+            if key in buckets:
+                _merge_bucket(buckets[key], single)
+            else:
+                buckets[key] = dict(single)
+    return buckets
+
+
+def _store_buckets(buckets):
+    ranges = {}
+    for flight_log_id, resolution, start in buckets:
+        low, high = ranges.get((flight_log_id, resolution), (start, start))
+        ranges[(flight_log_id, resolution)] = (min(low, start), max(high, start))
+    query = Q()
+    for (flight_log_id, resolution), (low, high) in ranges.items():
+        query |= Q(flight_log_id=flight_log_id, resolution=resolution, bucket_start__gte=low, bucket_start__lte=high)
+
+    existing = {
+        (row.flight_log_id, row.resolution, row.bucket_start): row
+        for row in FlightDataRollup.objects.select_for_update().filter(query)
+    }
+    to_create = []
+    to_update = []
+    for key, bucket in buckets.items():
+        row = existing.get(key)
+        if row is None:
+            to_create.append(FlightDataRollup(flight_log_id=key[0], resolution=key[1], bucket_start=key[2], **bucket))
+            continue
+        merged = {field: getattr(row, field) for field in ROLLUP_FIELDS}
+        _merge_bucket(merged, bucket)
+        for field, value in merged.items():
+            setattr(row, field, value)
+        to_update.append(row)
+
+    FlightDataRollup.objects.bulk_create(to_create, batch_size=BULK_CREATE_BATCH_SIZE)
+    FlightDataRollup.objects.bulk_update(to_update, ROLLUP_FIELDS, batch_size=500)
+
+
+def update_rollups(samples):
+    buckets = aggregate_samples(samples)
+    if not buckets:
+        return
+    # A concurrent writer may create the same bucket first; the retry merges into its row.
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                _store_buckets(buckets)
+            return
+        except IntegrityError:
+            if attempt:
+                raise
+
+
+def rebuild_rollup_window(flight_log_id, timestamp):
+    window = ROLLUP_RESOLUTIONS[-1]
+    start = bucket_start(timestamp, window)
+    end = start + timedelta(seconds=window)
+    with transaction.atomic():
+        FlightDataRollup.objects.filter(flight_log_id=flight_log_id, bucket_start__gte=start, bucket_start__lt=end).delete()
+        samples = FlightData.objects.filter(flight_log_id=flight_log_id, timestamp__gte=start, timestamp__lt=end)
+        update_rollups(samples.order_by('timestamp'))
+
+
+def schedule_rollup_rebuild(flight_log_id, timestamp):
+    # Edits and deletes are rare, so the affected 10-minute window is recomputed from raw samples after commit.
+    # Each callback carries its own window: it runs only if this transaction commits, and only after it does.
+    transaction.on_commit(partial(rebuild_rollup_window, flight_log_id, bucket_start(timestamp, ROLLUP_RESOLUTIONS[-1])))
+
+
+def choose_resolution(start, end, max_points):
+    span = max((end - start).total_seconds(), 1.0)
+    for resolution in ROLLUP_RESOLUTIONS:
+        if span / resolution <= max_points:
+            return resolution
+    return ROLLUP_RESOLUTIONS[-1]
+
+
+def _series_point(rows):
+    point = {'time': rows[0].bucket_start, 'count': sum(row.sample_count for row in rows)}
+    last_row = max(rows, key=lambda row: row.last_timestamp)
+    for channel in TELEMETRY_CHANNELS:
+        total = sum(getattr(row, f'{channel}_sum') for row in rows)
+        point[channel] = {
+            'min': min(getattr(row, f'{channel}_min') for row in rows),
+            'max': max(getattr(row, f'{channel}_max') for row in rows),
+            'avg': total / point['count'] if point['count'] else 0.0,
+            'last': getattr(last_row, f'{channel}_last'),
+        }
+    return point
+
+
+def telemetry_bounds(flight_log_id, start=None, end=None):
+    if start is None or end is None:
+        bounds = FlightDataRollup.objects.filter(
+            flight_log_id=flight_log_id,
+            resolution=ROLLUP_RESOLUTIONS[-1],
+        ).aggregate(first=Min('bucket_start'), last=Max('last_timestamp'))
+        start = start or bounds['first']
+        end = end or bounds['last']
+    return start, end
+
+
+def get_telemetry_series(flight_log_id, start=None, end=None, max_points=500):
+    max_points = max(1, int(max_points))
+    start, end = telemetry_bounds(flight_log_id, start, end)
+    if start is None or end is None:
+        return {'resolution_seconds': None, 'bucket_seconds': None, 'points': []}
+
+    resolution = choose_resolution(start, end, max_points)
+    rows = list(
+        FlightDataRollup.objects.filter(
+            flight_log_id=flight_log_id,
+            resolution=resolution,
+            bucket_start__gte=bucket_start(start, resolution),
+            bucket_start__lte=end,
+        ).order_by('bucket_start')
+    )
+    # Even the coarsest tier can exceed the budget on very long ranges; merge adjacent buckets to fit.
+    group = max(1, math.ceil(len(rows) / max_points))
+    return {
+        'resolution_seconds': resolution,
+        'bucket_seconds': resolution * group,
+        'points': [_series_point(rows[idx:idx + group]) for idx in range(0, len(rows), group)],
+    }
+
+
+def telemetry_averages():
+    totals = FlightDataRollup.objects.filter(resolution=ROLLUP_RESOLUTIONS[-1]).aggregate(
+        samples=Sum('sample_count'),
+        altitude=Sum('altitude_sum'),
+        speed=Sum('speed_sum'),
+    )
+    samples = totals['samples'] or 0
+    if not samples:
+        return {'average_altitude': 0, 'average_speed': 0}
+    return {
+        'average_altitude': totals['altitude'] / samples,
+        'average_speed': totals['speed'] / samples,
+    }
@@ -1,6 +1,10 @@
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 
+from .downsampling import DOWNSAMPLE_METHODS
 from .models import Aircraft, Base, Crew, FlightData, FlightLog, Pilot
+from .rollups import TELEMETRY_CHANNELS
 
 
 class BaseSerializer(serializers.ModelSerializer):
@@ -64,6 +68,10 @@ class FlightLogSerializer(serializers.ModelSerializer):
             'departure_base',
             'arrival_base',
             'remarks',
+            'marked_delayed',
+            'is_delayed',
+            'is_cancelled',
+            'delay_minutes',
             'logged_by',
             'logged_by_username',
             'created_at',
@@ -136,3 +144,40 @@ class FlightDataSerializer(serializers.ModelSerializer):
             'created_at',
         ]
         read_only_fields = ['created_at']
+
+
+class FlightDataIngestListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        flight_log_ids = {sample['flight_log_id'] for sample in attrs}
+        known_ids = set(FlightLog.objects.filter(id__in=flight_log_ids).values_list('id', flat=True))
+        missing_ids = sorted(flight_log_ids - known_ids)
+        if missing_ids:
+            raise serializers.ValidationError(f'Unknown flight_log id(s): {missing_ids}')
+        return attrs
+
+
+class FlightDataIngestSerializer(serializers.Serializer):
+    # Flight logs are resolved once per batch by the list serializer instead of one lookup per sample.
+    flight_log = serializers.IntegerField(min_value=1, source='flight_log_id')
+    timestamp = serializers.DateTimeField(default=timezone.now)
+    altitude = serializers.FloatField(min_value=0.0)
+    speed = serializers.FloatField(min_value=0.0)
+    engine_temp = serializers.FloatField(min_value=0.0)
+    fuel_level = serializers.FloatField(min_value=0.0)
+    heading = serializers.FloatField(min_value=0.0)
+
+    class Meta:
+        list_serializer_class = FlightDataIngestListSerializer
+
+
+class TelemetrySeriesQuerySerializer(serializers.Serializer):
+    channel = serializers.ChoiceField(choices=TELEMETRY_CHANNELS, default='altitude')
+    points = serializers.IntegerField(min_value=3, max_value=settings.TELEMETRY_SERIES_MAX_POINTS, default=200)
+    method = serializers.ChoiceField(choices=DOWNSAMPLE_METHODS, default='lttb')
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('start') and attrs.get('end') and attrs['start'] >= attrs['end']:
+            raise serializers.ValidationError('start must be before end.')
+        return attrs
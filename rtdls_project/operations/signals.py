@@ -1,18 +1,80 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from dashboard.counters import aircraft_contributions, crew_contributions, flight_log_contributions, record_change
 from dashboard.realtime import broadcast_dashboard_update
 
-from .models import FlightData, FlightLog
+from .models import Aircraft, Crew, FlightData, FlightLog
+from .rollups import schedule_rollup_rebuild, update_rollups
+
+COUNTED_MODELS = {
+    FlightLog: flight_log_contributions,
+    Aircraft: aircraft_contributions,
+    Crew: crew_contributions,
+}
+
+
+@receiver(pre_save, sender=FlightLog)
+@receiver(pre_save, sender=Aircraft)
+@receiver(pre_save, sender=Crew)
+def capture_counted_previous_state(sender, instance, **kwargs):
+    instance._counter_previous = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+
+
+@receiver(post_save, sender=FlightLog)
+@receiver(post_save, sender=Aircraft)
+@receiver(post_save, sender=Crew)
+def update_dashboard_counters(sender, instance, **kwargs):
+    record_change(getattr(instance, '_counter_previous', None), instance, COUNTED_MODELS[sender])
+    instance._counter_previous = None
+
+
+@receiver(post_delete, sender=FlightLog)
+@receiver(post_delete, sender=Aircraft)
+@receiver(post_delete, sender=Crew)
+def remove_dashboard_counters(sender, instance, **kwargs):
+    record_change(instance, None, COUNTED_MODELS[sender])
 
 
 @receiver(post_save, sender=FlightLog)
 def flight_log_realtime_update(sender, instance, created, **kwargs):
     if created:
-        broadcast_dashboard_update(event='flight_log_created', payload={'flight_log_id': instance.id})
+        broadcast_dashboard_update(
+            event='flight_log_created',
+            payload={
+                'flight_log_id': instance.id,
+                'base_ids': sorted({instance.departure_base_id, instance.arrival_base_id}),
+            },
+        )
+
+
+@receiver(pre_save, sender=FlightData)
+def capture_flight_data_previous_state(sender, instance, **kwargs):
+    instance._rollup_previous = (
+        sender.objects.filter(pk=instance.pk).values('flight_log_id', 'timestamp').first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=FlightData)
+def update_flight_data_rollups(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_rollup_previous', None)
+    if created and previous is None:
+        update_rollups([instance])
+        return
+    if previous:
+        schedule_rollup_rebuild(previous['flight_log_id'], previous['timestamp'])
+    schedule_rollup_rebuild(instance.flight_log_id, instance.timestamp)
+
+
+@receiver(post_delete, sender=FlightData)
+def remove_flight_data_rollups(sender, instance, **kwargs):
+    schedule_rollup_rebuild(instance.flight_log_id, instance.timestamp)
 
 
 @receiver(post_save, sender=FlightData)
 def flight_data_realtime_update(sender, instance, created, **kwargs):
     if created:
-        broadcast_dashboard_update(event='flight_data_logged', payload={'flight_data_id': instance.id})
+        broadcast_dashboard_update(
+            event='flight_data_logged',
+            payload={'flight_data_id': instance.id, 'flight_log_id': instance.flight_log_id},
+        )
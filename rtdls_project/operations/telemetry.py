@@ -0,0 +1,42 @@
+from django.db import transaction
+
+from audittrail.models import AuditLog, log_action
+from dashboard.realtime import broadcast_dashboard_update
+
+from .models import FlightData, FlightLog
+from .rollups import BULK_CREATE_BATCH_SIZE, update_rollups
+
+
+def ingest_samples(samples):
+    rows = [FlightData(**sample) for sample in samples]
+    with transaction.atomic():
+        created = FlightData.objects.bulk_create(rows, batch_size=BULK_CREATE_BATCH_SIZE)
+        update_rollups(created)
+    return created
+
+
+def record_ingest(created, *, user, ip_address=None, source='bulk'):
+    flight_log_ids = sorted({sample.flight_log_id for sample in created})
+    log_action(
+        user=user,
+        action=AuditLog.Action.CREATE,
+        entity='FlightData',
+        entity_id=None,
+        description=f'Ingested {len(created)} FlightData samples ({source}) for FlightLog(s) {flight_log_ids}',
+        ip_address=ip_address,
+    )
+    broadcast_dashboard_update(
+        event='flight_data_batch_logged',
+        payload={'count': len(created), 'flight_log_ids': flight_log_ids},
+    )
+    return flight_log_ids
+
+
+def store_stream_batch(samples, *, user, ip_address=None):
+    flight_log_ids = {sample['flight_log_id'] for sample in samples}
+    known_ids = set(FlightLog.objects.filter(id__in=flight_log_ids).values_list('id', flat=True))
+    accepted = [sample for sample in samples if sample['flight_log_id'] in known_ids]
+    created = ingest_samples(accepted) if accepted else []
+    if created:
+        record_ingest(created, user=user, ip_address=ip_address, source='stream')
+    return len(created), sorted(flight_log_ids - known_ids)
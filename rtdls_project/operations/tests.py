@@ -1,11 +1,27 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
+from importlib import import_module
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
+import gzip
+import json
+import tempfile
 
+import numpy as np
+from django.apps import apps as django_apps
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
 from django.utils import timezone
 from rest_framework.test import APIClient
 
-from operations.models import Aircraft, Base, FlightData, FlightLog, Pilot
+from audittrail.models import AuditLog
+from operations.downsampling import lttb_indices
+from operations.models import Aircraft, Base, FlightData, FlightDataRollup, FlightLog, Pilot
+from operations.partitions import archive_month, drop_month, ensure_partitions, list_partitions, partition_name
+from operations.rollups import get_telemetry_series
+from operations.telemetry import ingest_samples
 
 User = get_user_model()
 
@@ -133,3 +149,378 @@ class FlightLogAccessTests(TestCase):
         flight_log.refresh_from_db()
         self.assertEqual(flight_log.mission_status, FlightLog.MissionStatus.COMPLETED)
         self.assertIsNotNone(flight_log.ata)
+
+    def test_late_ata_sets_delay_minutes_and_flag(self):
+        eta = timezone.now() - timedelta(hours=1)
+        flight_log = FlightLog.objects.create(
+            aircraft=self.aircraft,
+            pilot=self.pilot,
+            mission_type='Recon',
+            atd=eta - timedelta(hours=2),
+            eta=eta,
+            flight_hours=2.0,
+            fuel_used=210,
+            departure_base=self.base_a,
+            arrival_base=self.base_b,
+            logged_by=self.ops,
+        )
+        self.assertFalse(flight_log.is_delayed)
+
+        self.client.force_authenticate(self.ops)
+        response = self.client.patch(
+            f'/api/flight-logs/{flight_log.id}/',
+            {'ata': (eta + timedelta(minutes=40)).isoformat(), 'is_cancelled': False},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['delay_minutes'], 40)
+        self.assertTrue(response.json()['is_delayed'])
+
+        # Correcting a mistyped ATA clears the derived flag; a manual mark keeps it set.
+        response = self.client.patch(
+            f'/api/flight-logs/{flight_log.id}/',
+            {'ata': (eta + timedelta(minutes=4)).isoformat(), 'is_delayed': True},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['delay_minutes'], response.json()['is_delayed']), (4, False))
+
+        response = self.client.patch(f'/api/flight-logs/{flight_log.id}/', {'marked_delayed': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['is_delayed'])
+
+    def test_backfill_derives_status_from_remarks_and_arrival_times(self):
+        backfill = import_module('operations.migrations.0011_backfill_flightlog_delay_status')
+        eta = timezone.now() - timedelta(hours=1)
+        values = {
+            'aircraft': self.aircraft,
+            'mission_type': 'Recon',
+            'flight_datetime': eta - timedelta(hours=1),
+            'atd': eta - timedelta(hours=1),
+            'eta': eta,
+            'flight_hours': 1.0,
+            'fuel_used': 100,
+            'departure_base': self.base_a,
+            'arrival_base': self.base_b,
+        }
+        logs = FlightLog.objects.bulk_create(
+            [
+                FlightLog(remarks='Departure delayed by weather', **values),
+                FlightLog(remarks='Cancelled after engine start', **values),
+                FlightLog(remarks='Routine', ata=eta + timedelta(minutes=25), **values),
+                FlightLog(remarks='Routine', ata=eta + timedelta(minutes=5), **values),
+            ]
+        )
+        backfill.backfill_delay_status(django_apps, None)
+
+        statuses = {
+            log.id: (log.is_delayed, log.is_cancelled, log.delay_minutes)
+            for log in FlightLog.objects.filter(id__in=[log.id for log in logs])
+        }
+        self.assertEqual(
+            [statuses[log.id] for log in logs],
+            [(True, False, 0), (False, True, 0), (True, False, 25), (False, False, 5)],
+        )
+
+
+class FlightDataBulkIngestTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        base_a = Base.objects.create(name='Accra', location='Accra')
+        base_b = Base.objects.create(name='Tamale', location='Tamale')
+        aircraft = Aircraft.objects.create(tail_number='GAF-020', model='C-295', home_base=base_a)
+        pilot = Pilot.objects.create(full_name='Flt Lt Asare', rank='Flt Lt')
+        self.ops = User.objects.create_user(username='bulkops', password='StrongPass123!', role='flight_ops')
+        self.flight_log = FlightLog.objects.create(
+            aircraft=aircraft,
+            pilot=pilot,
+            mission_type='Recon',
+            atd=timezone.now() - timedelta(hours=1),
+            eta=timezone.now() + timedelta(hours=1),
+            flight_hours=2.0,
+            fuel_used=300,
+            departure_base=base_a,
+            arrival_base=base_b,
+            logged_by=self.ops,
+        )
+        self.client.force_authenticate(self.ops)
+
+    def _samples(self, count):
+        start = timezone.now() - timedelta(minutes=30)
+        return [
+            {
+                'flight_log': self.flight_log.id,
+                'timestamp': (start + timedelta(seconds=idx)).isoformat(),
+                'altitude': 1000 + idx,
+                'speed': 250,
+                'engine_temp': 80,
+                'fuel_level': 70,
+                'heading': 90,
+            }
+            for idx in range(count)
+        ]
+
+    def test_json_batch_is_inserted_with_single_audit_record(self):
+        AuditLog.objects.all().delete()
+        response = self.client.post('/api/flight-data/bulk/', self._samples(2500), format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 2500)
+        self.assertEqual(FlightData.objects.filter(flight_log=self.flight_log).count(), 2500)
+        self.assertEqual(AuditLog.objects.filter(entity='FlightData').count(), 1)
+
+    def test_ndjson_batch_is_accepted(self):
+        body = '\n'.join(json.dumps(sample) for sample in self._samples(3)) + '\n'
+        response = self.client.post('/api/flight-data/bulk/', body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(FlightData.objects.count(), 3)
+
+    def test_invalid_sample_rejects_whole_batch(self):
+        samples = self._samples(3)
+        samples[1]['altitude'] = -5
+        samples[2]['flight_log'] = self.flight_log.id + 999
+
+        response = self.client.post('/api/flight-data/bulk/', samples, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('altitude', response.json()[1])
+        self.assertEqual(FlightData.objects.count(), 0)
+
+
+class TelemetryPartitionTests(TestCase):
+    def setUp(self):
+        base_a = Base.objects.create(name='Accra', location='Accra')
+        base_b = Base.objects.create(name='Tamale', location='Tamale')
+        aircraft = Aircraft.objects.create(tail_number='GAF-040', model='C-295', home_base=base_a)
+        pilot = Pilot.objects.create(full_name='Flt Lt Amoah', rank='Flt Lt')
+        self.flight_log = FlightLog.objects.create(
+            aircraft=aircraft,
+            pilot=pilot,
+            mission_type='Transport',
+            atd=timezone.now() - timedelta(days=90),
+            eta=timezone.now() - timedelta(days=90) + timedelta(hours=2),
+            flight_hours=2.0,
+            fuel_used=300,
+            departure_base=base_a,
+            arrival_base=base_b,
+        )
+        # On PostgreSQL the months need their own partitions before rows land in them; elsewhere this is a no-op.
+        self.created = ensure_partitions(datetime(2026, 1, 1, tzinfo=dt_timezone.utc), months_ahead=2)
+        ingest_samples(
+            [
+                {
+                    'flight_log_id': self.flight_log.id,
+                    'timestamp': datetime(2026, month, 10, 12, idx, tzinfo=dt_timezone.utc),
+                    'altitude': 1000,
+                    'speed': 250,
+                    'engine_temp': 80,
+                    'fuel_level': 60,
+                    'heading': 180,
+                }
+                for month, count in ((1, 3), (2, 2), (3, 4))
+                for idx in range(count)
+            ]
+        )
+
+    def test_old_months_are_archived_and_dropped(self):
+        with tempfile.TemporaryDirectory() as archive_dir:
+            call_command(
+                'manage_telemetry_partitions',
+                '--drop-before=2026-03',
+                f'--archive-dir={archive_dir}',
+                stdout=StringIO(),
+            )
+            with gzip.open(Path(archive_dir) / 'operations_flightdata_202601.ndjson.gz', 'rt') as handle:
+                archived = [json.loads(line) for line in handle]
+
+        self.assertEqual(len(archived), 3)
+        self.assertEqual(archived[0]['flight_log_id'], self.flight_log.id)
+        self.assertEqual(FlightData.objects.count(), 4)
+        self.assertEqual([month.month for month in list_partitions()], [3])
+        # Rollups of the dropped months go with them, so series and averages only cover stored samples.
+        self.assertEqual(
+            {bucket.month for bucket in FlightDataRollup.objects.values_list('bucket_start', flat=True)}, {3}
+        )
+        self.assertEqual(sum(point['count'] for point in get_telemetry_series(self.flight_log.id)['points']), 4)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Monthly partitions only exist on PostgreSQL.')
+    def test_postgres_partitions_are_created_archived_and_dropped(self):
+        january = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        self.assertEqual(self.created, [partition_name(datetime(2026, month, 1)) for month in (1, 2, 3)])
+        self.assertEqual(ensure_partitions(january, months_ahead=2), [])
+        self.assertTrue({1, 2, 3} <= {month.month for month in list_partitions() if month.year == 2026})
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM "{partition_name(january)}"')
+            self.assertEqual(cursor.fetchone()[0], 3)
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            path, archived = archive_month(january, archive_dir)
+            self.assertEqual((path.name, archived), ('operations_flightdata_202601.ndjson.gz', 3))
+
+        self.assertEqual(drop_month(january), 3)
+        self.assertEqual(drop_month(january), 0)
+        self.assertNotIn(january, list_partitions())
+        self.assertEqual(FlightData.objects.count(), 6)
+        self.assertFalse(
+            FlightDataRollup.objects.filter(bucket_start__lt=datetime(2026, 2, 1, tzinfo=dt_timezone.utc)).exists()
+        )
+
+
+class FlightDataRollupTests(TestCase):
+    def setUp(self):
+        base_a = Base.objects.create(name='Accra', location='Accra')
+        base_b = Base.objects.create(name='Tamale', location='Tamale')
+        aircraft = Aircraft.objects.create(tail_number='GAF-050', model='C-295', home_base=base_a)
+        pilot = Pilot.objects.create(full_name='Flt Lt Boateng', rank='Flt Lt')
+        self.flight_log = FlightLog.objects.create(
+            aircraft=aircraft,
+            pilot=pilot,
+            mission_type='Recon',
+            atd=timezone.now() - timedelta(hours=1),
+            eta=timezone.now() + timedelta(hours=1),
+            flight_hours=2.0,
+            fuel_used=300,
+            departure_base=base_a,
+            arrival_base=base_b,
+        )
+        self.start = datetime(2026, 4, 1, 10, 0, tzinfo=dt_timezone.utc)
+        ingest_samples(
+            [
+                {
+                    'flight_log_id': self.flight_log.id,
+                    'timestamp': self.start + timedelta(seconds=idx),
+                    'altitude': idx,
+                    'speed': 250,
+                    'engine_temp': 80,
+                    'fuel_level': 70,
+                    'heading': 90,
+                }
+                for idx in range(1200)
+            ]
+        )
+
+    def test_bulk_ingest_populates_every_tier(self):
+        rollups = FlightDataRollup.objects.filter(flight_log=self.flight_log)
+
+        self.assertEqual(rollups.filter(resolution=1).count(), 1200)
+        self.assertEqual(rollups.filter(resolution=60).count(), 20)
+        first_window = rollups.get(resolution=600, bucket_start=self.start)
+        self.assertEqual(first_window.sample_count, 600)
+        self.assertEqual(first_window.altitude_min, 0)
+        self.assertEqual(first_window.altitude_max, 599)
+        self.assertEqual(first_window.altitude_last, 599)
+        self.assertAlmostEqual(first_window.average('altitude'), 299.5)
+
+    def test_migration_backfill_matches_live_rollups(self):
+        other = FlightLog.objects.create(
+            aircraft=self.flight_log.aircraft,
+            mission_type='Training',
+            atd=timezone.now() - timedelta(hours=1),
+            eta=timezone.now() + timedelta(hours=1),
+            flight_hours=1.0,
+            fuel_used=100,
+            departure_base=self.flight_log.departure_base,
+            arrival_base=self.flight_log.arrival_base,
+        )
+        ingest_samples(
+            [
+                {
+                    'flight_log_id': other.id,
+                    'timestamp': self.start + timedelta(seconds=idx * 7),
+                    'altitude': 100 - idx,
+                    'speed': 200 + idx,
+                    'engine_temp': 75,
+                    'fuel_level': 90 - idx,
+                    'heading': idx,
+                }
+                for idx in range(150)
+            ]
+        )
+        fields = [field.name for field in FlightDataRollup._meta.fields if field.name != 'id']
+        live = sorted(FlightDataRollup.objects.values_list(*fields))
+        FlightDataRollup.objects.all().delete()
+
+        backfill = import_module('operations.migrations.0008_backfill_flightdata_rollups')
+        backfill.backfill_rollups(django_apps, None)
+
+        self.assertEqual(sorted(FlightDataRollup.objects.values_list(*fields)), live)
+
+    def test_series_respects_point_budget(self):
+        series = get_telemetry_series(self.flight_log.id, max_points=30)
+        self.assertEqual(series['resolution_seconds'], 60)
+        self.assertEqual(len(series['points']), 20)
+        self.assertEqual(series['points'][0]['altitude']['max'], 59)
+
+        merged = get_telemetry_series(self.flight_log.id, max_points=1)
+        self.assertEqual(merged['bucket_seconds'], 1200)
+        self.assertEqual(len(merged['points']), 1)
+        self.assertEqual(merged['points'][0]['count'], 1200)
+
+    def test_edits_and_deletes_rebuild_affected_window(self):
+        sample = FlightData.objects.get(flight_log=self.flight_log, timestamp=self.start + timedelta(seconds=599))
+        with self.captureOnCommitCallbacks(execute=True):
+            sample.delete()
+
+        window = FlightDataRollup.objects.get(flight_log=self.flight_log, resolution=600, bucket_start=self.start)
+        self.assertEqual(window.sample_count, 599)
+        self.assertEqual(window.altitude_max, 598)
+        self.assertFalse(
+            FlightDataRollup.objects.filter(resolution=1, bucket_start=self.start + timedelta(seconds=599)).exists()
+        )
+
+    def test_interleaved_transactions_rebuild_only_their_own_windows(self):
+        second_window = self.start + timedelta(seconds=600)
+        rollups = FlightDataRollup.objects.filter(flight_log=self.flight_log, resolution=600)
+
+        # Transaction A edits the first window but has not committed when B, editing the second, does.
+        with self.captureOnCommitCallbacks() as first_callbacks:
+            FlightData.objects.filter(flight_log=self.flight_log, timestamp=self.start).get().delete()
+        with self.captureOnCommitCallbacks() as second_callbacks:
+            FlightData.objects.filter(flight_log=self.flight_log, timestamp=second_window).get().delete()
+        for callback in second_callbacks:
+            callback()
+        self.assertEqual(rollups.get(bucket_start=self.start).sample_count, 600)
+        self.assertEqual(rollups.get(bucket_start=second_window).sample_count, 599)
+
+        # A's commit still rebuilds its window.
+        for callback in first_callbacks:
+            callback()
+        self.assertEqual(rollups.get(bucket_start=self.start).sample_count, 599)
+        self.assertEqual(rollups.get(bucket_start=self.start).altitude_min, 1)
+
+    def test_series_endpoint_downsamples_requested_channel(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='seriesviewer', password='StrongPass123!', role='auditor'))
+        url = f'/api/flight-logs/{self.flight_log.id}/telemetry-series/'
+
+        response = client.get(url, {'channel': 'altitude', 'points': 50})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['source_points'], 1200)
+        self.assertEqual(len(body['points']), 50)
+        self.assertEqual(body['points'][0]['value'], 0)
+        self.assertEqual(body['points'][-1]['value'], 1199)
+
+        minmax = client.get(url, {'channel': 'altitude', 'points': 20, 'method': 'minmax'}).json()
+        self.assertEqual(len(minmax['points']), 20)
+        self.assertEqual((minmax['points'][0]['value'], minmax['points'][-1]['value']), (0, 1199))
+
+        # Speed is constant, so each bucket's min and max are the same row and it is returned once.
+        flat = client.get(url, {'channel': 'speed', 'points': 20, 'method': 'minmax'}).json()
+        self.assertEqual(len(flat['points']), 10)
+        self.assertEqual(len({point['time'] for point in flat['points']}), 10)
+        self.assertEqual({point['value'] for point in flat['points']}, {250})
+
+        self.assertEqual(client.get(url, {'channel': 'oil_pressure'}).status_code, 400)
+
+    def test_lttb_keeps_spikes(self):
+        x = np.arange(1000, dtype=float)
+        y = np.zeros(1000)
+        y[437] = 500
+
+        selected = lttb_indices(x, y, 20)
+
+        self.assertEqual(len(selected), 20)
+        self.assertIn(437, selected)
+        self.assertEqual((selected[0], selected[-1]), (0, 999))
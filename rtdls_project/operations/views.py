@@ -1,30 +1,33 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Avg, Sum
+from django.db.models import Sum
 from django.shortcuts import get_object_or_404, redirect, render
 
 from accounts.decorators import role_required
 from audittrail.models import AuditLog, log_action
 from dashboard.realtime import broadcast_dashboard_update
 from maintenance.models import Alert
+from rtdls.aggregates import aggregate_counters, count_if
 
 from .forms import FlightLogForm
 from .models import FlightData, FlightLog
+from .rollups import telemetry_averages
 
 
 def _flight_log_context(form, editing_log=None):
     recent_logs = FlightLog.objects.select_related('aircraft', 'pilot', 'departure_base', 'arrival_base').all()[:8]
     alert_items = Alert.objects.select_related('aircraft').filter(is_resolved=False)[:4]
-    flight_totals = FlightLog.objects.aggregate(total_hours=Sum('flight_hours'))
-    telemetry_averages = FlightData.objects.aggregate(
-        average_altitude=Avg('altitude'),
-        average_speed=Avg('speed'),
+    flight_totals = aggregate_counters(
+        FlightLog.objects.all(),
+        total_flights=count_if(),
+        total_hours=Sum('flight_hours'),
     )
+    averages = telemetry_averages()
     stats = {
-        'total_flights': FlightLog.objects.count(),
-        'average_altitude': telemetry_averages.get('average_altitude') or 0,
-        'average_speed': telemetry_averages.get('average_speed') or 0,
-        'total_hours': flight_totals.get('total_hours') or 0,
+        'total_flights': flight_totals['total_flights'],
+        'average_altitude': averages['average_altitude'],
+        'average_speed': averages['average_speed'],
+        'total_hours': flight_totals['total_hours'],
     }
     return {
         'form': form,
@@ -1,11 +1,14 @@
-from datetime import timedelta
+from datetime import date, datetime, timedelta, timezone as dt_timezone
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.utils import timezone
 
+from maintenance.models import MaintenanceLog
 from operations.models import Aircraft, Base, FlightLog, Pilot
+from rtdls.dates import date_window, date_window_filter
+from rtdls.tests import QueryPlanTestCase
 
 User = get_user_model()
 
@@ -51,6 +54,26 @@ class ReportExportTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Report Configuration')
 
+    def test_reports_dashboard_query_budget(self):
+        FlightLog.objects.create(
+            aircraft=Aircraft.objects.create(tail_number='GAF-004', model='C-295', home_base=self.base_b),
+            pilot=self.pilot,
+            mission_type='Training',
+            atd=timezone.now() - timedelta(hours=1),
+            eta=timezone.now(),
+            flight_hours=1.0,
+            fuel_used=100,
+            departure_base=self.base_b,
+            arrival_base=self.base_a,
+            is_cancelled=True,
+            logged_by=self.user,
+        )
+        # Session, user, one summary aggregate, preview rows, pilots, aircraft, flight ids and activity.
+        with self.assertNumQueries(8):
+            response = self.client.get('/reports/')
+        self.assertEqual(response.context['stats']['total_flights'], 2)
+        self.assertEqual(response.context['stats']['on_time_perf'], 50.0)
+
     def test_reports_export_csv(self):
         response = self.client.get('/reports/export/?format=csv')
         self.assertEqual(response.status_code, 200)
@@ -72,3 +95,53 @@ class ReportExportTests(TestCase):
         response = self.client.get('/reports/aircraft-utilization/?format=xlsx')
         self.assertEqual(response.status_code, 200)
         self.assertIn('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', response['Content-Type'])
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ReportQueryPlanTests(QueryPlanTestCase):
+    def setUp(self):
+        self.client.force_login(self.planner)
+
+    def test_reports_dashboard_uses_indexes(self):
+        self.assertNoSequentialScans(self.client.get, '/reports/')
+
+    def test_report_export_uses_indexes(self):
+        self.assertNoSequentialScans(self.client.get, '/reports/export/?format=csv')
+
+    def test_daily_flight_report_uses_indexes(self):
+        self.assertNoSequentialScans(self.client.get, '/reports/daily-flight/?format=xlsx')
+
+    def test_weekly_maintenance_report_uses_indexes(self):
+        self.assertNoSequentialScans(self.client.get, '/reports/weekly-maintenance/?format=xlsx')
+
+    def test_report_filters_by_aircraft_and_pilot_use_indexes(self):
+        flight = FlightLog.objects.order_by('-flight_datetime').first()
+        plans = self.assertNoSequentialScans(
+            lambda: list(FlightLog.objects.filter(aircraft_id=flight.aircraft_id).order_by('-flight_datetime')[:50])
+        )
+        self.assertIn('flightlog_aircraft_dt_idx', ' '.join(plans[0][1]))
+        plans = self.assertNoSequentialScans(
+            lambda: list(FlightLog.objects.filter(pilot_id=flight.pilot_id).order_by('-flight_datetime')[:50])
+        )
+        self.assertIn('flightlog_pilot_dt_idx', ' '.join(plans[0][1]))
+
+    def test_date_windows_match_local_date_lookups(self):
+        today = timezone.localdate()
+        for start, end in ((today, today), (today - timedelta(days=30), today), (today - timedelta(days=200), today - timedelta(days=60))):
+            self.assertEqual(
+                list(FlightLog.objects.filter(**date_window_filter('flight_datetime', start, end)).values_list('id', flat=True)),
+                list(
+                    FlightLog.objects.filter(flight_datetime__date__gte=start, flight_datetime__date__lte=end).values_list('id', flat=True)
+                ),
+            )
+        self.assertEqual(
+            set(MaintenanceLog.objects.filter(**date_window_filter('created_at', today - timedelta(days=7), today)).values_list('id', flat=True)),
+            set(MaintenanceLog.objects.filter(created_at__date__gte=today - timedelta(days=7)).values_list('id', flat=True)),
+        )
+
+    @override_settings(TIME_ZONE='America/New_York')
+    def test_date_window_is_half_open_in_utc_across_dst(self):
+        start, end = date_window(date(2026, 3, 8))
+        self.assertEqual(start, datetime(2026, 3, 8, 5, tzinfo=dt_timezone.utc))
+        self.assertEqual(end, datetime(2026, 3, 9, 4, tzinfo=dt_timezone.utc))
+        self.assertEqual(date_window(date(2026, 3, 1), date(2026, 3, 31))[1], datetime(2026, 4, 1, 4, tzinfo=dt_timezone.utc))
@@ -17,6 +17,8 @@ from accounts.decorators import role_required
 from audittrail.models import AuditLog
 from maintenance.models import MaintenanceLog
 from operations.models import Aircraft, FlightLog, Pilot
+from rtdls.aggregates import aggregate_counters, count_if
+from rtdls.dates import date_window_filter
 
 
 def _sanitize_spreadsheet_cell(value):
@@ -89,10 +91,9 @@ def _format_duration_hours(hours):
 
 
 def _flight_status(log):
-    remarks = (log.remarks or '').lower()
-    if 'cancel' in remarks:
+    if log.is_cancelled:
         return 'Cancelled'
-    if 'delay' in remarks or 'late' in remarks:
+    if log.is_delayed:
         return 'Delayed'
     if log.mission_status == FlightLog.MissionStatus.ACTIVE:
         return 'Active'
@@ -120,10 +121,7 @@ def _build_filtered_queryset(request):
         'departure_base',
         'arrival_base',
         'logged_by',
-    ).filter(
-        flight_datetime__date__gte=date_from,
-        flight_datetime__date__lte=date_to,
-    )
+    ).filter(**date_window_filter('flight_datetime', date_from, date_to))
 
     if pilot_id and pilot_id.isdigit():
         qs = qs.filter(pilot_id=int(pilot_id))
@@ -157,13 +155,17 @@ def _build_filtered_queryset(request):
 @role_required('admin', 'flight_ops', 'commander', 'auditor', 'maintenance')
 def reports_dashboard_view(request):
     qs, filters = _build_filtered_queryset(request)
-    summary = qs.aggregate(
+    summary = aggregate_counters(
+        qs,
+        total_flights=count_if(),
+        delayed=count_if(is_delayed=True),
+        cancelled=count_if(is_cancelled=True),
         avg_duration=Avg('flight_hours'),
         total_fuel=Sum('fuel_used'),
     )
-    total_flights = qs.count()
-    delayed_or_late = qs.filter(Q(remarks__icontains='delay') | Q(remarks__icontains='late')).count()
-    cancelled = qs.filter(remarks__icontains='cancel').count()
+    total_flights = summary['total_flights']
+    delayed_or_late = summary['delayed']
+    cancelled = summary['cancelled']
     on_time = ((max(total_flights - delayed_or_late - cancelled, 0) / total_flights) * 100) if total_flights else 100
 
     recent_logs = qs[:8]
@@ -201,11 +203,13 @@ def reports_dashboard_view(request):
         'filters': filters,
         'pilots': Pilot.objects.filter(is_active=True).order_by('full_name'),
         'aircraft_options': Aircraft.objects.order_by('tail_number'),
-        'flight_id_options': FlightLog.objects.order_by('-id')[: settings.REPORTS_FLIGHT_ID_OPTIONS_LIMIT],
+        'flight_id_options': FlightLog.objects.select_related('aircraft').order_by('-id')[
+            : settings.REPORTS_FLIGHT_ID_OPTIONS_LIMIT
+        ],
         'stats': {
             'total_flights': total_flights,
-            'avg_duration': _format_duration_hours(summary.get('avg_duration') or 0),
-            'fuel_consumed': float(summary.get('total_fuel') or 0.0),
+            'avg_duration': _format_duration_hours(summary['avg_duration']),
+            'fuel_consumed': float(summary['total_fuel']),
             'on_time_perf': round(on_time, 1),
         },
         'recent_logs': preview_rows,
@@ -264,7 +268,7 @@ def report_export(request):
 def daily_flight_report(request):
     report_format = request.GET.get('format', 'pdf').lower()
     date = timezone.localdate()
-    flights = FlightLog.objects.select_related('aircraft', 'departure_base', 'arrival_base', 'logged_by').filter(flight_datetime__date=date)
+    flights = FlightLog.objects.select_related('aircraft', 'departure_base', 'arrival_base', 'logged_by').filter(**date_window_filter('flight_datetime', date))
 
     if report_format == 'xlsx':
         rows = [
@@ -308,7 +312,7 @@ def weekly_maintenance_report(request):
     report_format = request.GET.get('format', 'pdf').lower()
     end_date = timezone.localdate()
     start_date = end_date - timedelta(days=7)
-    logs = MaintenanceLog.objects.select_related('aircraft', 'logged_by').filter(created_at__date__gte=start_date, created_at__date__lte=end_date)
+    logs = MaintenanceLog.objects.select_related('aircraft', 'logged_by').filter(**date_window_filter('created_at', start_date, end_date))
 
     if report_format == 'xlsx':
         rows = [
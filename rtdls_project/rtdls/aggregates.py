@@ -0,0 +1,11 @@
+from django.db.models import Count, Q
+
+
+def count_if(*conditions, **lookups):
+    return Count('pk', filter=Q(*conditions, **lookups) if conditions or lookups else None)
+
+
+def aggregate_counters(queryset, **aggregates):
+    # Every counter is a filtered aggregate over the same rows, so the whole set costs one SELECT.
+    values = queryset.order_by().aggregate(**aggregates)
+    return {name: value or 0 for name, value in values.items()}
@@ -7,11 +7,14 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rtdls.settings')
 
 django_asgi_app = get_asgi_application()
 
+from dashboard.opensky import OpenSkyLifespan  # noqa: E402
+
 from .routing import websocket_urlpatterns  # noqa: E402
 
 application = ProtocolTypeRouter(
     {
         'http': django_asgi_app,
         'websocket': AuthMiddlewareStack(URLRouter(websocket_urlpatterns)),
+        'lifespan': OpenSkyLifespan(),
     }
 )
@@ -0,0 +1,19 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+
+
+def day_start(day, tz=None):
+    aware = timezone.make_aware(datetime.combine(day, time.min), tz or timezone.get_current_timezone())
+    return aware.astimezone(dt_timezone.utc)
+
+
+def date_window(start_date, end_date=None, tz=None):
+    # Local calendar days [start_date, end_date] as a half-open UTC range, so filters compare the raw column.
+    end_date = end_date or start_date
+    return day_start(start_date, tz), day_start(end_date + timedelta(days=1), tz)
+
+
+def date_window_filter(field, start_date, end_date=None, tz=None):
+    start, end = date_window(start_date, end_date, tz)
+    return {f'{field}__gte': start, f'{field}__lt': end}
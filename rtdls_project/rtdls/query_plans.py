@@ -0,0 +1,93 @@
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Tables that grow with usage; walking all of one (sequential scan or unbounded index scan) in a hot path is a regression.
+# The fleet is not one of them: aircraft pickers list every tail number by design.
+HOT_TABLES = (
+    'operations_flightlog',
+    'operations_flightdata',
+    'operations_crew',
+    'maintenance_alert',
+    'maintenance_maintenancelog',
+    'audittrail_auditlog',
+)
+PARTITION_SUFFIX = re.compile(r'_(\d{6}|default)$')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # Small test tables make seq scans cheap; disabling them leaves a seq scan only where no index applies.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}')
+            return [row[0] for row in cursor.fetchall()]
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _hot_table(name):
+    table = PARTITION_SUFFIX.sub('', name)
+    return table if table in HOT_TABLES else None
+
+
+PLAN_SORT = re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY|(?:^|-> +)(?:Incremental )?Sort +\(')
+
+
+def _ordered_walk(sql, plan):
+    # An index walk that already yields the ORDER BY stops at LIMIT; a sort step means every row was read first.
+    return ' ORDER BY ' in sql and ' LIMIT ' in sql and not any(PLAN_SORT.search(line.strip()) for line in plan)
+
+
+def _sqlite_scans(sql, plan):
+    scanned = []
+    for line in plan:
+        match = re.match(r'SCAN (?:TABLE )?(\w+)( USING (?:COVERING )?INDEX \w+)?$', line.strip())
+        table = _hot_table(match.group(1)) if match else None
+        if not table:
+            continue
+        # SQLite prints a bare SCAN for a rowid-ordered walk, so the bare form is only bounded when ordered by id.
+        ordered_by_index = match.group(2) or re.search(rf'ORDER BY "{table}"\."id" (?:ASC|DESC)', sql)
+        if ordered_by_index and _ordered_walk(sql, plan):
+            continue
+        scanned.append(table)
+    return scanned
+
+
+def _postgresql_scans(sql, plan):
+    scanned = []
+    for position, line in enumerate(plan):
+        match = re.search(r'(Seq Scan|Index(?: Only)? Scan)(?: Backward)?(?: using \w+)? on (\w+)', line)
+        table = _hot_table(match.group(2)) if match else None
+        if not table:
+            continue
+        if match.group(1) != 'Seq Scan':
+            indent = len(line) - len(line.lstrip())
+            details = []
+            for detail in plan[position + 1:]:
+                if len(detail) - len(detail.lstrip()) <= indent or '->' in detail:
+                    break
+                details.append(detail)
+            if _ordered_walk(sql, plan) or any('Index Cond' in detail for detail in details):
+                continue
+        scanned.append(table)
+    return scanned
+
+
+def sequential_scans(sql, plan=None):
+    plan = plan if plan is not None else explain(sql)
+    if connection.vendor == 'postgresql':
+        return _postgresql_scans(sql, plan)
+    return _sqlite_scans(sql, plan)
+
+
+def capture_plans(func, *args, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        func(*args, **kwargs)
+    plans = []
+    for query in context.captured_queries:
+        sql = query['sql']
+        if sql.lstrip().upper().startswith('SELECT'):
+            plans.append((sql, explain(sql)))
+    return plans
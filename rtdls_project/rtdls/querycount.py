@@ -0,0 +1,72 @@
+from collections import Counter
+import logging
+import re
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Parameters are already split out by the cursor; what still varies per row is IN-list length and inline numbers.
+IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+NUMBER = re.compile(r'\b\d+\b')
+
+
+def query_shape(sql):
+    return NUMBER.sub('N', IN_LIST.sub('IN (...)', sql))
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, perf_counter() - started))
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._wrapper.__exit__(*exc_info)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration_ms(self):
+        return round(sum(elapsed for _sql, elapsed in self.queries) * 1000, 2)
+
+    def duplicates(self, threshold=None):
+        threshold = threshold or settings.QUERY_DUPLICATE_THRESHOLD
+        shapes = Counter(query_shape(sql) for sql, _elapsed in self.queries)
+        return {shape: total for shape, total in shapes.items() if total >= threshold}
+
+    def report(self, threshold=None):
+        lines = [f'{self.count} queries in {self.duration_ms} ms']
+        for shape, total in sorted(self.duplicates(threshold).items(), key=lambda item: -item[1]):
+            lines.append(f'  {total}x {shape}')
+        return '\n'.join(lines)
+
+
+class QueryCountMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        duplicates = recorder.duplicates()
+        response['X-Query-Count'] = str(recorder.count)
+        response['X-Query-Time-Ms'] = str(recorder.duration_ms)
+        response['X-Query-Duplicates'] = str(len(duplicates))
+        if duplicates:
+            logger.warning('%s %s repeated query shapes (possible N+1):\n%s', request.method, request.path, recorder.report())
+        return response
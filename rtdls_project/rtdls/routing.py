@@ -1,6 +1,7 @@
 from django.urls import path
-from dashboard.consumers import DashboardConsumer
+from dashboard.consumers import DashboardConsumer, TelemetryIngestConsumer
 
 websocket_urlpatterns = [
     path('ws/dashboard/', DashboardConsumer.as_asgi()),
+    path('ws/telemetry/', TelemetryIngestConsumer.as_asgi()),
 ]
@@ -100,6 +100,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Development aid, opt-in: per-request X-Query-Count headers and a warning when a query shape repeats (N+1).
+QUERY_COUNT_MIDDLEWARE = DEBUG and os.getenv('QUERY_COUNT_MIDDLEWARE', 'False').lower() == 'true'
+QUERY_DUPLICATE_THRESHOLD = max(2, int(os.getenv('QUERY_DUPLICATE_THRESHOLD', '3')))
+if QUERY_COUNT_MIDDLEWARE:
+    MIDDLEWARE.insert(0, 'rtdls.querycount.QueryCountMiddleware')
+
 ROOT_URLCONF = 'rtdls.urls'
 
 TEMPLATES = [
@@ -150,6 +156,13 @@ if REDIS_URL:
             'CONFIG': {'hosts': [REDIS_URL]},
         }
     }
+    # Shared cache so background refreshers and every web worker see the same OpenSky snapshots.
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -227,3 +240,62 @@ SECURE_HSTS_INCLUDE_SUBDOMAINS = not DEBUG
 SECURE_HSTS_PRELOAD = not DEBUG
 
 REPORTS_FLIGHT_ID_OPTIONS_LIMIT = max(1, int(os.getenv('REPORTS_FLIGHT_ID_OPTIONS_LIMIT', '40')))
+
+# Audit entries are spooled to disk and chained in batches by one background writer per process when enabled.
+AUDIT_ASYNC_WRITES = os.getenv('AUDIT_ASYNC_WRITES', 'False').lower() == 'true'
+AUDIT_BATCH_SIZE = max(1, int(os.getenv('AUDIT_BATCH_SIZE', '200')))
+AUDIT_FLUSH_MS = max(10, int(os.getenv('AUDIT_FLUSH_MS', '500')))
+AUDIT_SPOOL_DIR = os.getenv('AUDIT_SPOOL_DIR', str(BASE_DIR / 'var' / 'audit-spool'))
+# Audit rows chain per entity ('entity') or per worker process ('worker'); checkpoints tie the shard heads together.
+AUDIT_CHAIN_SHARDING = os.getenv('AUDIT_CHAIN_SHARDING', 'entity').strip().lower()
+if AUDIT_CHAIN_SHARDING not in {'entity', 'worker'}:
+    AUDIT_CHAIN_SHARDING = 'entity'
+# Worker sharding maps each process to one of AUDIT_WORKER_SLOTS shards (pid modulo the count) unless pinned.
+AUDIT_WORKER_SLOTS = max(1, int(os.getenv('AUDIT_WORKER_SLOTS', '8')))
+AUDIT_WORKER_SLOT = int(os.getenv('AUDIT_WORKER_SLOT')) % AUDIT_WORKER_SLOTS if os.getenv('AUDIT_WORKER_SLOT') else None
+AUDIT_CHECKPOINT_SECONDS = max(10, int(os.getenv('AUDIT_CHECKPOINT_SECONDS', '300')))
+# Checkpoints are HMAC-signed with this key; rotating it invalidates every earlier verification checkpoint.
+AUDIT_SIGNING_KEY = os.getenv('AUDIT_SIGNING_KEY', '').strip() or SECRET_KEY
+# verify_audit_chain streams rows in chunks of this size and records a resume point every N verified rows per shard.
+AUDIT_VERIFY_CHUNK_SIZE = max(100, int(os.getenv('AUDIT_VERIFY_CHUNK_SIZE', '2000')))
+AUDIT_VERIFY_CHECKPOINT_ROWS = max(100, int(os.getenv('AUDIT_VERIFY_CHECKPOINT_ROWS', '10000')))
+# Low-value actions ('view', or 'action:Entity' such as 'create:FlightData') are collapsed per user and entity
+# into one summary row per window instead of one chained row per event.
+AUDIT_AGGREGATE_ACTIONS = [rule for rule in os.getenv('AUDIT_AGGREGATE_ACTIONS', '').split(',') if rule.strip()]
+AUDIT_AGGREGATE_SECONDS = max(1, int(os.getenv('AUDIT_AGGREGATE_SECONDS', '300')))
+# archive_audit_logs moves rows older than the retention window into gzip'd NDJSON segments under this directory.
+AUDIT_ARCHIVE_DIR = os.getenv('AUDIT_ARCHIVE_DIR', str(BASE_DIR / 'var' / 'audit-archive'))
+AUDIT_RETENTION_DAYS = max(1, int(os.getenv('AUDIT_RETENTION_DAYS', '365')))
+AUDIT_ARCHIVE_SEGMENT_ROWS = max(100, int(os.getenv('AUDIT_ARCHIVE_SEGMENT_ROWS', '50000')))
+# Upper bound on rows returned by GET /api/audit/logs/, which may have to read archive segments.
+AUDIT_QUERY_LIMIT = max(1, int(os.getenv('AUDIT_QUERY_LIMIT', '500')))
+
+# Flights landing this many minutes after ETA are flagged delayed automatically.
+FLIGHT_DELAY_THRESHOLD_MINUTES = max(1, int(os.getenv('FLIGHT_DELAY_THRESHOLD_MINUTES', '15')))
+
+# Realtime dashboard events are coalesced for this window before one metrics recompute/fan-out (0 = send inline).
+DASHBOARD_BROADCAST_WINDOW_MS = max(0, int(os.getenv('DASHBOARD_BROADCAST_WINDOW_MS', '250')))
+# Upper bound on how long a versioned metrics snapshot serves initial_state; writes invalidate it sooner.
+DASHBOARD_METRICS_CACHE_SECONDS = max(1, int(os.getenv('DASHBOARD_METRICS_CACHE_SECONDS', '30')))
+
+TELEMETRY_BULK_MAX_SAMPLES = max(1, int(os.getenv('TELEMETRY_BULK_MAX_SAMPLES', '10000')))
+
+# Streaming telemetry ingest (/ws/telemetry/): flush by size or age, pause the sender when the buffer is full.
+TELEMETRY_STREAM_BATCH_SIZE = max(1, int(os.getenv('TELEMETRY_STREAM_BATCH_SIZE', '500')))
+TELEMETRY_STREAM_FLUSH_MS = max(10, int(os.getenv('TELEMETRY_STREAM_FLUSH_MS', '1000')))
+TELEMETRY_STREAM_BUFFER_MAX = max(1, int(os.getenv('TELEMETRY_STREAM_BUFFER_MAX', '5000')))
+
+# Telemetry series endpoint: rollup points fed to the downsampler, and the largest response the API will return.
+TELEMETRY_SERIES_SOURCE_POINTS = max(100, int(os.getenv('TELEMETRY_SERIES_SOURCE_POINTS', '20000')))
+TELEMETRY_SERIES_MAX_POINTS = max(3, int(os.getenv('TELEMETRY_SERIES_MAX_POINTS', '2000')))
+
+# OpenSky traffic is polled in the background and served from cache; requests never wait on the upstream API.
+OPENSKY_REFRESH_SECONDS = max(1, int(os.getenv('OPENSKY_REFRESH_SECONDS', '15')))
+# Snapshots older than the soft TTL are still served but trigger one coalesced revalidation; the hard TTL evicts them.
+OPENSKY_SOFT_TTL_SECONDS = max(1, int(os.getenv('OPENSKY_SOFT_TTL_SECONDS', '20')))
+OPENSKY_CACHE_SECONDS = max(OPENSKY_SOFT_TTL_SECONDS, int(os.getenv('OPENSKY_CACHE_SECONDS', '120')))
+# 'global': one world-wide fetch per cycle, every scope/bbox answered from a grid-indexed snapshot; 'scoped': one fetch per scope.
+OPENSKY_FETCH_MODE = os.getenv('OPENSKY_FETCH_MODE', 'global').strip().lower()
+if OPENSKY_FETCH_MODE not in {'global', 'scoped'}:
+    OPENSKY_FETCH_MODE = 'global'
+OPENSKY_REFRESH_IN_PROCESS = os.getenv('OPENSKY_REFRESH_IN_PROCESS', 'True').lower() == 'true'
@@ -0,0 +1,249 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.test.utils import modify_settings, override_settings
+from django.utils import timezone
+
+from audittrail.models import AuditChainHead, AuditLog
+from maintenance.models import Alert, MaintenanceLog
+from operations.models import Aircraft, Base, Crew, FlightData, FlightLog, Pilot
+
+from .query_plans import capture_plans, sequential_scans
+from .querycount import QueryCountMiddleware, QueryRecorder, query_shape
+from .urls import router
+
+# Query budgets per request, session and user lookups included. A list endpoint's budget must not grow with rows.
+API_LIST_BUDGETS = {
+    'users': 3,
+    'aircraft': 3,
+    'bases': 3,
+    'crew': 3,
+    'pilots': 3,
+    'flight-logs': 4,
+    'flight-data': 3,
+    'maintenance-logs': 3,
+    'alerts': 3,
+}
+HTML_VIEW_BUDGETS = {
+    '/dashboard/': 14,
+    '/reports/': 8,
+    '/reports/export/?format=csv': 3,
+    '/reports/daily-flight/?format=xlsx': 3,
+    '/reports/weekly-maintenance/?format=xlsx': 3,
+    '/reports/aircraft-utilization/?format=xlsx': 3,
+    '/operations/flight-logs/new/': 11,
+    '/maintenance/logs/new/': 8,
+    '/accounts/profile/': 14,
+}
+
+
+class QueryPlanTestCase(TestCase):
+    flight_logs = 6000
+    audit_logs = 4000
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username='planner', password='StrongPass123!', role='admin')
+        bases = [Base.objects.create(name=f'Base {idx}', location=f'Base {idx}') for idx in range(3)]
+        statuses = [choice for choice, _label in Aircraft.Status.choices]
+        aircraft = Aircraft.objects.bulk_create(
+            Aircraft(tail_number=f'GAF-{idx:03d}', model='C-295', status=statuses[idx % 3], home_base=bases[idx % 3])
+            for idx in range(40)
+        )
+        pilots = Pilot.objects.bulk_create(Pilot(full_name=f'Pilot {idx}', rank='Flt Lt') for idx in range(20))
+        crew = Crew.objects.bulk_create(
+            Crew(full_name=f'Crew {idx}', rank='Sgt', role='Crew', is_available=idx % 4 == 0) for idx in range(200)
+        )
+
+        now = timezone.now()
+        flights = []
+        for idx in range(cls.flight_logs):
+            atd = now - timedelta(hours=idx * 0.75)
+            flights.append(
+                FlightLog(
+                    aircraft=aircraft[idx % len(aircraft)],
+                    pilot=pilots[idx % len(pilots)],
+                    mission_type='Training',
+                    mission_status=FlightLog.MissionStatus.ACTIVE if idx % 10 == 0 else FlightLog.MissionStatus.COMPLETED,
+                    flight_datetime=atd,
+                    atd=atd,
+                    eta=atd + timedelta(hours=1),
+                    ata=None if idx % 10 == 0 else atd + timedelta(hours=1),
+                    flight_hours=1.5,
+                    fuel_used=200,
+                    departure_base=bases[idx % 3],
+                    arrival_base=bases[(idx + 1) % 3],
+                    remarks='Delayed by weather' if idx % 7 == 0 else 'Routine',
+                    marked_delayed=idx % 7 == 0,
+                    is_delayed=idx % 7 == 0,
+                    is_cancelled=idx % 13 == 0,
+                    logged_by=user,
+                )
+            )
+        flights = FlightLog.objects.bulk_create(flights, batch_size=500)
+        FlightLog.crew_members.through.objects.bulk_create(
+            (
+                FlightLog.crew_members.through(flightlog_id=flight.id, crew_id=crew[(idx + offset) % len(crew)].id)
+                for idx, flight in enumerate(flights)
+                for offset in range(2)
+            ),
+            batch_size=1000,
+        )
+        FlightData.objects.bulk_create(
+            (
+                FlightData(
+                    flight_log=flights[idx % 50],
+                    timestamp=now - timedelta(seconds=idx),
+                    altitude=1000 + idx,
+                    speed=200,
+                    engine_temp=600,
+                    fuel_level=50,
+                    heading=90,
+                )
+                for idx in range(5000)
+            ),
+            batch_size=500,
+        )
+
+        maintenance_logs = MaintenanceLog.objects.bulk_create(
+            MaintenanceLog(
+                aircraft=aircraft[idx % len(aircraft)],
+                total_flight_hours=100 + idx,
+                last_maintenance_date=now.date() - timedelta(days=idx % 90),
+                component_status='Inspected',
+                logged_by=user,
+            )
+            for idx in range(300)
+        )
+        Alert.objects.bulk_create(
+            Alert(
+                aircraft=log.aircraft,
+                maintenance_log=log,
+                title='Threshold reached',
+                message='Maintenance due.',
+                is_resolved=idx % 10 != 0,
+            )
+            for idx, log in enumerate(maintenance_logs * 2)
+        )
+        entities = ['FlightLog', 'MaintenanceLog', 'Dashboard', 'FlightData', 'Aircraft']
+        AuditLog.objects.bulk_create(
+            (
+                AuditLog(
+                    user=user,
+                    action=AuditLog.Action.VIEW,
+                    entity=entities[idx % len(entities)],
+                    shard=entities[idx % len(entities)].lower(),
+                    description='Seeded',
+                    previous_checksum='seed',
+                    checksum=f'{idx:064x}',
+                )
+                for idx in range(cls.audit_logs)
+            ),
+            batch_size=500,
+        )
+        AuditChainHead.objects.bulk_create(
+            AuditChainHead(shard=entity.lower(), checksum=f'{idx:064x}', entry_count=cls.audit_logs // len(entities))
+            for idx, entity in enumerate(entities)
+        )
+        cls.planner = user
+
+    def assertNoSequentialScans(self, func, *args, **kwargs):
+        plans = capture_plans(func, *args, **kwargs)
+        regressions = [(sql, plan) for sql, plan in plans if sequential_scans(sql, plan)]
+        self.assertFalse(
+            regressions,
+            '\n\n'.join(f'{sql}\n  ' + '\n  '.join(plan) for sql, plan in regressions),
+        )
+        return plans
+
+    def assertQueryBudget(self, budget, func, *args, **kwargs):
+        with QueryRecorder() as recorder:
+            result = func(*args, **kwargs)
+        self.assertLessEqual(recorder.count, budget, recorder.report())
+        self.assertFalse(recorder.duplicates(), f'Repeated query shapes (N+1):\n{recorder.report()}')
+        return result
+
+
+class SequentialScanDetectorTests(TestCase):
+    def _scanned(self, func):
+        return [sequential_scans(sql, plan) for sql, plan in capture_plans(func)]
+
+    def test_unbounded_and_unindexed_walks_are_flagged(self):
+        # A sort over an unindexed column reads every row before LIMIT applies.
+        self.assertEqual(self._scanned(lambda: list(FlightLog.objects.order_by('fuel_used')[:10])), [['operations_flightlog']])
+        # Unfiltered statements are not exempt.
+        self.assertEqual(self._scanned(lambda: list(FlightLog.objects.order_by('-flight_datetime'))), [['operations_flightlog']])
+
+    def test_limited_walks_in_index_order_pass(self):
+        self.assertEqual(self._scanned(lambda: FlightLog.objects.order_by('id').first()), [[]])
+        self.assertEqual(self._scanned(lambda: list(FlightLog.objects.order_by('-flight_datetime')[:10])), [[]])
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class QueryBudgetTests(QueryPlanTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.planner)
+
+    def test_every_api_list_endpoint_has_a_budget(self):
+        self.assertEqual({prefix for prefix, _viewset, _basename in router.registry}, set(API_LIST_BUDGETS))
+
+    def test_api_list_endpoints_stay_within_budget(self):
+        for prefix, budget in API_LIST_BUDGETS.items():
+            with self.subTest(endpoint=prefix):
+                response = self.assertQueryBudget(budget, self.client.get, f'/api/{prefix}/')
+                self.assertEqual(response.status_code, 200)
+
+    def test_html_views_stay_within_budget(self):
+        flight = FlightLog.objects.order_by('-flight_datetime').first()
+        views = dict(HTML_VIEW_BUDGETS, **{f'/operations/flight-logs/{flight.id}/edit/': 13})
+        for path, budget in views.items():
+            with self.subTest(view=path):
+                response = self.assertQueryBudget(budget, self.client.get, path)
+                self.assertEqual(response.status_code, 200)
+
+    @modify_settings(MIDDLEWARE={'prepend': 'rtdls.querycount.QueryCountMiddleware'})
+    def test_middleware_headers_match_the_api_budgets(self):
+        for prefix, budget in API_LIST_BUDGETS.items():
+            with self.subTest(endpoint=prefix):
+                response = self.client.get(f'/api/{prefix}/')
+                self.assertLessEqual(int(response['X-Query-Count']), budget)
+                self.assertEqual(response['X-Query-Duplicates'], '0')
+
+    def test_recorder_flags_per_row_lookups(self):
+        with QueryRecorder() as recorder:
+            pilots = [log.pilot.full_name for log in FlightLog.objects.order_by('-flight_datetime')[:10]]
+        self.assertEqual(len(pilots), 10)
+        self.assertEqual(recorder.count, 11)
+        self.assertEqual(list(recorder.duplicates().values()), [10])
+
+        with QueryRecorder() as recorder:
+            list(FlightLog.objects.select_related('pilot').order_by('-flight_datetime')[:10])
+        self.assertEqual(recorder.duplicates(), {})
+
+    def test_query_shape_collapses_in_lists_and_inline_numbers(self):
+        self.assertEqual(
+            query_shape('SELECT "id" FROM "operations_pilot" WHERE "id" IN (%s, %s, %s) LIMIT 21'),
+            query_shape('SELECT "id" FROM "operations_pilot" WHERE "id" IN (%s) LIMIT 5'),
+        )
+
+    def test_middleware_reports_query_counts_and_warns_on_repeats(self):
+        def single_query(request):
+            FlightLog.objects.count()
+            return HttpResponse()
+
+        def per_row_lookups(request):
+            for log in FlightLog.objects.order_by('-flight_datetime')[:5]:
+                log.pilot.full_name
+            return HttpResponse()
+
+        response = QueryCountMiddleware(single_query)(RequestFactory().get('/'))
+        self.assertEqual((response['X-Query-Count'], response['X-Query-Duplicates']), ('1', '0'))
+
+        with self.assertLogs('rtdls.querycount', level='WARNING') as logs:
+            response = QueryCountMiddleware(per_row_lookups)(RequestFactory().get('/'))
+        self.assertEqual((response['X-Query-Count'], response['X-Query-Duplicates']), ('6', '1'))
+        self.assertIn('5x SELECT', logs.output[0])
@@ -5,6 +5,7 @@ from rest_framework.routers import DefaultRouter
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
 from accounts.api import UserViewSet
+from audittrail.api import AuditChainVerifyView, AuditLogRangeView
 from maintenance.api import MaintenanceLogViewSet, AlertViewSet
 from operations.api import AircraftViewSet, BaseViewSet, CrewViewSet, FlightDataViewSet, FlightLogViewSet, PilotViewSet
 from reports_app.views import (
@@ -37,6 +38,8 @@ urlpatterns = [
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/docs/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    path('api/audit/verify/', AuditChainVerifyView.as_view(), name='audit-verify'),
+    path('api/audit/logs/', AuditLogRangeView.as_view(), name='audit-logs'),
     path('api/', include(router.urls)),
     path('reports/', reports_dashboard_view, name='reports-dashboard'),
     path('reports/export/', report_export, name='report-export'),
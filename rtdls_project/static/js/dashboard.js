@@ -37,6 +37,12 @@
     });
 
     var altitudeTrend = loadJsonScript('altitude-trend-data', []);
+    var telemetryFlightLogId = loadJsonScript('telemetry-flight-log-data', null);
+    var flightLogsApiUrl = loadJsonScript('flight-logs-api-url-data', '/api/flight-logs/');
+    var telemetrySeriesPoints = 120;
+    var telemetrySeriesMinIntervalMs = 5000;
+    var telemetrySeriesLastFetch = 0;
+    var telemetrySeriesTimer = null;
     var ghanaBbox = loadJsonScript('ghana-bbox-data', {
         lamin: 4.5,
         lomin: -3.5,
@@ -55,6 +61,7 @@
     var mapInstance = null;
     var flightLayer = null;
     var mapScope = selectedScope;
+    var feedState = { scope: null, version: null, etag: null, flights: {} };
 
     function chartTheme() {
         return {
@@ -180,6 +187,47 @@
         altitudeChart.update('none');
     }
 
+    function loadTelemetrySeries() {
+        if (!telemetryFlightLogId) return;
+        telemetrySeriesLastFetch = Date.now();
+        var url = flightLogsApiUrl + encodeURIComponent(telemetryFlightLogId) + '/telemetry-series/'
+            + '?channel=altitude&method=lttb&points=' + telemetrySeriesPoints;
+        fetch(url, {
+            credentials: 'same-origin',
+            headers: { Accept: 'application/json' },
+            cache: 'no-store',
+        })
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error('Telemetry series returned HTTP ' + response.status + '.');
+                }
+                return response.json();
+            })
+            .then(function (series) {
+                if (!series.points || !series.points.length) return;
+                refreshAltitudeChart(series.points.map(function (point) {
+                    return { time: parseTimeLabel(point.time), altitude: point.value };
+                }));
+            })
+            .catch(function () {
+                // Keep the coarse trend from the metrics payload when the series endpoint is unavailable.
+            });
+    }
+
+    function scheduleTelemetrySeries(flightLogId) {
+        if (flightLogId !== telemetryFlightLogId) {
+            telemetryFlightLogId = flightLogId;
+            telemetrySeriesLastFetch = 0;
+            subscribeTelemetryTopic();
+        }
+        if (telemetrySeriesTimer) return;
+        var wait = Math.max(0, telemetrySeriesMinIntervalMs - (Date.now() - telemetrySeriesLastFetch));
+        telemetrySeriesTimer = window.setTimeout(function () {
+            telemetrySeriesTimer = null;
+            loadTelemetrySeries();
+        }, wait);
+    }
+
     function refreshMetrics(metrics) {
         if (!metrics) return;
         text('metric-flights-today', metrics.flights_today || 0);
@@ -198,7 +246,11 @@
         }
 
         refreshStatusChart(metrics.status_distribution || {});
-        refreshAltitudeChart(metrics.altitude_trend || []);
+        if (metrics.telemetry_flight_log_id) {
+            scheduleTelemetrySeries(metrics.telemetry_flight_log_id);
+        } else {
+            refreshAltitudeChart(metrics.altitude_trend || []);
+        }
     }
 
     function initOpenSkyMap() {
@@ -323,6 +375,35 @@
         text('map-updated', feed.generated_at ? 'Updated ' + parseTimeLabel(feed.generated_at) : '');
     }
 
+    function applyOpenSkyFeed(data, scope, etag) {
+        if (!data.delta || feedState.scope !== scope) {
+            feedState.flights = {};
+            (data.flights || []).forEach(function (flight) {
+                feedState.flights[flight.icao24] = flight;
+            });
+        } else {
+            (data.removed || []).forEach(function (icao24) {
+                delete feedState.flights[icao24];
+            });
+            (data.added || []).concat(data.changed || []).forEach(function (flight) {
+                feedState.flights[flight.icao24] = flight;
+            });
+        }
+        feedState.scope = scope;
+        feedState.version = typeof data.version === 'undefined' ? null : data.version;
+        feedState.etag = feedState.version === null ? null : etag;
+
+        var feed = Object.assign({}, data);
+        feed.flights = Object.keys(feedState.flights)
+            .map(function (icao24) {
+                return feedState.flights[icao24];
+            })
+            .sort(function (left, right) {
+                return String(left.callsign).localeCompare(String(right.callsign));
+            });
+        renderOpenSkyFlights(feed);
+    }
+
     function refreshOpenSkyFeed(scope) {
         var activeScope = scope || selectedScope;
         var orderedCandidates = [preferredFeedUrl]
@@ -330,22 +411,32 @@
                 return candidate && candidate !== preferredFeedUrl;
             }));
 
+        // Same-scope polls ask for a delta against the last applied version and send its ETag.
+        var sameScope = feedState.scope === activeScope && feedState.version !== null;
+
         function buildFeedUrl(baseUrl) {
             if (!baseUrl) return '';
             var separator = baseUrl.indexOf('?') === -1 ? '?' : '&';
-            return baseUrl + separator + 'scope=' + encodeURIComponent(activeScope);
+            var url = baseUrl + separator + 'scope=' + encodeURIComponent(activeScope);
+            if (sameScope) {
+                url += '&since=' + encodeURIComponent(feedState.version);
+            }
+            return url;
         }
 
         function parseJsonResponse(response) {
             if (response.redirected && response.url.indexOf('/accounts/login/') !== -1) {
                 throw new Error('Session expired. Please log in again.');
             }
+            if (response.status === 304) {
+                return null;
+            }
             if (!response.ok) {
                 throw new Error('OpenSky endpoint returned HTTP ' + response.status + '.');
             }
             return response.text().then(function (rawText) {
                 try {
-                    return JSON.parse(rawText);
+                    return { data: JSON.parse(rawText), etag: response.headers.get('ETag') };
                 } catch (_error) {
                     throw new Error('OpenSky endpoint returned non-JSON response.');
                 }
@@ -358,11 +449,13 @@
             }
 
             var candidate = orderedCandidates[index];
+            var headers = { Accept: 'application/json' };
+            if (sameScope && feedState.etag) {
+                headers['If-None-Match'] = feedState.etag;
+            }
             return fetch(buildFeedUrl(candidate), {
                 credentials: 'same-origin',
-                headers: {
-                    Accept: 'application/json',
-                },
+                headers: headers,
                 cache: 'no-store',
             })
                 .then(parseJsonResponse)
@@ -379,8 +472,9 @@
         }
 
         attemptFetch(0)
-            .then(function (data) {
-                renderOpenSkyFlights(data);
+            .then(function (result) {
+                if (!result) return;
+                applyOpenSkyFeed(result.data, activeScope, result.etag);
             })
             .catch(function (error) {
                 text('map-status', error && error.message ? error.message : 'Unable to reach OpenSky feed. Retrying...');
@@ -402,24 +496,67 @@
         }
 
         selector.addEventListener('change', function () {
+            var previousScope = selectedScope;
             selectedScope = selector.value || selectedScope;
             text('map-status', 'Loading OpenSky ' + selectedScope + ' feed...');
-            refreshOpenSkyFeed(selectedScope);
+            if (socketIsOpen()) {
+                sendSocketMessage({ action: 'unsubscribe', scope: previousScope });
+                subscribeOpenSky(selectedScope);
+            } else {
+                refreshOpenSkyFeed(selectedScope);
+            }
         });
     }
 
     createCharts();
+    loadTelemetrySeries();
     initOpenSkyMap();
     initScopeSelector();
     refreshOpenSkyFeed(selectedScope);
+    // HTTP polling is only a fallback; while the dashboard socket is open the server pushes OpenSky updates.
     window.setInterval(function () {
-        refreshOpenSkyFeed(selectedScope);
+        if (!socketIsOpen()) {
+            refreshOpenSkyFeed(selectedScope);
+        }
     }, 30000);
 
     var protocol = window.location.protocol === 'https:' ? 'wss://' : 'ws://';
     var wsUrl = protocol + window.location.host + '/ws/dashboard/';
     var reconnectAttempts = 0;
     var reconnectTimer = null;
+    var dashboardSocket = null;
+    var telemetryTopic = null;
+
+    function socketIsOpen() {
+        return !!dashboardSocket && dashboardSocket.readyState === WebSocket.OPEN;
+    }
+
+    function sendSocketMessage(message) {
+        if (socketIsOpen()) {
+            dashboardSocket.send(JSON.stringify(message));
+        }
+    }
+
+    function subscribeOpenSky(scope) {
+        var message = { action: 'subscribe', scope: scope };
+        if (feedState.scope === scope && feedState.version !== null) {
+            message.since = feedState.version;
+        }
+        sendSocketMessage(message);
+    }
+
+    // Telemetry events for the charted flight arrive on their own topic, not with every metrics push.
+    function subscribeTelemetryTopic() {
+        var topic = telemetryFlightLogId ? 'telemetry.' + telemetryFlightLogId : null;
+        if (topic === telemetryTopic || !socketIsOpen()) return;
+        if (telemetryTopic) {
+            sendSocketMessage({ action: 'unsubscribe', topic: telemetryTopic });
+        }
+        if (topic) {
+            sendSocketMessage({ action: 'subscribe', topic: topic });
+        }
+        telemetryTopic = topic;
+    }
 
     function scheduleReconnect() {
         if (reconnectTimer) {
@@ -435,14 +572,30 @@
 
     function connectDashboardSocket() {
         var socket = new WebSocket(wsUrl);
+        dashboardSocket = socket;
 
         socket.onopen = function () {
             reconnectAttempts = 0;
+            telemetryTopic = null;
+            subscribeOpenSky(selectedScope);
+            subscribeTelemetryTopic();
         };
 
         socket.onmessage = function (event) {
             var data = JSON.parse(event.data);
-            refreshMetrics(data.metrics);
+            if (data.event === 'opensky_feed') {
+                if (data.scope === selectedScope) {
+                    applyOpenSkyFeed(data.payload, data.scope, null);
+                }
+                return;
+            }
+            if (data.topic && data.topic === telemetryTopic) {
+                scheduleTelemetrySeries(telemetryFlightLogId);
+                return;
+            }
+            if (data.metrics) {
+                refreshMetrics(data.metrics);
+            }
         };
 
         socket.onerror = function () {